@@ -1,101 +1,265 @@
 import os
-import requests
 import json
+import random
+import asyncio
+import base64
+import httpx # pip install httpx
+from app.utils.deadline import cap_timeout, current_deadline, within_deadline
+from app.ai.scheduler import (
+    LLMScheduler, PRIORITY_FEEDBACK, PRIORITY_EXPRESSION, PRIORITY_SCENARIO, PRIORITY_IMAGE
+)
 
 # 환경 변수 로드
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-05-01-preview")
+JSON_API_VERSION = os.getenv("AZURE_OPENAI_JSON_API_VERSION", "2024-02-01")
 
 # 배포 이름 (기존 GPT용 + 새로 만든 DALL-E용)
 AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini") # 기존꺼 재사용
 AZURE_DALLE_DEPLOYMENT = os.getenv("AZURE_OPENAI_DALLE_DEPLOYMENT", "dalle-3") # [NEW] 새로 만든 배포 이름
 
+# 호출 종류별 타임아웃 (초)
+LLM_CHAT_TIMEOUT = float(os.getenv("LLM_CHAT_TIMEOUT", "30"))
+LLM_JSON_TIMEOUT = float(os.getenv("LLM_JSON_TIMEOUT", "60"))
+LLM_VISION_TIMEOUT = float(os.getenv("LLM_VISION_TIMEOUT", "20"))
+LLM_IMAGE_TIMEOUT = float(os.getenv("LLM_IMAGE_TIMEOUT", "90")) # DALL-E는 오래 걸림
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "50"))
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "3"))
+LLM_MAX_RETRY_WAIT = float(os.getenv("LLM_MAX_RETRY_WAIT", "20"))
+# 배포별 분당 요청 수 상한 (Azure 할당량에 맞춤, 0이면 제한 없음)
+AZURE_OPENAI_RPM = float(os.getenv("AZURE_OPENAI_RPM", "300"))
+AZURE_DALLE_RPM = float(os.getenv("AZURE_OPENAI_DALLE_RPM", "6"))
+# 할당량을 나눠 쓰는 프로세스 수 (app.serve가 워커 수로 설정, uvicorn --workers N 이면 직접 N으로)
+# 스케줄러는 프로세스마다 따로 돌기 때문에 나누지 않으면 실제 호출 속도가 워커 수만큼 늘어난다.
+LLM_RATE_WORKERS = max(1, int(os.getenv("SERVE_WORKER_COUNT", "1")))
+# 피드백은 영어 1 문장이므로 출력 토큰 상한도 그에 맞춤
+FEEDBACK_MAX_TOKENS = int(os.getenv("FEEDBACK_MAX_TOKENS", "60"))
+
 def get_headers():
     return {
         "Content-Type": "application/json",
         "api-key": AZURE_OPENAI_API_KEY
     }
 
-# [기존 함수 유지] 피드백 생성용
-def call_llm(prompt: str) -> str:\
+# ==========================================
+# 공용 커넥션 풀 (앱 수명 동안 하나)
+# ==========================================
+_client: httpx.AsyncClient = None
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(LLM_CHAT_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS),
+        headers=get_headers(),
+    )
+
+async def start_llm_client():
+    """앱 시작(lifespan) 시 호출"""
+    global _client
+    if _client is None:
+        _client = _create_client()
+        print("✅ LLM 클라이언트 생성")
+
+async def close_llm_client():
+    """앱 종료(lifespan) 시 호출"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        print("✅ LLM 클라이언트 종료")
+
+def get_llm_client() -> httpx.AsyncClient:
+    # lifespan 없이 쓰는 경우(CLI, 실험 스크립트)를 위해 없으면 지연 생성
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
 
-    url = (
+# ==========================================
+# 재시도 정책: 429 / 5xx / 네트워크 오류만, Retry-After 헤더 우선
+# ==========================================
+def _is_retryable(e: BaseException) -> bool:
+    if isinstance(e, httpx.TransportError):
+        return True
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code == 429 or e.response.status_code >= 500
+    return False
+
+def retry_after_seconds(response: httpx.Response) -> float:
+    """Azure는 retry-after-ms / retry-after 헤더로 대기 시간을 알려줌 (없으면 None)"""
+    if response is None:
+        return None
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = response.headers.get(header)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                continue
+    return None
+
+def _retry_wait(e: BaseException, attempt_number: int) -> float:
+    if isinstance(e, httpx.HTTPStatusError):
+        seconds = retry_after_seconds(e.response)
+        if seconds is not None:
+            return min(seconds, LLM_MAX_RETRY_WAIT)
+    # 헤더가 없으면 지터 포함 지수 백오프
+    return min(random.uniform(0, 2 ** attempt_number), LLM_MAX_RETRY_WAIT)
+
+# ==========================================
+# 호출 스케줄러: 배포별 속도 제한 + 우선순위 대기열
+# ==========================================
+scheduler = LLMScheduler({
+    AZURE_OPENAI_DEPLOYMENT: AZURE_OPENAI_RPM / LLM_RATE_WORKERS,
+    AZURE_DALLE_DEPLOYMENT: AZURE_DALLE_RPM / LLM_RATE_WORKERS,
+})
+
+async def _before_retry(e: BaseException, attempt: int, deployment: str):
+    wait = _retry_wait(e, attempt)
+    if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 429:
+        # 429면 같은 배포를 쓰는 다른 요청도 함께 멈춤 (대기는 다음 acquire에서)
+        scheduler.throttle(deployment, wait)
+    else:
+        # 요청 마감이 있으면 남은 시간보다 오래 기다리지 않음
+        deadline = current_deadline()
+        await asyncio.sleep(min(wait, deadline.remaining()) if deadline else wait)
+
+async def _post(url: str, payload: dict, timeout: float,
+                deployment: str = AZURE_OPENAI_DEPLOYMENT, priority: str = PRIORITY_FEEDBACK) -> dict:
+    for attempt in range(1, LLM_RETRIES + 1):
+        # 재시도도 다시 대기열을 거침 (요청 마감이 있으면 대기 / 호출 모두 남은 시간 안에서)
+        await within_deadline(scheduler.acquire(deployment, priority))
+        try:
+            response = await within_deadline(get_llm_client().post(url, json=payload, timeout=cap_timeout(timeout)))
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            if attempt >= LLM_RETRIES or not _is_retryable(e):
+                raise
+            await _before_retry(e, attempt, deployment)
+
+def _chat_url(api_version: str = API_VERSION) -> str:
+    return (
         f"{AZURE_OPENAI_ENDPOINT}"
         f"openai/deployments/{AZURE_OPENAI_DEPLOYMENT}/chat/completions"
-        f"?api-version={API_VERSION}"
+        f"?api-version={api_version}"
     )
 
-    headers = {
-        "Content-Type": "application/json",
-        "api-key": AZURE_OPENAI_API_KEY
-    }
+async def chat_completion(messages: list, timeout: float = LLM_CHAT_TIMEOUT, api_version: str = API_VERSION,
+                          priority: str = PRIORITY_FEEDBACK, **options) -> str:
+    """chat/completions 호출 후 첫 번째 답변 문자열 반환"""
+    result = await _post(_chat_url(api_version), {"messages": messages, **options}, timeout, priority=priority)
+    return result["choices"][0]["message"]["content"]
 
-    payload = {
-        "messages": [
-            {
-                "role": "system",
-                "content": (
-                    "너는 미국 수어(KSL) 학습자를 돕는 친절한 수어 코치야. "
-                    "틀렸으면 [정답 수어 특징]대로 사용자가 동작할 수 있도록 사용자에게 아주 짧지만 명확히 영어 1 문장으로 피드백해 줘. 표정이 명시되어 있으면 그것도 포함해서 알려줘. 강조 기호는 사용하지마."
-                )
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        "temperature": 0.4,
-        "max_tokens": 300
-    }
+async def stream_chat_completion(messages: list, timeout: float = LLM_CHAT_TIMEOUT, api_version: str = API_VERSION,
+                                 priority: str = PRIORITY_FEEDBACK, **options):
+    """
+    chat/completions 스트리밍 호출 → 생성되는 토큰(delta content)을 차례로 yield
+    재시도는 첫 토큰을 받기 전(연결 오류 / 429 / 5xx)까지만 (이미 내보낸 토큰은 되돌릴 수 없음)
+    """
+    payload = {"messages": messages, "stream": True, **options}
+    started = False
+    for attempt in range(1, LLM_RETRIES + 1):
+        await within_deadline(scheduler.acquire(AZURE_OPENAI_DEPLOYMENT, priority))
+        try:
+            async with get_llm_client().stream("POST", _chat_url(api_version), json=payload,
+                                               timeout=cap_timeout(timeout)) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
 
-    response = requests.post(url, headers=headers, json=payload)
-    response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        return
+                    # Azure는 첫 청크에 choices 없이 콘텐츠 필터 결과만 보내기도 함
+                    for choice in json.loads(data).get("choices") or []:
+                        content = (choice.get("delta") or {}).get("content")
+                        if content:
+                            started = True
+                            yield content
+                return
+        except Exception as e:
+            if started or attempt >= LLM_RETRIES or not _is_retryable(e):
+                raise
+            await _before_retry(e, attempt, AZURE_OPENAI_DEPLOYMENT)
 
-    result = response.json()
-    return result["choices"][0]["message"]["content"]
+def _feedback_messages(prompt: str) -> list:
+    return [
+        {
+            "role": "system",
+            "content": (
+                "너는 미국 수어(KSL) 학습자를 돕는 친절한 수어 코치야. "
+                "틀렸으면 [정답 수어 특징]대로 사용자가 동작할 수 있도록 사용자에게 아주 짧지만 명확히 영어 1 문장으로 피드백해 줘. 표정이 명시되어 있으면 그것도 포함해서 알려줘. 강조 기호는 사용하지마."
+            )
+        },
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
 
-# [NEW] 시나리오 생성용 (JSON 모드 지원)
-# 기존: import requests
-import httpx # pip install httpx
-import json
-import asyncio
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+# [기존 함수 유지] 피드백 생성용
+async def call_llm(prompt: str, max_tokens: int = FEEDBACK_MAX_TOKENS) -> str:
+    return await chat_completion(_feedback_messages(prompt), temperature=0.4, max_tokens=max_tokens)
 
-# 비동기 GPT 호출
-@retry(
-    stop=stop_after_attempt(3), 
-    wait=wait_exponential(multiplier=1, min=2, max=10),
-    retry=retry_if_exception_type(httpx.HTTPStatusError)
-)
-async def call_gpt_json_async(system_prompt: str, user_prompt: str) -> dict:
-    dalle_api_version = "2024-02-01"
-    url = f"{AZURE_OPENAI_ENDPOINT}openai/deployments/{AZURE_OPENAI_DEPLOYMENT}/chat/completions?api-version={dalle_api_version}"
-    
-    payload = {
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        "temperature": 0.7,
-        "response_format": {"type": "json_object"}
-    }
+# 피드백 생성 스트리밍 버전 (SSE 응답용)
+async def stream_llm(prompt: str, max_tokens: int = FEEDBACK_MAX_TOKENS):
+    async for token in stream_chat_completion(_feedback_messages(prompt), temperature=0.4, max_tokens=max_tokens):
+        yield token
+
+# [NEW] 표정 분류 등 이미지 입력용 (Vision)
+async def call_vision_llm_async(system_prompt: str, text: str, image_bytes: bytes, max_tokens: int = 10, detail: str = "auto") -> str:
+    image_base64 = base64.b64encode(image_bytes).decode("utf-8")
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": text},
+                # detail="low": 이미지 크기와 상관없이 고정된 적은 토큰만 사용
+                {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}", "detail": detail}}
+            ]
+        }
+    ]
+    return await chat_completion(messages, timeout=LLM_VISION_TIMEOUT, priority=PRIORITY_EXPRESSION, max_tokens=max_tokens, temperature=0)
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=get_headers(), json=payload, timeout=60.0)
-        response.raise_for_status()
-        content = response.json()["choices"][0]["message"]["content"]
-        return json.loads(content)
+# 여러 장의 이미지를 한 메시지로 보내는 Vision 호출 (이미지 순서 유지)
+async def call_vision_llm_multi_async(system_prompt: str, text: str, images: list, max_tokens: int = 50, detail: str = "auto") -> str:
+    content = [{"type": "text", "text": text}]
+    for image_bytes in images:
+        image_base64 = base64.b64encode(image_bytes).decode("utf-8")
+        content.append({"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}", "detail": detail}})
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": content}
+    ]
+    return await chat_completion(messages, timeout=LLM_VISION_TIMEOUT, priority=PRIORITY_EXPRESSION, max_tokens=max_tokens, temperature=0)
+
+# [NEW] 시나리오 생성용 (JSON 모드 지원)
+async def call_gpt_json_async(system_prompt: str, user_prompt: str) -> dict:
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    content = await chat_completion(
+        messages,
+        timeout=LLM_JSON_TIMEOUT,
+        api_version=JSON_API_VERSION,
+        priority=PRIORITY_SCENARIO,
+        temperature=0.7,
+        response_format={"type": "json_object"}
+    )
+    return json.loads(content)
 
 # 비동기 DALL-E 호출
-@retry(
-    stop=stop_after_attempt(3), 
-    wait=wait_exponential(multiplier=1, min=2, max=10),
-    retry=retry_if_exception_type(httpx.HTTPStatusError)
-)
 async def call_dalle_image_async(prompt: str) -> str:
     url = f"{AZURE_OPENAI_ENDPOINT}openai/deployments/{AZURE_DALLE_DEPLOYMENT}/images/generations?api-version={API_VERSION}"
-    
+
     payload = {
         "prompt": prompt,
         "n": 1,
@@ -104,8 +268,5 @@ async def call_dalle_image_async(prompt: str) -> str:
         "quality": "standard"
     }
 
-    # DALL-E는 오래 걸리므로 timeout을 길게(예: 30초~60초) 설정
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=get_headers(), json=payload, timeout=90.0)
-        response.raise_for_status()
-        return response.json()["data"][0]["url"]
\ No newline at end of file
+    result = await _post(url, payload, LLM_IMAGE_TIMEOUT, deployment=AZURE_DALLE_DEPLOYMENT, priority=PRIORITY_IMAGE)
+    return result["data"][0]["url"]
@@ -0,0 +1,196 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from collections import deque
+from app.utils.executors import Overloaded
+
+# Azure OpenAI 호출 스케줄러
+# 피드백 / 표정 / 시나리오 / 이미지 호출이 같은 배포를 나눠 쓰므로, 배포별로
+#   - 토큰 버킷으로 요청 속도 제한 (RPM)
+#   - 우선순위 대기열 (대화형 피드백이 시뮬레이션 생성에 밀리지 않게)
+#   - 대기열 상한 (낮은 우선순위부터 먼저 거절)
+#   - 429 Retry-After 동안 배포 전체 일시 정지
+# 를 한 곳에서 처리한다.
+PRIORITY_FEEDBACK = "feedback"
+PRIORITY_EXPRESSION = "expression"
+PRIORITY_SCENARIO = "scenario"
+PRIORITY_IMAGE = "image"
+
+# 숫자가 작을수록 먼저 처리
+PRIORITY_ORDER = {
+    PRIORITY_FEEDBACK: 0,
+    PRIORITY_EXPRESSION: 1,
+    PRIORITY_SCENARIO: 2,
+    PRIORITY_IMAGE: 3,
+}
+
+# 대기열 상한 중 각 우선순위가 쓸 수 있는 비율 (낮은 우선순위는 대기열이 반쯤 차면 거절)
+QUEUE_SHARE = {
+    PRIORITY_FEEDBACK: 1.0,
+    PRIORITY_EXPRESSION: 0.9,
+    PRIORITY_SCENARIO: 0.5,
+    PRIORITY_IMAGE: 0.5,
+}
+
+LLM_QUEUE_MAX = int(os.getenv("LLM_QUEUE_MAX", "200"))
+LLM_BURST_SECONDS = float(os.getenv("LLM_BURST_SECONDS", "2"))  # 버킷 크기 = 초당 허용량 x 이 값
+WAIT_SAMPLE_SIZE = 500
+
+
+class LLMQueueFull(Overloaded):
+    """대기열이 가득 차서 요청을 받지 못함 (retry_after: 권장 재시도 대기 초)"""
+
+    def __init__(self, deployment: str, priority: str, retry_after: float):
+        super().__init__(f"LLM 대기열 가득 참: {deployment} ({priority})", retry_after)
+        self.deployment = deployment
+        self.priority = priority
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate          # 초당 토큰
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # 429 Retry-After
+
+    def reserve(self) -> float:
+        """토큰 하나를 가져가면 0, 아니면 가져갈 수 있을 때까지 남은 초"""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+
+        if self.rate <= 0:
+            return 0.0
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class _Lane:
+    """배포 하나의 대기열 + 버킷 + 지표"""
+
+    def __init__(self, name: str, rpm: float):
+        rate = rpm / 60.0
+        self.name = name
+        self.bucket = TokenBucket(rate, max(1.0, rate * LLM_BURST_SECONDS))
+        self.heap = []
+        self.cond = None
+        self.loop = None
+        self.max_depth = 0
+        self.dispatched = {p: 0 for p in PRIORITY_ORDER}
+        self.rejected = {p: 0 for p in PRIORITY_ORDER}
+        self.waits = {p: deque(maxlen=WAIT_SAMPLE_SIZE) for p in PRIORITY_ORDER}
+        self.throttled = 0
+
+    def drain_seconds(self) -> float:
+        """지금 대기열이 다 빠지는 데 걸릴 대략적인 시간 (Retry-After 안내용, 최소 1초)"""
+        paused = max(0.0, self.bucket.blocked_until - time.monotonic())
+        drain = len(self.heap) / self.bucket.rate if self.bucket.rate > 0 else 0.0
+        return max(1.0, round(paused + drain, 1))
+
+    def depth(self, priority: str = None) -> int:
+        if priority is None:
+            return len(self.heap)
+        return sum(1 for entry in self.heap if entry[2] == priority)
+
+    def stats(self) -> dict:
+        waits = {}
+        for priority, samples in self.waits.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            waits[priority] = {
+                "avg_ms": round(sum(ordered) / len(ordered), 1),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+                "max_ms": round(ordered[-1], 1),
+            }
+        return {
+            "queue_depth": len(self.heap),
+            "queue_depth_by_priority": {p: self.depth(p) for p in PRIORITY_ORDER},
+            "max_queue_depth": self.max_depth,
+            "dispatched": self.dispatched,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+            "paused_sec": round(max(0.0, self.bucket.blocked_until - time.monotonic()), 2),
+            "wait": waits,
+        }
+
+
+class LLMScheduler:
+    def __init__(self, limits: dict, max_queue: int = LLM_QUEUE_MAX):
+        """limits: {배포 이름: 분당 요청 수}"""
+        self.limits = dict(limits)
+        self.max_queue = max_queue
+        self._lanes = {}
+        self._seq = itertools.count()
+
+    def _lane(self, deployment: str) -> _Lane:
+        lane = self._lanes.get(deployment)
+        if lane is None:
+            lane = _Lane(deployment, self.limits.get(deployment, 0))
+            self._lanes[deployment] = lane
+        # Condition은 이벤트 루프에 묶이므로, 스크립트에서 asyncio.run을 여러 번 쓰는 경우 새로 만듦
+        loop = asyncio.get_running_loop()
+        if lane.loop is not loop:
+            lane.loop = loop
+            lane.cond = asyncio.Condition()
+            lane.heap = []
+        return lane
+
+    async def acquire(self, deployment: str, priority: str = PRIORITY_FEEDBACK):
+        """우선순위 순서대로 토큰을 받을 때까지 대기"""
+        lane = self._lane(deployment)
+        limit = int(self.max_queue * QUEUE_SHARE.get(priority, 1.0))
+        if len(lane.heap) >= limit:
+            lane.rejected[priority] += 1
+            raise LLMQueueFull(deployment, priority, retry_after=lane.drain_seconds())
+
+        entry = [PRIORITY_ORDER.get(priority, len(PRIORITY_ORDER)), next(self._seq), priority]
+        enqueued = time.monotonic()
+
+        async with lane.cond:
+            heapq.heappush(lane.heap, entry)
+            lane.max_depth = max(lane.max_depth, len(lane.heap))
+            try:
+                while True:
+                    if lane.heap[0] is entry:
+                        wait = lane.bucket.reserve()
+                        if wait <= 0:
+                            heapq.heappop(lane.heap)
+                            break
+                        # 토큰이 찰 때까지 기다리되, 더 높은 우선순위가 들어오면 깨어나서 다시 확인
+                        try:
+                            await asyncio.wait_for(lane.cond.wait(), timeout=wait)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await lane.cond.wait()
+            except BaseException:
+                if entry in lane.heap:
+                    lane.heap.remove(entry)
+                    heapq.heapify(lane.heap)
+                lane.cond.notify_all()
+                raise
+            # 다음 순번이 바로 확인하도록
+            lane.cond.notify_all()
+
+        lane.dispatched[priority] += 1
+        lane.waits[priority].append((time.monotonic() - enqueued) * 1000)
+
+    def throttle(self, deployment: str, seconds: float):
+        """429 Retry-After: 해당 배포의 모든 대기 요청을 seconds 동안 멈춤"""
+        lane = self._lane(deployment)
+        lane.throttled += 1
+        lane.bucket.block(seconds)
+
+    def stats(self) -> dict:
+        return {name: lane.stats() for name, lane in self._lanes.items()}
@@ -0,0 +1,29 @@
+import os
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from app.services.image_store import image_store
+
+router = APIRouter()
+
+# 내용 해시가 곧 파일 이름이라 내용이 바뀌지 않음 → 오래 캐시
+IMAGE_CACHE_MAX_AGE = int(os.getenv("IMAGE_CACHE_MAX_AGE", str(365 * 24 * 3600)))
+
+
+@router.get("/images/{name}")
+async def get_image(name: str):
+    """
+    [GET] /api/images/{sha}.png       원본
+    [GET] /api/images/{sha}_{size}.jpg 썸네일
+    """
+    path = image_store.resolve(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="이미지를 찾을 수 없습니다.")
+
+    return FileResponse(
+        path,
+        media_type="image/jpeg" if name.endswith(".jpg") else "image/png",
+        headers={
+            "Cache-Control": f"public, max-age={IMAGE_CACHE_MAX_AGE}, immutable",
+            "ETag": f'"{name.split(".")[0]}"',
+        },
+    )
@@ -1,142 +1,245 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import StreamingResponse
 from app.models.schemas import LessonFeedbackRequest, LessonFeedbackResponse
 from app.services.feature_extractor import extract_feature_json
-from app.services.lesson_service import get_answer_frame, get_answer_frames,get_test_answer_frame
+from app.services.lesson_service import get_test_answer_frame
+from app.services.answer_repository import get_answer_repository
 from app.services.evaluation_service import evaluate_static_sign, evaluate_dynamic_sign
-from app.services.feedback_service import generate_feedback
+from app.services.feedback_service import generate_feedback, stream_feedback
 from app.utils.mediapipe_adapter import build_mediapipe_results_from_request
 from app.services.mediapipe_service import process_image_to_landmarks
-from app.services.expression_analyzation_service import analyze_expression, analyze_expression_with_llm
+from app.services.expression_analyzation_service import classify_expression, classify_expressions
+from app.utils.sse import sse_event, SSE_HEADERS
+from app.utils.executors import Overloaded, cpu_executor
+from app.utils.deadline import start_deadline, skipped_stages
 from typing import List
-from fastapi.concurrency import run_in_threadpool
 
 router = APIRouter()
 
-@router.post("/{lessonId}/feedback", response_model=LessonFeedbackResponse)
-async def lesson_feedback(lessonId: int, req: LessonFeedbackRequest):
+# ==========================================
+# 채점 (일반 / 스트리밍 엔드포인트 공용)
+# ==========================================
+def _landmarks_to_feature(raw_landmarks) -> dict:
+    results = build_mediapipe_results_from_request(raw_landmarks)
+    return extract_feature_json(results)
 
-    results = build_mediapipe_results_from_request(req.raw_landmarks)
 
-    # 1. raw landmarks → feature json
-    user_feature = extract_feature_json(results)
+async def _evaluate_landmarks(lessonId: int, req: LessonFeedbackRequest) -> dict:
+    # 1. raw landmarks → feature json (CPU 실행기)
+    user_feature = await cpu_executor.run(_landmarks_to_feature, req.raw_landmarks)
 
     # 2. 정답 frame 조회
     # answer_feature = get_test_answer()
-    answer_feature = get_answer_frame(lessonId)
+    answer_feature = await get_answer_repository().get_answer_frame(lessonId)
 
     # 3. 정답 여부 판단
-    result = evaluate_static_sign(user_feature, answer_feature)
+    return evaluate_static_sign(user_feature, answer_feature)
+
+
+async def _evaluate_image(lessonId: int, file: UploadFile) -> dict:
+    # 1. 이미지 읽기
+    image_bytes = await file.read()
+
+    # 2. 이미지 -> MediaPipe 추론 -> DummyResults 변환 (어댑터 사용, CPU 실행기)
+    results = await cpu_executor.run(process_image_to_landmarks, image_bytes)
+
+    # 3. raw landmarks → feature json (기존 로직 재사용)
+    # user_feature = extract_feature_json(results)
+
+    expression = await classify_expression(results, image_bytes)
+    user_feature = await cpu_executor.run(extract_feature_json, results, expression)
+
+    # 4. 정답 frame 조회 (DB/API)
+    answer_feature = await get_answer_repository().get_answer_frame(lessonId)
+
+    # 5. 정답 여부 판단
+    return evaluate_static_sign(user_feature, answer_feature)
+
+
+async def _evaluate_images(lessonId: int, files: List[UploadFile]) -> dict:
+    if not files:
+        raise HTTPException(status_code=400, detail="이미지가 없습니다.")
+
+    # 1. 사용자 이미지 처리 (Loop)
+    processed = []
+    for file in files:
+        image_bytes = await file.read()
+        # MediaPipe 처리 (CPU 실행기)
+        results = await cpu_executor.run(process_image_to_landmarks, image_bytes)
+        processed.append((results, image_bytes))
+
+    # 표정은 시도 단위로 결정 (얼굴이 거의 그대로면 앞 프레임 라벨 재사용)
+    expressions, _ = await classify_expressions(processed)
+
+    # Feature JSON 추출
+    # feature = extract_feature_json(results)
+    user_frames = [
+        await cpu_executor.run(extract_feature_json, results, expression)
+        for (results, _), expression in zip(processed, expressions)
+    ]
+
+    # 2. 정답 데이터 리스트 조회
+    answer_frames = await get_answer_repository().get_answer_frames(lessonId)
+
+    if not answer_frames:
+         raise HTTPException(status_code=404, detail="정답 데이터를 찾을 수 없습니다.")
+
+    # 3. 채점 (Dynamic Evaluation)
+    # 피드백은 '가장 점수가 낮은(많이 틀린) 프레임'의 wrong_parts 기준으로 생성됨
+    return evaluate_dynamic_sign(user_frames, answer_frames)
+
+
+async def _feedback_events(result: dict, lessonId: int):
+    """
+    SSE 이벤트 흐름
+      score : 채점 결과 (즉시)
+      token : 피드백 조각 (LLM 스트림이 만드는 대로)
+      done  : 완성된 피드백 전체 + 요청 마감 때문에 건너뛴 단계 (skipped)
+      error : 피드백 생성 실패 (점수는 이미 전달됨)
+    """
+    yield sse_event("score", {"isCorrect": result["is_correct"], "score": result["score"]})
+
+    chunks = []
+    try:
+        async for token in stream_feedback(evaluation=result, lesson_id=lessonId):
+            chunks.append(token)
+            yield sse_event("token", {"text": token})
+    except Exception as e:
+        print(f"Error streaming feedback: {e}")
+        yield sse_event("error", {"detail": "피드백 생성 중 오류가 발생했습니다."})
+        return
+
+    yield sse_event("done", {"feedback": "".join(chunks), "skipped": skipped_stages()})
+
+
+def _event_stream_response(result: dict, lessonId: int) -> StreamingResponse:
+    return StreamingResponse(
+        _feedback_events(result, lessonId),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+@router.post("/{lessonId}/feedback", response_model=LessonFeedbackResponse)
+async def lesson_feedback(lessonId: int, req: LessonFeedbackRequest):
+    start_deadline()
+    result = await _evaluate_landmarks(lessonId, req)
 
     # 4. 자연어 피드백 생성
-    feedback = await run_in_threadpool(
-        generate_feedback,
-        lesson_id=lessonId,
-        user_feature=user_feature,
-        answer_feature=answer_feature,
-        evaluation=result
+    feedback = await generate_feedback(
+        evaluation=result,
+        lesson_id=lessonId
     )
 
     return LessonFeedbackResponse(
         isCorrect=result["is_correct"],
         score=result["score"],
-        feedback=feedback
+        feedback=feedback,
+        skipped=skipped_stages()
     )
 
 
+@router.post("/{lessonId}/feedback/stream")
+async def lesson_feedback_stream(lessonId: int, req: LessonFeedbackRequest):
+    """/feedback 의 SSE 버전: 점수를 먼저 보내고 피드백은 토큰 단위로 스트리밍"""
+    start_deadline()
+    result = await _evaluate_landmarks(lessonId, req)
+    return _event_stream_response(result, lessonId)
+
+
 @router.post("/{lessonId}/feedback/image", response_model=LessonFeedbackResponse)
 async def lesson_feedback_by_image(
-    lessonId: int, 
+    lessonId: int,
     file: UploadFile = File(...)
 ):
+    start_deadline()
     try:
-        # 1. 이미지 읽기
-        image_bytes = await file.read()
-        
-        # 2. 이미지 -> MediaPipe 추론 -> DummyResults 변환 (어댑터 사용)
-        results = process_image_to_landmarks(image_bytes)
-
-        # 3. raw landmarks → feature json (기존 로직 재사용)
-        # user_feature = extract_feature_json(results)
-        
-        expression = await run_in_threadpool(analyze_expression_with_llm, image_bytes)
-        user_feature = extract_feature_json(results, expression)
-
-        # 4. 정답 frame 조회 (DB/API)
-        answer_feature = get_answer_frame(lessonId)
-
-        # 5. 정답 여부 판단
-        result = evaluate_static_sign(user_feature, answer_feature)
+        result = await _evaluate_image(lessonId, file)
 
         # 6. 자연어 피드백 생성
-        feedback = await run_in_threadpool(
-            generate_feedback,
-            evaluation=result
+        feedback = await generate_feedback(
+            evaluation=result,
+            lesson_id=lessonId
         )
 
         return LessonFeedbackResponse(
             isCorrect=result["is_correct"],
             score=result["score"],
-            feedback=feedback
+            feedback=feedback,
+            skipped=skipped_stages()
         )
 
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
+    except Overloaded:
+        raise
     except Exception as e:
         print(f"Error processing image feedback: {e}")
         raise HTTPException(status_code=500, detail="이미지 처리 중 오류가 발생했습니다.")
-    
-@router.post("/{lessonId}/feedback/images", response_model=LessonFeedbackResponse)
-async def lesson_feedback_by_multiple_images(
-    lessonId: int, 
-    files: List[UploadFile] = File(...)
-):
-    try:
-        if not files:
-            raise HTTPException(status_code=400, detail="이미지가 없습니다.")
 
-        # 1. 사용자 이미지 처리 (Loop)
-        user_frames = []
-        for file in files:
-            image_bytes = await file.read()
-            # MediaPipe 처리
-            results = process_image_to_landmarks(image_bytes)
-            # Feature JSON 추출
-            # feature = extract_feature_json(results)
 
-            expression = await run_in_threadpool(analyze_expression_with_llm, image_bytes)
-            user_feature = extract_feature_json(results, expression)
+@router.post("/{lessonId}/feedback/image/stream")
+async def lesson_feedback_by_image_stream(
+    lessonId: int,
+    file: UploadFile = File(...)
+):
+    start_deadline()
+    try:
+        result = await _evaluate_image(lessonId, file)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Overloaded:
+        raise
+    except Exception as e:
+        print(f"Error processing image feedback: {e}")
+        raise HTTPException(status_code=500, detail="이미지 처리 중 오류가 발생했습니다.")
 
-            user_frames.append(user_feature)
+    return _event_stream_response(result, lessonId)
 
-        # 2. 정답 데이터 리스트 조회
-        answer_frames = get_answer_frames(lessonId)
 
-        if not answer_frames:
-             raise HTTPException(status_code=404, detail="정답 데이터를 찾을 수 없습니다.")
+@router.post("/{lessonId}/feedback/images", response_model=LessonFeedbackResponse)
+async def lesson_feedback_by_multiple_images(
+    lessonId: int,
+    files: List[UploadFile] = File(...)
+):
+    start_deadline()
+    try:
+        result = await _evaluate_images(lessonId, files)
 
-        # 3. 채점 (Dynamic Evaluation)
-        result = evaluate_dynamic_sign(user_frames, answer_frames)
-        
         # 4. 피드백 생성 전략
         # 모든 프레임을 다 LLM에 넣으면 너무 길어지므로,
         # '가장 점수가 낮은(많이 틀린) 프레임'을 기준으로 피드백을 생성합니다.
-        target_idx = result["worst_frame_idx"]
-        
-        # 인덱스 범위 안전 장치
-        if target_idx >= len(user_frames) or target_idx >= len(answer_frames):
-            target_idx = 0
-
-        feedback = await run_in_threadpool( 
-            generate_feedback,
-            evaluation=result
+        feedback = await generate_feedback(
+            evaluation=result,
+            lesson_id=lessonId
         )
 
         return LessonFeedbackResponse(
             isCorrect=result["is_correct"],
             score=result["score"],
-            feedback=feedback
+            feedback=feedback,
+            skipped=skipped_stages()
         )
 
+    except Overloaded:
+        raise
     except Exception as e:
         print(f"Error processing multiple images: {e}")
-        raise HTTPException(status_code=500, detail=f"처리 중 오류 발생: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"처리 중 오류 발생: {str(e)}")
+
+
+@router.post("/{lessonId}/feedback/images/stream")
+async def lesson_feedback_by_multiple_images_stream(
+    lessonId: int,
+    files: List[UploadFile] = File(...)
+):
+    start_deadline()
+    try:
+        result = await _evaluate_images(lessonId, files)
+    except (HTTPException, Overloaded):
+        raise
+    except Exception as e:
+        print(f"Error processing multiple images: {e}")
+        raise HTTPException(status_code=500, detail=f"처리 중 오류 발생: {str(e)}")
+
+    return _event_stream_response(result, lessonId)
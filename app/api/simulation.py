@@ -1,10 +1,39 @@
+import os
+import asyncio
 from fastapi import APIRouter, HTTPException
-from app.models.schemas import SimulationRequest, SimulationResponse
-from app.services.simulation_service import generate_simulation_scenario
-from app.services.lesson_service import get_lesson_word 
+from fastapi.responses import StreamingResponse
+from app.models.schemas import SimulationRequest, SimulationResponse, SimulationJobResponse
+from app.services.simulation_service import get_simulation_scenario
+from app.services.simulation_jobs import create_simulation_job, get_simulation_job, wait_job_image
+from app.services.answer_repository import get_answer_repository
+from app.utils.sse import sse_event, SSE_HEADERS
+from app.utils.executors import Overloaded
 
 router = APIRouter()
 
+# SSE로 이미지를 기다리는 최대 시간 / 연결 유지용 ping 간격 (초)
+SIMULATION_IMAGE_WAIT = float(os.getenv("SIMULATION_IMAGE_WAIT", "180"))
+SSE_PING_INTERVAL = float(os.getenv("SSE_PING_INTERVAL", "15"))
+
+
+async def _resolve_lesson_words(req: SimulationRequest) -> dict:
+    # Lesson ID로 실제 백엔드에서 단어 이름 조회 (동시 일괄 조회)
+    print(f"🔍 시뮬레이션 요청 수신: ID 목록 {req.lesson_ids}")
+
+    lesson_words = await get_answer_repository().get_lesson_words(req.lesson_ids)
+
+    for lid in req.lesson_ids:
+        if lid not in lesson_words:
+            print(f"⚠️ 경고: 레슨 ID {lid}에 해당하는 단어를 가져오지 못했습니다. 시뮬레이션에서 제외됩니다.")
+
+    # 조회된 단어가 하나도 없으면 에러 처리
+    if not lesson_words:
+        raise HTTPException(status_code=400, detail="유효한 레슨 단어를 찾을 수 없습니다. (DB 조회 실패 또는 잘못된 ID)")
+
+    print(f"🤖 AI 생성 시작 (사용 단어: {lesson_words})")
+    return lesson_words
+
+
 @router.post("/simulation", response_model=SimulationResponse)
 async def create_simulation(req: SimulationRequest):
     """
@@ -12,31 +41,77 @@ async def create_simulation(req: SimulationRequest):
     오늘 배운 Lesson ID 리스트를 받아 시뮬레이션 생성
     """
     try:
-        # 1. Lesson ID로 실제 백엔드에서 단어 이름 조회
-        lesson_words = {}
-        
-        print(f"🔍 시뮬레이션 요청 수신: ID 목록 {req.lesson_ids}")
-
-        for lid in req.lesson_ids:
-            # 실제 API 호출
-            word = get_lesson_word(lid)
-            
-            if word:
-                lesson_words[lid] = word
-            else:
-                print(f"⚠️ 경고: 레슨 ID {lid}에 해당하는 단어를 가져오지 못했습니다. 시뮬레이션에서 제외됩니다.")
-        
-        # 조회된 단어가 하나도 없으면 에러 처리
-        if not lesson_words:
-            raise HTTPException(status_code=400, detail="유효한 레슨 단어를 찾을 수 없습니다. (DB 조회 실패 또는 잘못된 ID)")
-
-        print(f"🤖 AI 생성 시작 (사용 단어: {lesson_words})")
-
-        # 2. AI 서비스 호출 (기존 로직 동일)
-        result = await generate_simulation_scenario(lesson_words)
-        
+        # 1. 단어 조회
+        lesson_words = await _resolve_lesson_words(req)
+
+        # 2. AI 서비스 호출 (같은 레슨 조합의 캐시된 시나리오가 있으면 재사용)
+        result = await get_simulation_scenario(lesson_words)
+
         return result
 
+    except (HTTPException, Overloaded):
+        raise
     except Exception as e:
         print(f"❌ 시뮬레이션 API 에러: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/simulation/jobs", response_model=SimulationJobResponse)
+async def create_simulation_job_api(req: SimulationRequest):
+    """
+    [POST] /api/simulation/jobs
+    시나리오(상황 + 대화)가 만들어지면 바로 응답, image_url은 작업 ID로 나중에 조회
+    """
+    try:
+        lesson_words = await _resolve_lesson_words(req)
+        job = await create_simulation_job(lesson_words)
+        return job.to_dict()
+
+    except (HTTPException, Overloaded):
+        raise
+    except Exception as e:
+        print(f"❌ 시뮬레이션 작업 API 에러: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _get_job_or_404(job_id: str):
+    job = await get_simulation_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="시뮬레이션 작업을 찾을 수 없습니다. (만료되었거나 잘못된 ID)")
+    return job
+
+
+@router.get("/simulation/jobs/{job_id}", response_model=SimulationJobResponse)
+async def get_simulation_job_api(job_id: str):
+    """[GET] 폴링: image_status가 ready / failed가 될 때까지 조회"""
+    return (await _get_job_or_404(job_id)).to_dict()
+
+
+@router.get("/simulation/jobs/{job_id}/events")
+async def simulation_job_events(job_id: str):
+    """
+    [GET] SSE
+      scenario : 상황 + 대화 (즉시)
+      image    : image_url / image_status (이미지 완료 또는 실패 시)
+    """
+    job = await _get_job_or_404(job_id)
+
+    async def events():
+        nonlocal job
+        yield sse_event("scenario", job.to_dict())
+
+        deadline = asyncio.get_running_loop().time() + SIMULATION_IMAGE_WAIT
+        while not job.image_done.is_set():
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                yield sse_event("error", {"detail": "이미지 생성 대기 시간이 초과되었습니다.", "job_id": job.job_id})
+                return
+            job = await wait_job_image(job, min(SSE_PING_INTERVAL, remaining))
+            if not job.image_done.is_set():
+                # 프록시가 유휴 연결을 끊지 않도록 주석 한 줄
+                yield ": ping\n\n"
+
+        yield sse_event("image", {"job_id": job.job_id, "image_url": job.image_url,
+                                  "image_status": job.image_status, "error": job.error})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
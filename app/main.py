@@ -1,11 +1,48 @@
-from fastapi import FastAPI
+import math
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.lesson_feedback import router as lessons_router
 from app.api.simulation import router as simulation_router
+from app.api.images import router as images_router
+from app.services.lesson_service import get_answer_cache_stats, get_title_cache_stats, get_singleflight_stats
+from app.services.backend_client import start_backend_client, close_backend_client
+from app.ai.llm_client import start_llm_client, close_llm_client, scheduler as llm_scheduler
+from app.services.lesson_catalog import start_catalog, stop_catalog, get_snapshot_stats
+from app.services.feedback_cache import feedback_cache
+from app.services.feedback_service import feedback_stats
+from app.services.feedback_table import feedback_table
+from app.services.simulation_jobs import stop_simulation_jobs, get_simulation_job_stats
+from app.services.simulation_service import start_scenario_pregen, stop_scenario_pregen, scenario_store, dialogue_stats
+from app.services.image_store import image_store
+from app.utils.executors import Overloaded, shutdown_executors, get_executor_stats
+from app.services.expression_analyzation_service import expression_stats, expression_image_stats
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 공용 커넥션 풀은 앱 수명 동안 하나만 유지
+    await start_backend_client()
+    await start_llm_client()
+    # 레슨 카탈로그 스냅샷 매핑 + 백그라운드 증분 갱신
+    await start_catalog()
+    # 오프라인 배치로 미리 만든 피드백 테이블 (app.serve 로 띄우면 부모가 이미 읽어 둠)
+    if feedback_table.path is None:
+        feedback_table.load()
+    # 인기 레슨 조합 시나리오를 한가한 시간대에 미리 생성
+    await start_scenario_pregen()
+    yield
+    await stop_scenario_pregen()
+    await stop_simulation_jobs()
+    await stop_catalog()
+    await close_llm_client()
+    await close_backend_client()
+    shutdown_executors()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(lessons_router, prefix="/api/lessons")
 app.include_router(simulation_router, prefix="/api", tags=["Simulation"])
+app.include_router(images_router, prefix="/api", tags=["Images"])
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -14,6 +51,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """실행기 / LLM 대기열이 가득 참 → 기다리게 하지 않고 바로 503"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "서버가 혼잡합니다. 잠시 후 다시 시도해 주세요."},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+@app.get("/metrics")
+async def metrics():
+    """캐시 등 내부 지표 조회"""
+    return {
+        "answer_cache": get_answer_cache_stats(),
+        "title_cache": get_title_cache_stats(),
+        "backend_singleflight": get_singleflight_stats(),
+        "lesson_snapshot": get_snapshot_stats(),
+        "feedback_cache": feedback_cache.stats(),
+        "feedback_table": feedback_table.stats(),
+        "expression_sources": expression_stats,
+        "expression_images": expression_image_stats,
+        "llm_scheduler": llm_scheduler.stats(),
+        "executors": get_executor_stats(),
+        "simulation_jobs": get_simulation_job_stats(),
+        "scenario_cache": scenario_store.stats(),
+        "simulation_dialogue": dialogue_stats,
+        "image_store": image_store.stats(),
+        "feedback_sources": feedback_stats,
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
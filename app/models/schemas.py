@@ -67,6 +67,7 @@ class LessonFeedbackResponse(BaseModel):
     isCorrect: bool
     score: float
     feedback: str
+    skipped: List[str] = []  # 요청 마감 때문에 건너뛴 단계 (expression_llm / feedback_llm / feedback)
 
 # [요청] 프론트가 보낼 데이터: 오늘 배운 레슨 ID 목록
 class SimulationRequest(BaseModel):
@@ -82,4 +83,12 @@ class DialogueLine(BaseModel):
 class SimulationResponse(BaseModel):
     situation: str          # 상황 설명 (예: "따뜻한 겨울날...")
     image_url: str          # DALL-E 생성 이미지 URL
-    dialogue: List[DialogueLine] # 대화 흐름 리스트
\ No newline at end of file
+    dialogue: List[DialogueLine] # 대화 흐름 리스트
+
+# [응답] 비동기 시뮬레이션 작업: 시나리오 먼저, 이미지는 준비되면 (폴링 / SSE)
+class SimulationJobResponse(BaseModel):
+    job_id: str
+    situation: str
+    dialogue: List[DialogueLine]
+    image_url: Optional[str] = None   # 이미지 준비 전에는 null
+    image_status: str                 # "pending" | "ready" | "failed"
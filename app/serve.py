@@ -0,0 +1,277 @@
+import os
+
+# 운영용 pre-fork 실행 진입점
+#   python -m app.serve --workers 4 --port 8000
+# 부모 프로세스가 무거운 것들(MediaPipe / OpenCV / numpy 라이브러리, 앱 모듈, 레슨 카탈로그 스냅샷,
+# 사전 생성 피드백 테이블, 로컬 표정 분류기 가중치)을 한 번만 올린 뒤 워커 N개를 fork 한다.
+# 워커들은 이 메모리를 copy-on-write로 공유하므로, 독립 프로세스 N개보다 노드 메모리와 시작 시간이 줄어든다.
+# MediaPipe Holistic 그래프(모델 가중치 + 내부 스레드)는 fork 후에 쓸 수 없으므로 공유하지 않고,
+# 워커의 실행기 스레드마다 처음 요청 때 한 번 만들어 재사용한다 (mediapipe_service.get_holistic).
+# (비교 측정: experiments/serving_benchmark.py)
+#
+# 신호
+#   SIGTERM / SIGINT : 워커들이 처리 중인 요청을 마치고 종료 (graceful)
+#   SIGHUP           : 테이블 / 스냅샷 / 모델을 다시 읽고 워커를 하나씩 교체 (새 워커가 준비된 뒤 이전 워커 종료)
+#                      → 리스닝 소켓은 부모가 계속 들고 있으므로 교체 중에도 연결이 끊기지 않음
+# 코드 배포는 프로세스 매니저(systemd 등)에서 부모를 재시작한다.
+#
+# 워커별로 따로 도는 상태
+#   - LLM 스케줄러: 분당 요청 수 상한을 워커 수로 나눠서 사용 (SERVE_WORKER_COUNT)
+#   - 시나리오 사전 생성: 0번 워커만 (SERVE_WORKER_INDEX)
+#   - 시뮬레이션 작업: 같은 소켓을 나눠 받으므로 폴링 / SSE가 다른 워커로 갈 수 있음
+#                      → 워커가 2개 이상이면 SIMULATION_JOB_DB(SQLite)로 상태 공유
+
+# 워커당 스레드 수: 라이브러리가 스레드 풀을 만들기 전에(= numpy / cv2 import 전에) 정해야 한다.
+WORKER_THREADS = os.getenv("SERVE_WORKER_THREADS", "1")
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS",
+             "VECLIB_MAXIMUM_THREADS", "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS"):
+    os.environ.setdefault(_var, WORKER_THREADS)
+os.environ.setdefault("CPU_EXECUTOR_WORKERS", WORKER_THREADS)
+
+import gc
+import time
+import select
+import signal
+import socket
+import argparse
+import uvicorn
+
+SERVE_HOST = os.getenv("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = int(os.getenv("SERVE_PORT", "8000"))
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", str(os.cpu_count() or 1)))
+SERVE_BACKLOG = int(os.getenv("SERVE_BACKLOG", "2048"))
+SERVE_GRACEFUL_TIMEOUT = float(os.getenv("SERVE_GRACEFUL_TIMEOUT", "30"))  # 종료 시 처리 중인 요청을 기다리는 최대 시간
+SERVE_READY_TIMEOUT = float(os.getenv("SERVE_READY_TIMEOUT", "60"))        # 새 워커가 준비될 때까지 기다리는 최대 시간
+SERVE_PIN_CPUS = os.getenv("SERVE_PIN_CPUS", "false").lower() == "true"   # 워커별 CPU 고정 (MediaPipe 스레드까지 묶임)
+SERVE_JOB_DB = os.getenv("SERVE_JOB_DB", "simulation_jobs.db")            # 워커 간 시뮬레이션 작업 공유 파일
+SERVE_JOB_DRAIN_TIMEOUT = float(os.getenv("SIMULATION_JOB_DRAIN_TIMEOUT", "30"))  # 워커 종료 시 이미지 생성 대기 (simulation_jobs)
+SERVE_RESPAWN_DELAY = 1.0
+
+
+def preload():
+    """fork 전에 부모에서 한 번만 올려 두는 것들 (다시 부르면 파일에서 새로 읽음)"""
+    start = time.perf_counter()
+
+    import cv2
+    import mediapipe  # noqa: F401  (네이티브 라이브러리만 부모에서 로드, 그래프는 워커에서 생성)
+    from app.main import app
+    from app.services import expression_analyzation_service
+    from app.services.lesson_catalog import load_snapshot
+    from app.services.feedback_table import feedback_table
+
+    cv2.setNumThreads(int(WORKER_THREADS))
+    load_snapshot()
+    feedback_table.load()
+    expression_analyzation_service._classifier = None
+    expression_analyzation_service._backend = None
+    expression_analyzation_service.expression_backend()
+
+    # 이후 만들어지는 객체만 GC 대상으로 (공유 페이지가 GC 참조 갱신으로 복사되는 것을 줄임)
+    gc.collect()
+    gc.freeze()
+    print(f"✅ 사전 로드 완료 ({(time.perf_counter() - start) * 1000:.0f}ms)")
+    return app
+
+
+class _WorkerServer(uvicorn.Server):
+    """시작이 끝나면 부모에게 알리는 uvicorn 서버 (무중단 교체용)"""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if self.started:
+            try:
+                os.write(self.ready_fd, b"1")
+            except OSError:
+                pass  # 부모가 이미 기다리기를 포기함 (준비 시간 초과) → 알림 없이 계속 동작
+            finally:
+                os.close(self.ready_fd)
+
+
+def _pin_worker(index: int):
+    cpus = sorted(os.sched_getaffinity(0))
+    per_worker = max(1, int(WORKER_THREADS))
+    start = (index * per_worker) % len(cpus)
+    os.sched_setaffinity(0, cpus[start:start + per_worker] or cpus)
+
+
+def _run_worker(app, sock: socket.socket, index: int, ready_fd: int):
+    # 부모의 신호 처리기를 물려받지 않도록 초기화 (uvicorn이 자체 처리기를 설치)
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(sig, signal.SIG_DFL)
+    os.environ["SERVE_WORKER_INDEX"] = str(index)
+
+    import cv2
+    cv2.setNumThreads(int(WORKER_THREADS))
+    if SERVE_PIN_CPUS and hasattr(os, "sched_setaffinity"):
+        _pin_worker(index)
+
+    config = uvicorn.Config(app, lifespan="on", timeout_graceful_shutdown=SERVE_GRACEFUL_TIMEOUT)
+    _WorkerServer(config, ready_fd).run(sockets=[sock])
+
+
+class Arbiter:
+    def __init__(self, app, sock: socket.socket, workers: int):
+        self.app = app
+        self.sock = sock
+        self.size = workers
+        self.workers = {}  # pid -> 워커 번호
+        self.ready_fds = {}  # 다시 띄운 워커의 준비 알림 fd -> 워커 번호 (루프에서 비움)
+        self.stopping = False
+        self.reload_requested = False
+
+    def spawn(self, index: int):
+        """워커 fork → (pid, 준비 알림 fd)"""
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            code = 0
+            try:
+                _run_worker(self.app, self.sock, index, ready_w)
+            except BaseException as e:
+                print(f"❌ 워커 {index} 비정상 종료: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+
+        os.close(ready_w)
+        self.workers[pid] = index
+        print(f"👷 워커 {index} 시작 (pid {pid})")
+        return pid, ready_r
+
+    @staticmethod
+    def wait_ready(ready_fd: int, timeout: float = SERVE_READY_TIMEOUT) -> bool:
+        try:
+            readable, _, _ = select.select([ready_fd], [], [], timeout)
+            return bool(readable) and os.read(ready_fd, 1) == b"1"
+        finally:
+            os.close(ready_fd)
+
+    def stop_worker(self, pid: int, timeout: float = SERVE_GRACEFUL_TIMEOUT + SERVE_JOB_DRAIN_TIMEOUT + 5,
+                    send: bool = True):
+        """
+        SIGTERM → 처리 중인 요청을 마칠 때까지 대기, 시간을 넘기면 SIGKILL
+        워커는 요청을 마친 뒤(lifespan 종료) 진행 중인 이미지 생성도 기다리므로 그 시간까지 포함
+        """
+        if send:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            time.sleep(0.1)
+        else:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.workers.pop(pid, None)
+
+    def reload(self):
+        """데이터를 다시 읽고 워커를 하나씩 교체"""
+        print("🔄 재시작 요청: 사전 로드 데이터 갱신 후 워커 순차 교체")
+        gc.unfreeze()
+        self.app = preload()
+        for old_pid, index in list(self.workers.items()):
+            new_pid, ready_fd = self.spawn(index)
+            if not self.wait_ready(ready_fd):
+                print(f"❌ 새 워커 {index}가 준비되지 않아 교체 중단 (이전 워커 유지)")
+                self.stop_worker(new_pid)
+                return
+            self.stop_worker(old_pid)
+
+    def reap(self):
+        """죽은 워커 회수 후 같은 번호로 다시 띄움"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            index = self.workers.pop(pid, None)
+            if index is not None and not self.stopping:
+                print(f"⚠️ 워커 {index} 종료됨 (pid {pid}, status {status}) → 다시 시작")
+                time.sleep(SERVE_RESPAWN_DELAY)
+                _, ready_fd = self.spawn(index)
+                # 읽는 쪽을 바로 닫으면 워커의 준비 알림이 EPIPE로 실패하므로 루프에서 읽고 닫음
+                self.ready_fds[ready_fd] = index
+
+    def drain_ready(self):
+        """다시 띄운 워커의 준비 알림 확인 (기다리지 않음)"""
+        if not self.ready_fds:
+            return
+        readable, _, _ = select.select(list(self.ready_fds), [], [], 0)
+        for fd in readable:
+            index = self.ready_fds.pop(fd)
+            if os.read(fd, 1) == b"1":
+                print(f"✅ 워커 {index} 준비 완료")
+            os.close(fd)  # 알림 없이 닫혔으면(EOF) 워커가 죽은 것 → reap에서 처리
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+
+        ready = [self.spawn(i) for i in range(self.size)]
+        for _, ready_fd in ready:
+            self.wait_ready(ready_fd)
+        print(f"🚀 워커 {len(self.workers)}개 준비 완료")
+
+        while not self.stopping:
+            if self.reload_requested:
+                self.reload_requested = False
+                self.reload()
+            self.reap()
+            self.drain_ready()
+            time.sleep(0.5)
+
+        print("🛑 종료 중: 처리 중인 요청을 마칠 때까지 대기")
+        # 한꺼번에 종료 신호를 보내고 각각 기다림
+        for pid in list(self.workers):
+            os.kill(pid, signal.SIGTERM)
+        for pid in list(self.workers):
+            self.stop_worker(pid, send=False)
+        for fd in self.ready_fds:
+            os.close(fd)
+        self.ready_fds.clear()
+        self.sock.close()
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+
+    def _on_reload(self, signum, frame):
+        self.reload_requested = True
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(SERVE_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pre-fork 멀티 워커 서버")
+    parser.add_argument("--host", default=SERVE_HOST)
+    parser.add_argument("--port", type=int, default=SERVE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS)
+    args = parser.parse_args()
+
+    # 앱 모듈을 import 하기 전에(= preload 전에) 정해야 하는 워커 공통 설정
+    os.environ["SERVE_WORKER_COUNT"] = str(args.workers)
+    if args.workers > 1:
+        os.environ.setdefault("SIMULATION_JOB_DB", SERVE_JOB_DB)
+
+    sock = bind_socket(args.host, args.port)
+    app = preload()
+    print(f"📡 {args.host}:{args.port} 리스닝, 워커 {args.workers}개 (워커당 스레드 {WORKER_THREADS})")
+    Arbiter(app, sock, args.workers).run()
@@ -0,0 +1,324 @@
+import os
+import json
+import sqlite3
+import asyncio
+import argparse
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+from app.services import lesson_service
+from app.services.lesson_service import parse_answer_frame, parse_answer_frames
+from app.services.lesson_catalog import _fetch_lesson_list
+from app.utils.executors import io_executor
+from app.utils.feature_codec import FeatureVocabulary, encode_frame, decode_frame
+
+# 정답 데이터 저장소 (교체 가능한 백엔드)
+#   http   : 기존 백엔드 API (캐시 / 스냅샷 / single-flight 포함)
+#   json   : JSON 파일 디렉토리 (answers/ 같은 구조)
+#   sqlite : 압축된 특징 벡터 + 레슨 메타데이터를 담은 로컬 SQLite 파일 (엣지 / 부하 테스트용)
+ANSWER_REPOSITORY = os.getenv("ANSWER_REPOSITORY", "http")
+ANSWER_JSON_DIR = os.getenv("ANSWER_JSON_DIR", str(Path(__file__).resolve().parent.parent.parent / "answers"))
+ANSWER_SQLITE_PATH = os.getenv("ANSWER_SQLITE_PATH", "answers.db")
+
+
+class AnswerRepository(ABC):
+    """정답 프레임 / 레슨 단어 조회 인터페이스"""
+
+    @abstractmethod
+    async def load_frames(self, lessonId: int) -> list:
+        """answer-frames 원본 리스트([{"hand": {...}}, ...]) 반환, 없으면 빈 리스트"""
+
+    @abstractmethod
+    async def get_lesson_word(self, lessonId: int) -> str:
+        """레슨 ID → 단어 이름, 없으면 None"""
+
+    async def get_answer_frame(self, lessonId: int) -> dict:
+        return parse_answer_frame(await self.load_frames(lessonId))
+
+    async def get_answer_frames(self, lessonId: int) -> list[dict]:
+        return parse_answer_frames(await self.load_frames(lessonId))
+
+    async def get_lesson_words(self, lesson_ids: list[int]) -> dict:
+        words = {}
+        for lid in dict.fromkeys(lesson_ids):
+            word = await self.get_lesson_word(lid)
+            if word:
+                words[lid] = word
+        return words
+
+    async def list_lessons(self) -> list[dict]:
+        """[{"id", "title"}, ...] (지원하지 않으면 빈 리스트)"""
+        return []
+
+
+class HttpAnswerRepository(AnswerRepository):
+    """기존 백엔드 API 경로 (lesson_service)"""
+
+    async def load_frames(self, lessonId: int) -> list:
+        return await lesson_service.load_answer_frames(lessonId)
+
+    async def get_lesson_word(self, lessonId: int) -> str:
+        return await lesson_service.get_lesson_word(lessonId)
+
+    async def get_lesson_words(self, lesson_ids: list[int]) -> dict:
+        return await lesson_service.get_lesson_words(lesson_ids)
+
+    async def list_lessons(self) -> list[dict]:
+        return [{"id": int(meta["id"]), "title": meta.get("title")} for meta in await _fetch_lesson_list()]
+
+
+class JsonDirAnswerRepository(AnswerRepository):
+    """
+    JSON 파일 디렉토리
+    - {dir}/index.json : {"1": {"title": "I LOVE YOU", "file": "i_love_you.json"}, ...}
+    - index.json이 없으면 디렉토리의 *.json 파일로 인덱스를 만든다
+      (12.json → 레슨 12, i_love_you.json → 제목 "I LOVE YOU", ID는 파일명 순으로 부여)
+      → python -m app.services.answer_repository build-index 로 index.json 고정 가능
+    파일 내용은 정답 프레임 1개(dict), 프레임 리스트, 또는 백엔드 응답 형태([{"hand": ...}]) 모두 허용
+    """
+
+    def __init__(self, root: str = ANSWER_JSON_DIR):
+        self.root = Path(root)
+        index_path = self.root / "index.json"
+        if index_path.exists():
+            with open(index_path, "r", encoding="utf-8") as f:
+                self.index = {int(k): v for k, v in json.load(f).items()}
+        else:
+            self.index = self.scan(self.root)
+        # 제목(단어) → 레슨 ID
+        self.titles = {
+            self._title_key(info["title"]): lid for lid, info in self.index.items() if info.get("title")
+        }
+        self._frames = {}  # 파일은 한 번만 읽음
+
+    @staticmethod
+    def _title_key(title: str) -> str:
+        return " ".join(str(title).upper().replace("_", " ").split())
+
+    @staticmethod
+    def scan(root: Path) -> dict:
+        """디렉토리의 정답 파일 → {lesson_id: {"title", "file"}}"""
+        files = sorted(p for p in Path(root).glob("*.json") if p.name != "index.json")
+        index = {int(p.stem): {"title": None, "file": p.name} for p in files if p.stem.isdigit()}
+        next_id = max(index, default=0) + 1
+        for p in files:
+            if not p.stem.isdigit():
+                index[next_id] = {"title": JsonDirAnswerRepository._title_key(p.stem), "file": p.name}
+                next_id += 1
+        return index
+
+    def find_lesson_id(self, title: str):
+        """단어 이름 → 레슨 ID (없으면 None)"""
+        return self.titles.get(self._title_key(title))
+
+    def _path(self, lessonId: int) -> Path:
+        info = self.index.get(lessonId)
+        if info and info.get("file"):
+            return self.root / info["file"]
+        return self.root / f"{lessonId}.json"
+
+    async def load_frames(self, lessonId: int) -> list:
+        if lessonId in self._frames:
+            return self._frames[lessonId]
+
+        frames_list = await io_executor.run(self._read_frames, self._path(lessonId))
+        if frames_list is None:
+            return []
+        self._frames[lessonId] = frames_list
+        return frames_list
+
+    @staticmethod
+    def _read_frames(path: Path):
+        """정답 파일 읽기 (블로킹: io 실행기에서), 없으면 None"""
+        if not path.exists():
+            print(f"⚠️ 정답 파일을 찾을 수 없습니다: {path}")
+            return None
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        frames = data if isinstance(data, list) else [data]
+        return [item if "hand" in item else {"hand": item} for item in frames]
+
+    async def get_lesson_word(self, lessonId: int) -> str:
+        info = self.index.get(lessonId)
+        return info.get("title") if info else None
+
+    async def list_lessons(self) -> list[dict]:
+        return [{"id": lid, "title": info.get("title")} for lid, info in self.index.items()]
+
+
+class SqliteAnswerRepository(AnswerRepository):
+    """
+    인덱싱된 SQLite 저장소
+    프레임은 (leaf 경로 ID, 값 ID) uint16 배열 두 개를 BLOB으로 저장 → 레슨 ID 기본키로 바로 조회
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS vocab (
+        kind TEXT NOT NULL,          -- 'path' | 'value'
+        id INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        PRIMARY KEY (kind, id)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS lessons (
+        id INTEGER PRIMARY KEY,
+        title TEXT,
+        meta TEXT
+    );
+    CREATE TABLE IF NOT EXISTS frames (
+        lesson_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        path_ids BLOB NOT NULL,
+        value_ids BLOB NOT NULL,
+        PRIMARY KEY (lesson_id, seq)
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str = ANSWER_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        self.paths = [r[0] for r in conn.execute("SELECT text FROM vocab WHERE kind='path' ORDER BY id")]
+        self.values = [json.loads(r[0]) for r in conn.execute("SELECT text FROM vocab WHERE kind='value' ORDER BY id")]
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite 연결은 스레드별로 (읽기 전용)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def _query(self, sql: str, params=()) -> list:
+        """블로킹 조회 (io 실행기 스레드에서, 연결은 스레드별)"""
+        return self._conn().execute(sql, params).fetchall()
+
+    async def load_frames(self, lessonId: int) -> list:
+        rows = await io_executor.run(
+            self._query, "SELECT path_ids, value_ids FROM frames WHERE lesson_id = ? ORDER BY seq", (lessonId,)
+        )
+
+        frames_list = []
+        for path_blob, value_blob in rows:
+            path_ids = array("H")
+            path_ids.frombytes(path_blob)
+            value_ids = array("H")
+            value_ids.frombytes(value_blob)
+            frames_list.append({"hand": decode_frame(path_ids, value_ids, self.paths, self.values)})
+        return frames_list
+
+    async def get_lesson_word(self, lessonId: int) -> str:
+        rows = await io_executor.run(self._query, "SELECT title FROM lessons WHERE id = ?", (lessonId,))
+        return rows[0][0] if rows else None
+
+    async def get_lesson_words(self, lesson_ids: list[int]) -> dict:
+        unique_ids = list(dict.fromkeys(lesson_ids))
+        if not unique_ids:
+            return {}
+        placeholders = ",".join("?" * len(unique_ids))
+        rows = await io_executor.run(
+            self._query, f"SELECT id, title FROM lessons WHERE id IN ({placeholders})", unique_ids
+        )
+        titles = {lid: title for lid, title in rows if title}
+        return {lid: titles[lid] for lid in unique_ids if lid in titles}
+
+    async def list_lessons(self) -> list[dict]:
+        rows = await io_executor.run(self._query, "SELECT id, title FROM lessons")
+        return [{"id": lid, "title": title} for lid, title in rows]
+
+    @staticmethod
+    def build(path: str, lessons: dict):
+        """
+        lessons: {lesson_id: {"meta": {...}, "frames": [hand dict, ...]}}
+        새 SQLite 파일을 만든다 (기존 파일은 교체)
+        """
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        vocab = FeatureVocabulary()
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.executescript(SqliteAnswerRepository.SCHEMA)
+            for lid, item in lessons.items():
+                meta = item.get("meta") or {}
+                conn.execute(
+                    "INSERT INTO lessons (id, title, meta) VALUES (?, ?, ?)",
+                    (lid, meta.get("title"), json.dumps(meta, ensure_ascii=False))
+                )
+                for seq, frame in enumerate(item["frames"]):
+                    path_ids, value_ids = encode_frame(frame, vocab)
+                    conn.execute(
+                        "INSERT INTO frames (lesson_id, seq, path_ids, value_ids) VALUES (?, ?, ?, ?)",
+                        (lid, seq, array("H", path_ids).tobytes(), array("H", value_ids).tobytes())
+                    )
+            conn.executemany("INSERT INTO vocab (kind, id, text) VALUES ('path', ?, ?)", enumerate(vocab.paths))
+            conn.executemany("INSERT INTO vocab (kind, id, text) VALUES ('value', ?, ?)", enumerate(vocab.values))
+            conn.commit()
+        finally:
+            conn.close()
+
+        os.replace(tmp_path, path)
+        print(f"✅ SQLite 정답 저장소 생성: {path} (레슨 {len(lessons)}개)")
+
+
+_repository: AnswerRepository = None
+
+
+def get_answer_repository() -> AnswerRepository:
+    """ANSWER_REPOSITORY 환경 변수로 선택된 저장소 (프로세스당 하나)"""
+    global _repository
+    if _repository is None:
+        if ANSWER_REPOSITORY == "json":
+            _repository = JsonDirAnswerRepository()
+        elif ANSWER_REPOSITORY == "sqlite":
+            _repository = SqliteAnswerRepository()
+        else:
+            _repository = HttpAnswerRepository()
+        print(f"✅ 정답 저장소: {type(_repository).__name__}")
+    return _repository
+
+
+if __name__ == "__main__":
+    # python -m app.services.answer_repository build-sqlite --source http --out answers.db
+    # python -m app.services.answer_repository build-sqlite --source json --json-dir answers --out answers.db
+    # python -m app.services.answer_repository build-index --json-dir answers   → answers/index.json 생성
+    parser = argparse.ArgumentParser(description="정답 저장소 도구")
+    parser.add_argument("command", choices=["build-sqlite", "build-index"])
+    parser.add_argument("--source", choices=["http", "json"], default="http")
+    parser.add_argument("--json-dir", default=ANSWER_JSON_DIR)
+    parser.add_argument("--out", default=ANSWER_SQLITE_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build-index":
+        index = JsonDirAnswerRepository.scan(Path(args.json_dir))
+        with open(Path(args.json_dir) / "index.json", "w", encoding="utf-8") as f:
+            json.dump({str(lid): info for lid, info in sorted(index.items())}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"✅ 정답 인덱스 생성: {Path(args.json_dir) / 'index.json'} (레슨 {len(index)}개)")
+
+    async def main():
+        from app.services.backend_client import close_backend_client
+
+        try:
+            if args.source == "json":
+                source = JsonDirAnswerRepository(args.json_dir)
+                lesson_list = await source.list_lessons()
+            else:
+                source = HttpAnswerRepository()
+                lesson_list = await _fetch_lesson_list()
+
+            lessons = {}
+            for meta in lesson_list:
+                lid = int(meta["id"])
+                frames_list = await source.load_frames(lid)
+                lessons[lid] = {"meta": meta, "frames": [item.get("hand", {}) for item in frames_list]}
+
+            SqliteAnswerRepository.build(args.out, lessons)
+        finally:
+            await close_backend_client()
+
+    if args.command == "build-sqlite":
+        asyncio.run(main())
@@ -0,0 +1,83 @@
+import os
+import httpx
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception
+
+# 백엔드(레슨/정답 데이터) 공용 비동기 클라이언트
+# 앱 시작 시 한 번 만들고 종료 시 닫는다. 모든 레슨 조회가 같은 커넥션 풀(keep-alive)을 공유함
+API_BASE_URL = os.getenv("BACKEND_ENDPOINT")
+BACKEND_TIMEOUT = float(os.getenv("BACKEND_TIMEOUT", "5"))
+BACKEND_CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "2"))
+BACKEND_MAX_CONNECTIONS = int(os.getenv("BACKEND_MAX_CONNECTIONS", "50"))
+BACKEND_MAX_KEEPALIVE = int(os.getenv("BACKEND_MAX_KEEPALIVE", "20"))
+BACKEND_RETRIES = int(os.getenv("BACKEND_RETRIES", "3"))
+
+_client: httpx.AsyncClient = None
+
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=API_BASE_URL or "",
+        timeout=httpx.Timeout(BACKEND_TIMEOUT, connect=BACKEND_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=BACKEND_MAX_CONNECTIONS,
+            max_keepalive_connections=BACKEND_MAX_KEEPALIVE,
+            keepalive_expiry=30.0
+        ),
+    )
+
+
+async def start_backend_client():
+    """앱 시작(lifespan) 시 호출"""
+    global _client
+    if _client is None:
+        _client = _create_client()
+        print("✅ 백엔드 클라이언트 생성")
+
+
+async def close_backend_client():
+    """앱 종료(lifespan) 시 호출"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        print("✅ 백엔드 클라이언트 종료")
+
+
+def get_backend_client() -> httpx.AsyncClient:
+    # lifespan 없이 쓰는 경우(CLI, 실험 스크립트)를 위해 없으면 지연 생성
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+
+def _is_retryable(e: BaseException) -> bool:
+    # 네트워크 오류와 5xx만 재시도 (404 등 4xx는 재시도해도 결과가 같음)
+    if isinstance(e, httpx.TransportError):
+        return True
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code >= 500
+    return False
+
+
+@retry(
+    stop=stop_after_attempt(BACKEND_RETRIES),
+    wait=wait_random_exponential(multiplier=0.2, max=2),  # 지터 포함 지수 백오프
+    retry=retry_if_exception(_is_retryable),
+    reraise=True
+)
+async def backend_get(path: str, headers: dict = None, params: dict = None, timeout: float = None) -> httpx.Response:
+    """
+    GET {BACKEND_ENDPOINT}{path}
+    4xx는 그대로 예외(HTTPStatusError), 304는 예외 없이 응답을 반환한다.
+    """
+    client = get_backend_client()
+    response = await client.get(
+        path,
+        headers=headers,
+        params=params,
+        timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+    )
+    if response.status_code != 304:
+        response.raise_for_status()
+    return response
@@ -0,0 +1,149 @@
+import re
+import difflib
+from app.models.schemas import DialogueLine
+
+# 시뮬레이션 대화 검증 / 복구
+# 시스템 프롬프트가 요구하는 구조를 GPT가 지켰는지 로컬에서 확인하고,
+# 사소한 위반은 GPT를 다시 부르지 않고 고친다.
+#   - AI로 시작 / AI로 끝, AI와 User가 번갈아 등장
+#   - User 턴 = N, AI 턴 = N + 1 (N = 단어 수)
+#   - 각 단어는 User 턴에서 정확히 한 번
+# 고칠 수 없는 경우(빠진 단어, 알 수 없는 단어, AI 첫 턴 없음 등)만 issues로 돌려준다.
+FUZZY_CUTOFF = 0.8
+CLOSING_LINE = "Great job! You did really well today."
+
+AI = "AI"
+USER = "User"
+SPEAKER_ALIASES = {
+    "ai": AI, "assistant": AI, "bot": AI,
+    "user": USER, "learner": USER, "me": USER,
+}
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_word(text: str) -> str:
+    """대소문자 / 문장부호 / 공백 차이 제거 ("I love you!" == "I LOVE YOU")"""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", str(text or "").lower())).strip()
+
+
+class WordIndex:
+    """단어 → 레슨 ID 조회 (정확히 일치 → 포함 → 유사도 순서)"""
+
+    def __init__(self, lesson_words: dict):
+        self.words = {lid: word for lid, word in lesson_words.items()}
+        self.exact = {}
+        for lid, word in lesson_words.items():
+            self.exact.setdefault(normalize_word(word), lid)
+        # 포함 검사는 긴 단어부터 ("I LOVE YOU" 가 "YOU" 보다 먼저)
+        self._by_length = sorted(self.exact, key=len, reverse=True)
+
+    def match(self, text: str):
+        key = normalize_word(text)
+        if not key:
+            return None
+
+        lid = self.exact.get(key)
+        if lid is not None:
+            return lid
+
+        padded = f" {key} "
+        for word in self._by_length:
+            if f" {word} " in padded:
+                return self.exact[word]
+
+        close = difflib.get_close_matches(key, self.exact.keys(), n=1, cutoff=FUZZY_CUTOFF)
+        return self.exact[close[0]] if close else None
+
+
+def _normalize_lines(raw_dialogue, issues: list) -> list:
+    """[{"speaker", "text", "target_word"?}] → [(speaker, text, target_word)] (빈 줄 제거, 화자 표기 통일)"""
+    lines = []
+    for item in raw_dialogue or []:
+        if not isinstance(item, dict):
+            continue
+        text = str(item.get("text") or "").strip()
+        speaker = SPEAKER_ALIASES.get(str(item.get("speaker", "")).strip().lower())
+        if speaker is None:
+            issues.append(f"unknown speaker: {item.get('speaker')!r}")
+            continue
+        if not text and not item.get("target_word"):
+            continue
+        lines.append((speaker, text, item.get("target_word")))
+    return lines
+
+
+def validate_and_repair(raw_dialogue, lesson_words: dict, index: WordIndex = None):
+    """
+    반환: (dialogue, issues, repairs)
+      dialogue : [DialogueLine, ...] (issues가 비어 있을 때만 유효)
+      issues   : 로컬에서 고칠 수 없는 문제 (재요청 프롬프트에 그대로 사용)
+      repairs  : 로컬에서 고친 내용 (로그 / 지표용)
+    """
+    index = index or WordIndex(lesson_words)
+    issues, repairs = [], []
+    lines = _normalize_lines(raw_dialogue, issues)
+
+    # 1. 연속된 AI 턴은 하나로 합침
+    merged = []
+    for speaker, text, target in lines:
+        if merged and speaker == AI and merged[-1][0] == AI:
+            merged[-1] = (AI, f"{merged[-1][1]} {text}".strip(), None)
+            repairs.append("merged consecutive AI turns")
+            continue
+        if merged and speaker == USER and merged[-1][0] == USER:
+            issues.append("two User turns in a row")
+        merged.append((speaker, text, target))
+
+    if not merged or merged[0][0] != AI:
+        issues.append("dialogue must start with an AI turn")
+
+    # 2. User 턴 → 레슨 ID (target_word 우선, 없으면 대사), 중복 사용은 해당 문답을 제거
+    result = []
+    used = set()
+    skip_reply = False
+    for speaker, text, target in merged:
+        if speaker == AI:
+            if skip_reply:
+                skip_reply = False
+                continue
+            result.append(DialogueLine(speaker=AI, text=text, target_lesson_id=None))
+            continue
+
+        skip_reply = False
+        lid = index.match(target) if target else None
+        if lid is None:
+            lid = index.match(text)
+        if lid is None:
+            issues.append(f"User turn does not use a vocabulary word: {target or text!r}")
+            continue
+        if lid in used:
+            # 같은 단어를 두 번 쓴 문답은 통째로 빼면 구조가 유지됨
+            repairs.append(f"dropped repeated word {index.words[lid]!r}")
+            skip_reply = True
+            continue
+        used.add(lid)
+
+        # 대사가 비어 있고 target_word만 있으면 단어 자체를 대사로
+        if not text:
+            text = index.words[lid]
+            repairs.append(f"filled empty User text with {text!r}")
+        result.append(DialogueLine(speaker=USER, text=text, target_lesson_id=lid))
+
+    # 3. 마지막이 User면 맺음말 추가
+    if result and result[-1].speaker == USER:
+        result.append(DialogueLine(speaker=AI, text=CLOSING_LINE, target_lesson_id=None))
+        repairs.append("appended AI closing turn")
+
+    missing = [word for lid, word in index.words.items() if lid not in used]
+    if missing:
+        issues.append(f"vocabulary words never used by the User: {missing}")
+
+    user_turns = sum(1 for line in result if line.speaker == USER)
+    ai_turns = len(result) - user_turns
+    if not issues and (user_turns != len(index.words) or ai_turns != user_turns + 1):
+        issues.append(f"expected {len(index.words)} User / {len(index.words) + 1} AI turns, "
+                      f"got {user_turns} / {ai_turns}")
+
+    return result, issues, repairs
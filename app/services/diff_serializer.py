@@ -0,0 +1,35 @@
+import os
+from app.services.feedback_templates import rank_leaves, hidden_sides
+
+# 피드백 프롬프트용 diff 직렬화
+# 중첩 dict의 repr 대신 "경로=값" 한 줄씩, 중요한 항목부터 상위 N개만 넣어 토큰 수를 줄인다.
+#   {'right': {'handshape': {'finger_flexion': {'pinky_extended': True}}}}
+#   → right.finger_flexion.pinky_extended=true
+FEEDBACK_PROMPT_MAX_LEAVES = int(os.getenv("FEEDBACK_PROMPT_MAX_LEAVES", "6"))
+
+
+def compact_path(path: tuple) -> str:
+    """손(left/right) + 마지막 두 단계만 남김 (handshape / orientation / location 같은 상위 분류는 생략)"""
+    if path and path[0] in ("left", "right"):
+        return ".".join((path[0],) + tuple(path[1:])[-2:])
+    return ".".join(path[-2:])
+
+
+def compact_value(value) -> str:
+    # 채점과 같은 정규화 (True / "True" → true)
+    return str(value).lower() if value is not None else "none"
+
+
+def serialize_diff(wrong_parts: dict, max_leaves: int = FEEDBACK_PROMPT_MAX_LEAVES) -> list[str]:
+    """틀린 부분 dict → 중요도 순 "경로=값" 리스트 (최대 max_leaves개)"""
+    hidden = hidden_sides(wrong_parts or {})
+    lines = []
+    for _, path, value in rank_leaves(wrong_parts):
+        if path[0] in hidden and path[-1] != "present":
+            continue
+        line = f"{compact_path(path)}={compact_value(value)}"
+        if line not in lines:
+            lines.append(line)
+        if len(lines) >= max_leaves:
+            break
+    return lines
@@ -1,4 +1,4 @@
-from app.utils.similarity import compare_feature
+from app.utils.similarity import compare_feature, iter_frame_scores
 import json
 
 def evaluate_static_sign(user: dict, answer: dict) -> dict:
@@ -21,19 +21,19 @@ def evaluate_dynamic_sign(user_frames: list[dict], answer_frames: list[dict]) ->
 
     lowest_score = 1.1 # 1.0보다 큰 값으로 초기화
     worst_frame_idx = 0
-    worst_frame_wrong_parts = {}
 
     # 1:1 매칭 채점
-    for i in range(min_len):
-        # 기존 compare_feature 함수 재사용 (static 채점 로직과 동일)
-        score, wrong_parts = compare_feature(user_frames[i], answer_frames[i])
+    # 연속 프레임은 대부분 일부 leaf만 바뀌므로 증분 채점기로 바뀐 부분만 다시 비교
+    for i, score in enumerate(iter_frame_scores(user_frames[:min_len], answer_frames[:min_len])):
         total_score += score
 
         # 피드백을 위해 가장 점수가 낮은(가장 많이 틀린) 순간을 포착
         if score < lowest_score:
             lowest_score = score
             worst_frame_idx = i
-            worst_frame_wrong_parts = wrong_parts
+
+    # 틀린 부분 dict는 최저점 프레임 하나에 대해서만 생성
+    _, worst_frame_wrong_parts = compare_feature(user_frames[worst_frame_idx], answer_frames[worst_frame_idx])
 
     avg_score = total_score / min_len if min_len > 0 else 0.0
 
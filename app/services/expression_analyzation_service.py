@@ -1,8 +1,15 @@
 from azure.cognitiveservices.vision.customvision.prediction import CustomVisionPredictionClient
 from msrest.authentication import ApiKeyCredentials
 import os
-import base64
-import requests
+import json
+import time
+import asyncio
+import cv2
+import numpy as np
+from pathlib import Path
+from app.ai.llm_client import call_vision_llm_async, call_vision_llm_multi_async
+from app.utils.executors import cpu_executor
+from app.utils.deadline import DeadlineExceeded, current_deadline, stage_allowed, EXPRESSION_LLM_MIN_MS, STAGE_EXPRESSION_LLM
 
 # 환경 변수에서 가져오기 (Azure Portal -> Configuration에 꼭 등록해야 함!)
 ENDPOINT = os.environ.get("CUSTOM_VISION_ENDPOINT")
@@ -41,74 +48,476 @@ def analyze_expression(image_bytes: bytes) -> str:
         print(f"❌ Custom Vision Error: {e}")
         return "Error"
 
-AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
-AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
-API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-05-01-preview")
-AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini")
+EXPRESSION_SYSTEM_PROMPT = (
+    "You are an AI assistant that analyzes a user's facial expression "
+    "from an image.\n"
+    "You MUST choose exactly one of the following labels:\n"
+    "- Question (questioning, interested, wondering)\n"
+    "- Positive (happy, pleased, friendly)\n"
+    "- Negative (angry, sad, frustrated)\n"
+    "- Neutral (no clear emotion)\n\n"
+    "Respond with ONLY the label name."
+)
 
+EXPRESSION_LABELS = {"Question", "Positive", "Negative", "Neutral"}
 
-def analyze_expression_with_llm(image_bytes: bytes) -> str:
+EXPRESSION_BATCH_SYSTEM_PROMPT = (
+    "You are an AI assistant that analyzes a user's facial expression "
+    "in each of several images.\n"
+    "For EACH image, choose exactly one of the following labels:\n"
+    "- Question (questioning, interested, wondering)\n"
+    "- Positive (happy, pleased, friendly)\n"
+    "- Negative (angry, sad, frustrated)\n"
+    "- Neutral (no clear emotion)\n\n"
+    "Respond with ONLY a JSON array of label names, one per image, in the same order "
+    "as the images. e.g. [\"Neutral\", \"Question\"]"
+)
+
+# 한 번의 Vision 요청에 넣을 최대 이미지 수 (1이면 프레임마다 따로 호출)
+EXPRESSION_BATCH_SIZE = int(os.getenv("EXPRESSION_BATCH_SIZE", "5"))
+
+
+# Vision 호출용 이미지 준비 (얼굴 부분만 잘라서 작게)
+EXPRESSION_CROP_SIZE = int(os.getenv("EXPRESSION_CROP_SIZE", "224"))          # 얼굴 crop 한 변 크기 (px)
+EXPRESSION_CROP_PADDING = float(os.getenv("EXPRESSION_CROP_PADDING", "0.25"))  # 얼굴 박스 여백 비율 (한쪽 기준)
+EXPRESSION_FULL_MAX_SIZE = int(os.getenv("EXPRESSION_FULL_MAX_SIZE", "512"))   # 얼굴이 없을 때 전체 이미지 긴 변
+EXPRESSION_JPEG_QUALITY = int(os.getenv("EXPRESSION_JPEG_QUALITY", "80"))
+EXPRESSION_IMAGE_DETAIL = os.getenv("EXPRESSION_IMAGE_DETAIL", "low")
+
+expression_image_stats = {"prepared": 0, "face_cropped": 0, "bytes_in": 0, "bytes_out": 0, "llm_calls": 0, "llm_ms": 0.0}
+
+
+def _face_box(face_landmarks, width: int, height: int):
+    """얼굴 랜드마크 → 여백을 포함한 정사각형 박스 (left, top, right, bottom), 없으면 None"""
+    if face_landmarks is None:
+        return None
+    lm = getattr(face_landmarks, "landmark", face_landmarks)
+    # 프런트에서 zero-padding 된 점은 제외
+    points = [(p.x, p.y) for p in lm or [] if p.x or p.y]
+    if not points:
+        return None
+
+    xs = [x * width for x, _ in points]
+    ys = [y * height for _, y in points]
+    side = max(max(xs) - min(xs), max(ys) - min(ys)) * (1 + 2 * EXPRESSION_CROP_PADDING)
+    if side < 2:
+        return None
+
+    cx = (max(xs) + min(xs)) / 2
+    cy = (max(ys) + min(ys)) / 2
+    left = int(max(0, cx - side / 2))
+    top = int(max(0, cy - side / 2))
+    right = int(min(width, cx + side / 2))
+    bottom = int(min(height, cy + side / 2))
+    if right - left < 2 or bottom - top < 2:
+        return None
+    return left, top, right, bottom
+
+
+def prepare_face_image(image_bytes: bytes, face_landmarks=None) -> bytes:
     """
-    Azure OpenAI (gpt-4o-mini, Vision)으로
-    표정을 Curious / Positive / Negative / Neutral 중 하나로 분류
+    Holistic 얼굴 랜드마크로 얼굴 주변만 잘라 작은 고정 크기로 줄이고 JPEG로 다시 인코딩
+    얼굴이 없으면 전체 이미지를 축소만 함, 디코딩 실패 / 결과가 더 크면 원본 그대로
     """
+    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        return image_bytes
 
-    try:
-        # 이미지 → base64
-        image_base64 = base64.b64encode(image_bytes).decode("utf-8")
+    height, width = img.shape[:2]
+    box = _face_box(face_landmarks, width, height)
+    if box is not None:
+        left, top, right, bottom = box
+        img = img[top:bottom, left:right]
+        max_side = EXPRESSION_CROP_SIZE
+    else:
+        max_side = EXPRESSION_FULL_MAX_SIZE
 
-        url = f"{AZURE_OPENAI_ENDPOINT}/openai/deployments/{AZURE_OPENAI_DEPLOYMENT}/chat/completions?api-version={API_VERSION}"
+    scale = max_side / max(img.shape[:2])
+    if scale < 1:
+        size = (max(1, round(img.shape[1] * scale)), max(1, round(img.shape[0] * scale)))
+        img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
 
-        headers = {
-            "Content-Type": "application/json",
-            "api-key": AZURE_OPENAI_API_KEY
-        }
+    ok, buffer = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, EXPRESSION_JPEG_QUALITY])
+    if not ok or len(buffer) >= len(image_bytes):
+        return image_bytes
 
-        payload = {
-            "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an AI assistant that analyzes a user's facial expression "
-                        "from an image.\n"
-                        "You MUST choose exactly one of the following labels:\n"
-                        "- Question (questioning, interested, wondering)\n"
-                        "- Positive (happy, pleased, friendly)\n"
-                        "- Negative (angry, sad, frustrated)\n"
-                        "- Neutral (no clear emotion)\n\n"
-                        "Respond with ONLY the label name."
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": "Classify the facial expression in this image."
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_base64}"
-                            }
-                        }
-                    ]
-                }
-            ],
-            "max_tokens": 10,
-            "temperature": 0
-        }
+    prepared = buffer.tobytes()
+    expression_image_stats["prepared"] += 1
+    expression_image_stats["face_cropped"] += box is not None
+    expression_image_stats["bytes_in"] += len(image_bytes)
+    expression_image_stats["bytes_out"] += len(prepared)
+    return prepared
 
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
 
-        result = response.json()
-        label = result["choices"][0]["message"]["content"].strip()
+async def analyze_expression_with_llm(image_bytes: bytes, detail: str = "auto") -> str:
+    """
+    Azure OpenAI (gpt-4o-mini, Vision)으로
+    표정을 Question / Positive / Negative / Neutral 중 하나로 분류
+    """
 
-        allowed = {"Question", "Positive", "Negative", "Neutral"}
-        
-        return label if label in allowed else "Uncertain"
+    try:
+        label = await call_vision_llm_async(
+            EXPRESSION_SYSTEM_PROMPT,
+            "Classify the facial expression in this image.",
+            image_bytes,
+            max_tokens=10,
+            detail=detail
+        )
+        label = label.strip()
 
+        return label if label in EXPRESSION_LABELS else "Uncertain"
+
+    except DeadlineExceeded:
+        current_deadline().skip(STAGE_EXPRESSION_LLM)
+        return "Unknown"
     except Exception as e:
         print(f"❌ LLM Expression Error: {e}")
         return "Error"
+
+
+# ==========================================
+# 로컬 표정 분류기 (얼굴 랜드마크 기하 특징 + 소형 softmax 모델, CPU만 사용)
+# Holistic이 이미 계산한 468개 얼굴 랜드마크를 재사용하므로 이미지 업로드 / LLM 호출이 필요 없다.
+# EXPRESSION_BACKEND=auto (기본)는 모델 파일에 기록된 LLM 라벨 대비 검증 일치율이
+# EXPRESSION_LOCAL_MIN_AGREEMENT 이상일 때만 local, 아니면 llm을 쓴다.
+# (experiments/expression_trainer.py --teacher-llm 으로 학습하면 일치율이 같이 저장됨.
+#  지금 들어 있는 기본 모델은 손으로 정한 기하 가중치라 평가 기록이 없어 llm으로 동작)
+# ==========================================
+EXPRESSION_BACKEND = os.getenv("EXPRESSION_BACKEND", "auto")  # auto | llm | local
+EXPRESSION_LOCAL_MIN_AGREEMENT = float(os.getenv("EXPRESSION_LOCAL_MIN_AGREEMENT", "0.85"))
+EXPRESSION_LLM_FALLBACK = os.getenv("EXPRESSION_LLM_FALLBACK", "false").lower() == "true"
+EXPRESSION_MIN_CONFIDENCE = float(os.getenv("EXPRESSION_MIN_CONFIDENCE", "0.45"))
+# 한 시도(여러 프레임) 안에서 얼굴 기하 특징이 이 값(표준편차 단위) 이상 움직였을 때만 다시 분류
+EXPRESSION_REUSE_THRESHOLD = float(os.getenv("EXPRESSION_REUSE_THRESHOLD", "1.0"))
+EXPRESSION_MODEL_PATH = os.getenv(
+    "EXPRESSION_MODEL_PATH",
+    str(Path(__file__).resolve().parent.parent / "ai" / "expression_model.json")
+)
+
+# MediaPipe Face Mesh 인덱스
+FACE_TOP, FACE_BOTTOM = 10, 152            # 이마 위 / 턱 끝
+FACE_LEFT, FACE_RIGHT = 234, 454           # 양쪽 볼 끝
+BROW_INNER = (107, 336)                    # 눈썹 안쪽 (왼, 오)
+BROW_MID = (105, 334)
+BROW_OUTER = (70, 300)
+EYE_UPPER = (159, 386)                     # 윗눈꺼풀
+EYE_LOWER = (145, 374)                     # 아랫눈꺼풀
+MOUTH_CORNERS = (61, 291)
+LIP_UPPER, LIP_LOWER = 13, 14              # 입술 안쪽 중앙
+
+FACE_FEATURES = [
+    "brow_raise",        # 눈썹 ~ 윗눈꺼풀 거리
+    "brow_inner_raise",  # 눈썹 안쪽이 바깥쪽보다 올라간 정도
+    "brow_gap",          # 양 눈썹 안쪽 사이 거리 (찌푸리면 줄어듦)
+    "eye_open",          # 눈 뜬 정도
+    "mouth_corner_lift", # 입꼬리가 입 중앙보다 올라간 정도
+    "mouth_width",
+    "mouth_open",
+]
+
+
+def face_geometry_features(face_landmarks):
+    """
+    얼굴 랜드마크 → 기하 특징 벡터 (얼굴이 없거나 좌표가 비정상이면 None)
+    세로 거리는 얼굴 높이, 가로 거리는 얼굴 너비로 나눠서 이미지 비율 / 거리에 영향받지 않게 함
+    """
+    if face_landmarks is None:
+        return None
+    lm = getattr(face_landmarks, "landmark", face_landmarks)
+    if not lm or len(lm) < 468:
+        return None
+
+    face_h = lm[FACE_BOTTOM].y - lm[FACE_TOP].y
+    face_w = abs(lm[FACE_RIGHT].x - lm[FACE_LEFT].x)
+    # 프런트에서 zero-padding 된 경우 등
+    if face_h <= 1e-6 or face_w <= 1e-6:
+        return None
+
+    def avg_y(pair):
+        return (lm[pair[0]].y + lm[pair[1]].y) / 2
+
+    mouth_center_y = (lm[LIP_UPPER].y + lm[LIP_LOWER].y) / 2
+    return np.array([
+        (avg_y(EYE_UPPER) - avg_y(BROW_MID)) / face_h,
+        (avg_y(BROW_OUTER) - avg_y(BROW_INNER)) / face_h,
+        abs(lm[BROW_INNER[1]].x - lm[BROW_INNER[0]].x) / face_w,
+        (avg_y(EYE_LOWER) - avg_y(EYE_UPPER)) / face_h,
+        (mouth_center_y - avg_y(MOUTH_CORNERS)) / face_h,
+        abs(lm[MOUTH_CORNERS[1]].x - lm[MOUTH_CORNERS[0]].x) / face_w,
+        (lm[LIP_LOWER].y - lm[LIP_UPPER].y) / face_h,
+    ], dtype=np.float32)
+
+
+class ExpressionClassifier:
+    """표준화 → 선형 → softmax (다항 로지스틱 회귀)"""
+
+    def __init__(self, labels, features, mean, std, weights, bias, source: str = "", evaluation: dict = None):
+        if list(features) != FACE_FEATURES:
+            raise ValueError(f"표정 모델 특징 목록이 다릅니다: {features}")
+        self.labels = list(labels)
+        self.features = list(features)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+        self.weights = np.asarray(weights, dtype=np.float32)  # (라벨 수, 특징 수)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.source = source
+        # 학습 스크립트가 남긴 검증 결과 {"llm_agreement", "llm_samples", "validation_accuracy", ...}
+        self.evaluation = evaluation or {}
+
+    @classmethod
+    def load(cls, path: str = EXPRESSION_MODEL_PATH) -> "ExpressionClassifier":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExpressionClassifier":
+        return cls(data["labels"], data["features"], data["mean"], data["std"],
+                   data["weights"], data["bias"], data.get("source", ""), data.get("evaluation"))
+
+    def to_dict(self) -> dict:
+        return {
+            "labels": self.labels,
+            "features": self.features,
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist(),
+            "weights": self.weights.tolist(),
+            "bias": self.bias.tolist(),
+            "source": self.source,
+            "evaluation": self.evaluation,
+        }
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        z = (x - self.mean) / self.std
+        logits = self.weights @ z + self.bias
+        logits -= logits.max()
+        exp = np.exp(logits)
+        return exp / exp.sum()
+
+    def predict(self, x: np.ndarray):
+        """(라벨, 확률)"""
+        proba = self.predict_proba(x)
+        best = int(np.argmax(proba))
+        return self.labels[best], float(proba[best])
+
+
+_classifier: ExpressionClassifier = None
+_backend: str = None
+
+
+def get_expression_classifier() -> ExpressionClassifier:
+    global _classifier
+    if _classifier is None:
+        _classifier = ExpressionClassifier.load()
+        print(f"✅ 표정 분류 모델 로드: {EXPRESSION_MODEL_PATH} ({_classifier.source})")
+    return _classifier
+
+
+def expression_backend() -> str:
+    """실제로 쓸 표정 분류 경로 (llm | local), auto면 모델의 LLM 라벨 대비 일치율로 결정"""
+    global _backend
+    if _backend is None:
+        if EXPRESSION_BACKEND != "auto":
+            _backend = EXPRESSION_BACKEND
+        else:
+            agreement = get_expression_classifier().evaluation.get("llm_agreement")
+            _backend = "local" if agreement is not None and agreement >= EXPRESSION_LOCAL_MIN_AGREEMENT else "llm"
+            print(f"✅ 표정 분류 경로: {_backend} (LLM 라벨 대비 일치율 {agreement}, 기준 {EXPRESSION_LOCAL_MIN_AGREEMENT})")
+    return _backend
+
+
+# 표정 분류 경로별 횟수
+expression_stats = {"local": 0, "llm": 0, "no_face": 0, "low_confidence": 0, "reused": 0,
+                    "batched_calls": 0, "batched_frames": 0, "batch_fallbacks": 0, "deadline_skipped": 0}
+
+
+def analyze_expression_local(results):
+    """
+    Holistic 결과의 얼굴 랜드마크로 표정 분류 → (라벨, 확률)
+    얼굴이 없으면 (None, 0.0)
+    """
+    features = face_geometry_features(getattr(results, "face_landmarks", None))
+    if features is None:
+        return None, 0.0
+    return get_expression_classifier().predict(features)
+
+
+async def _expression_with_llm(results, image_bytes: bytes) -> str:
+    """얼굴 crop 이미지로 Vision LLM 호출 + 절감량 / 응답 시간 로그"""
+    prepared = await cpu_executor.run(prepare_face_image, image_bytes, getattr(results, "face_landmarks", None))
+
+    start = time.perf_counter()
+    label = await analyze_expression_with_llm(prepared, detail=EXPRESSION_IMAGE_DETAIL)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    expression_image_stats["llm_calls"] += 1
+    expression_image_stats["llm_ms"] += elapsed_ms
+    print(f"📉 표정 이미지 {len(image_bytes) / 1024:.0f}KB → {len(prepared) / 1024:.1f}KB, 응답 {elapsed_ms:.0f}ms")
+    return label
+
+
+def _route_expression(results, image_bytes: bytes = None):
+    """
+    로컬 분류 결과와 LLM 필요 여부 결정 → (라벨, LLM 필요 여부)
+    - llm: 이미지가 있으면 항상 Vision LLM (없으면 로컬 분류기)
+    - local: 로컬 분류기, 얼굴을 못 찾았거나 확신도가 낮으면
+      EXPRESSION_LLM_FALLBACK=true 일 때만 Vision LLM 사용
+    (EXPRESSION_BACKEND=auto 면 expression_backend()가 모델 평가 결과로 둘 중 하나를 고름)
+    """
+    if expression_backend() == "llm" and image_bytes is not None:
+        return None, True
+
+    label, confidence = analyze_expression_local(results)
+    if label is None:
+        expression_stats["no_face"] += 1
+    elif confidence < EXPRESSION_MIN_CONFIDENCE:
+        expression_stats["low_confidence"] += 1
+    else:
+        expression_stats["local"] += 1
+        return label, False
+
+    if EXPRESSION_LLM_FALLBACK and image_bytes is not None:
+        return label, True
+
+    # 확신도가 낮아도 로컬 결과가 있으면 그대로 사용
+    return (label if label is not None else "Unknown"), False
+
+
+async def classify_expression(results, image_bytes: bytes = None) -> str:
+    """프레임 하나의 표정 라벨"""
+    label, needs_llm = _route_expression(results, image_bytes)
+    if not needs_llm:
+        return label
+    if not stage_allowed(STAGE_EXPRESSION_LLM, EXPRESSION_LLM_MIN_MS):
+        # 요청 마감이 가까우면 LLM 없이 (로컬 결과가 없으면 "Unknown")
+        expression_stats["deadline_skipped"] += 1
+        return label if label is not None else "Unknown"
+    expression_stats["llm"] += 1
+    return await _expression_with_llm(results, image_bytes)
+
+
+def _parse_label_array(text: str, expected: int):
+    """LLM 응답에서 라벨 JSON 배열 추출, 형식 / 개수가 맞지 않으면 None"""
+    text = text.strip()
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end <= start:
+        return None
+    try:
+        labels = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(labels, list) or len(labels) != expected:
+        return None
+    labels = [str(label).strip() for label in labels]
+    return labels if all(label in EXPRESSION_LABELS for label in labels) else None
+
+
+async def _expressions_with_llm_batch(frames: list) -> list:
+    """
+    여러 프레임을 한 번의 Vision 요청으로 분류 (최대 EXPRESSION_BATCH_SIZE장씩)
+    응답 파싱에 실패한 묶음은 프레임별 호출로 다시 분류
+    """
+    labels = []
+    for i in range(0, len(frames), EXPRESSION_BATCH_SIZE):
+        chunk = frames[i:i + EXPRESSION_BATCH_SIZE]
+        if len(chunk) == 1:
+            labels.append(await _expression_with_llm(*chunk[0]))
+            continue
+
+        prepared = [
+            await cpu_executor.run(prepare_face_image, image_bytes, getattr(results, "face_landmarks", None))
+            for results, image_bytes in chunk
+        ]
+        parsed = None
+        start = time.perf_counter()
+        try:
+            text = await call_vision_llm_multi_async(
+                EXPRESSION_BATCH_SYSTEM_PROMPT,
+                f"Classify the facial expression in each of these {len(chunk)} images.",
+                prepared,
+                max_tokens=8 * len(chunk) + 10,
+                detail=EXPRESSION_IMAGE_DETAIL
+            )
+            parsed = _parse_label_array(text, len(chunk))
+        except Exception as e:
+            print(f"❌ LLM Expression Batch Error: {e}")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        expression_image_stats["llm_calls"] += 1
+        expression_image_stats["llm_ms"] += elapsed_ms
+        if parsed is None:
+            expression_stats["batch_fallbacks"] += 1
+            print(f"⚠️ 표정 배치 응답 파싱 실패 → 프레임별 호출 ({len(chunk)}장)")
+            labels.extend(await asyncio.gather(*(_expression_with_llm(r, b) for r, b in chunk)))
+            continue
+
+        expression_stats["batched_calls"] += 1
+        expression_stats["batched_frames"] += len(chunk)
+        print(f"🖼️ 표정 배치 분류 {len(chunk)}장 1회 호출, {sum(len(b) for b in prepared) / 1024:.1f}KB, 응답 {elapsed_ms:.0f}ms")
+        labels.extend(parsed)
+    return labels
+
+
+def _geometry_moved(prev, curr, threshold: float) -> bool:
+    # 특징마다 스케일이 다르므로 모델의 표준편차로 나눈 값의 최대 변화량으로 비교
+    if prev is None or curr is None:
+        return True
+    delta = np.abs(curr - prev) / get_expression_classifier().std
+    return float(delta.max()) > threshold
+
+
+async def classify_expressions(frames: list, threshold: float = None):
+    """
+    한 번의 시도(1~5초 수어)에 속한 프레임들의 표정을 한꺼번에 결정
+    frames: [(Holistic 결과, 이미지 bytes 또는 None), ...]
+    기준 프레임 하나만 분류하고, 얼굴 기하가 threshold 이상 바뀐 프레임에서만 다시 분류한다.
+    그 사이 프레임은 직전 기준 프레임의 라벨을 그대로 사용.
+    반환: (프레임별 라벨 리스트, {"frames", "classified", "saved"})
+    """
+    if threshold is None:
+        threshold = EXPRESSION_REUSE_THRESHOLD
+
+    # 1. 얼굴 기하만으로 기준 프레임(anchor) 결정 → 각 프레임이 어느 기준 프레임 라벨을 쓸지
+    anchors = []
+    segment_of = []
+    anchor_features = None
+    for idx, (results, _) in enumerate(frames):
+        features = face_geometry_features(getattr(results, "face_landmarks", None))
+        if not anchors or _geometry_moved(anchor_features, features, threshold):
+            anchors.append(idx)
+            anchor_features = features
+        segment_of.append(len(anchors) - 1)
+
+    # 2. 기준 프레임만 분류 (로컬로 안 되는 것들은 모아서 Vision 배치 호출)
+    anchor_labels = []
+    pending = []
+    for idx in anchors:
+        results, image_bytes = frames[idx]
+        label, needs_llm = _route_expression(results, image_bytes)
+        if needs_llm:
+            pending.append((len(anchor_labels), frames[idx]))
+        anchor_labels.append(label)
+
+    if pending and not stage_allowed(STAGE_EXPRESSION_LLM, EXPRESSION_LLM_MIN_MS):
+        expression_stats["deadline_skipped"] += len(pending)
+        for pos, _ in pending:
+            if anchor_labels[pos] is None:
+                anchor_labels[pos] = "Unknown"
+        pending = []
+
+    if pending:
+        expression_stats["llm"] += len(pending)
+        pending_frames = [frame for _, frame in pending]
+        if EXPRESSION_BATCH_SIZE > 1:
+            llm_labels = await _expressions_with_llm_batch(pending_frames)
+        else:
+            llm_labels = [await _expression_with_llm(*frame) for frame in pending_frames]
+        for (pos, _), label in zip(pending, llm_labels):
+            anchor_labels[pos] = label
+
+    labels = [anchor_labels[segment] for segment in segment_of]
+    classified = len(anchors)
+    saved = len(labels) - classified
+    expression_stats["reused"] += saved
+    if saved:
+        print(f"🙂 표정 분류 {classified}/{len(labels)}회 (재사용 {saved}회)")
+    return labels, {"frames": len(labels), "classified": classified, "saved": saved}
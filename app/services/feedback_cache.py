@@ -0,0 +1,124 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from app.utils.cache import TTLCache
+from app.utils.executors import io_executor, ExecutorBusy
+
+# 피드백 문장 캐시
+# 같은 레슨의 학습자들은 같은 실수를 반복하므로 (레슨 ID + 틀린 부분 diff) 가 같으면 LLM을 다시 부르지 않는다.
+#   1단계: 프로세스 메모리 (LRU + TTL)
+#   2단계: SQLite 파일 (선택, FEEDBACK_CACHE_PATH 설정 시) → 재시작 / 다른 워커와 공유
+FEEDBACK_CACHE_SIZE = int(os.getenv("FEEDBACK_CACHE_SIZE", "4096"))
+FEEDBACK_CACHE_TTL = float(os.getenv("FEEDBACK_CACHE_TTL", str(24 * 3600)))
+FEEDBACK_CACHE_PATH = os.getenv("FEEDBACK_CACHE_PATH")
+FEEDBACK_CACHE_PERSIST_TTL = float(os.getenv("FEEDBACK_CACHE_PERSIST_TTL", str(30 * 24 * 3600)))
+
+
+def _canonical_leaves(d, prefix: str, out: list):
+    for k, v in d.items():
+        path = f"{prefix}.{k}" if prefix else str(k)
+        if isinstance(v, dict):
+            _canonical_leaves(v, path, out)
+        else:
+            # 채점과 같은 규칙으로 값 정규화 ("true" == True)
+            out.append(f"{path}={str(v).lower() if v is not None else 'none'}")
+
+
+def diff_hash(wrong_parts: dict) -> str:
+    """틀린 부분 dict의 정규화 해시 (키 순서 / true·"true" 표기 차이에 영향받지 않음)"""
+    leaves = []
+    _canonical_leaves(wrong_parts or {}, "", leaves)
+    canonical = "\n".join(sorted(leaves))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def feedback_key(lesson_id, wrong_parts: dict) -> str:
+    return f"{lesson_id if lesson_id is not None else '*'}:{diff_hash(wrong_parts)}"
+
+
+class FeedbackCache:
+    def __init__(self, maxsize: int = FEEDBACK_CACHE_SIZE, ttl: float = FEEDBACK_CACHE_TTL,
+                 path: str = FEEDBACK_CACHE_PATH, persist_ttl: float = FEEDBACK_CACHE_PERSIST_TTL):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.persist_ttl = persist_ttl
+        self.persistent_hits = 0
+        self.path = path
+        self._db = None
+        self._db_lock = threading.Lock()
+
+        if path:
+            self._open()
+
+    def _open(self):
+        if self.path:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS feedback ("
+                " key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def _reopen_after_fork(self):
+        self._db_lock = threading.Lock()
+        self._open()
+
+    async def get(self, key: str) -> str:
+        text = self.memory.get(key)
+        if text is not None:
+            return text
+
+        if self._db is not None:
+            # SQLite 조회 / 쓰기 중인 다른 요청의 lock 대기가 이벤트 루프를 막지 않게 io 실행기에서
+            try:
+                row = await io_executor.run(self._load, key)
+            except ExecutorBusy:
+                return None  # 영구 저장소는 선택 사항 → 미스로 처리
+            if row and time.time() - row[1] < self.persist_ttl:
+                self.persistent_hits += 1
+                self.memory.set(key, row[0])
+                return row[0]
+        return None
+
+    async def set(self, key: str, text: str, persist: bool = True):
+        self.memory.set(key, text)
+        if persist and self._db is not None:
+            try:
+                await io_executor.run(self._store, key, text)
+            except ExecutorBusy:
+                pass  # 메모리에는 남아 있음
+
+    def _load(self, key: str):
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT text, created_at FROM feedback WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _store(self, key: str, text: str):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO feedback (key, text, created_at) VALUES (?, ?, ?)",
+                (key, text, time.time())
+            )
+            self._db.commit()
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        # 메모리 미스 중 영구 저장소에서 찾은 것도 적중으로 계산
+        lookups = memory["hits"] + memory["misses"]
+        hits = memory["hits"] + self.persistent_hits
+        return {
+            "memory": memory,
+            "persistent_enabled": self._db is not None,
+            "persistent_hits": self.persistent_hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+feedback_cache = FeedbackCache()
+
+# SQLite 연결은 fork를 넘어 공유하면 안 되므로 (app.serve pre-fork 워커) 자식에서 새로 연결
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=feedback_cache._reopen_after_fork)
@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+from collections import Counter
+from itertools import combinations
+from app.ai import llm_client
+from app.services.answer_repository import get_answer_repository
+from app.services.feedback_cache import feedback_key
+from app.services.feedback_service import request_llm_feedback, FEEDBACK_TEMPLATES_ENABLED
+from app.services.feature_extractor import get_empty_hand_data, analyze_inter_hand_relation
+from app.services.feedback_table import FEEDBACK_TABLE_PATH, FEEDBACK_MISTAKE_LOG_PATH, read_entries, read_mistakes
+from app.services.feedback_templates import rank_leaves, leaf_phrase, template_covers, _as_bool
+from app.utils.similarity import compare_feature
+
+# 레슨별 흔한 실수에 대한 피드백 사전 생성 (오프라인 배치)
+#   1. 카탈로그의 모든 레슨에 대해 템플릿 문장 하나로 다 설명할 수 없는 diff 후보를 만든다
+#      (템플릿 없는 leaf / 그 leaf가 낀 2-leaf 조합 / 손이 안 잡힌 경우 + 서비스가 기록한 실수)
+#   2. 속도 제한이 걸린 워커 풀로 동시에 LLM 피드백 생성
+#   3. 결과를 한 줄씩 JSONL(feedback_table)에 추가 → 중간에 끊겨도 다시 실행하면 이어서 진행
+PRECOMPUTE_CONCURRENCY = int(os.getenv("FEEDBACK_PRECOMPUTE_CONCURRENCY", "4"))
+PRECOMPUTE_RPS = float(os.getenv("FEEDBACK_PRECOMPUTE_RPS", "2"))       # 초당 LLM 요청 수 상한
+PRECOMPUTE_PAIR_TOP_K = int(os.getenv("FEEDBACK_PRECOMPUTE_PAIR_TOP_K", "10"))  # 2-leaf 조합을 만들 상위 leaf 수
+PRECOMPUTE_MIN_MISTAKES = int(os.getenv("FEEDBACK_PRECOMPUTE_MIN_MISTAKES", "1"))  # 기록된 실수 중 이 횟수 이상만
+
+
+class RateLimiter:
+    """요청 시작 간격을 1/rate 초 이상으로 유지 (워커 여러 개가 공유)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def _nest(leaves) -> dict:
+    """[(경로 튜플, 정답 값)] → compare_feature의 wrong_parts와 같은 중첩 dict"""
+    diff = {}
+    for path, value in leaves:
+        cur = diff
+        for k in path[:-1]:
+            cur = cur.setdefault(k, {})
+        cur[path[-1]] = value
+    return diff
+
+
+def _missing_hand_diff(answer_frame: dict, side: str) -> dict:
+    """정답에 있는 손이 화면에 안 잡힌 경우의 diff (특징 추출기가 손이 없을 때 내는 값 기준)"""
+    hand = answer_frame.get(side)
+    if not isinstance(hand, dict) or _as_bool(hand.get("present")) is not True:
+        return None
+
+    user = dict(answer_frame)
+    user[side] = get_empty_hand_data()
+    if "inter_hand_relation" in answer_frame:
+        user["inter_hand_relation"] = analyze_inter_hand_relation(None, None)
+    _, diff = compare_feature(user, answer_frame)
+    return diff or None
+
+
+def candidate_diffs(answer_frame: dict, pair_top_k: int = PRECOMPUTE_PAIR_TOP_K,
+                    include_templated: bool = False) -> list[dict]:
+    """
+    정답 프레임 하나에 대해 나올 법한 diff 중 템플릿 문장 하나로 다 설명할 수 없는 후보
+    - 1-leaf: 템플릿이 없는 leaf
+    - 2-leaf: 템플릿이 없는 leaf × 중요도(템플릿 우선순위) 상위 pair_top_k leaf
+    - 손 하나가 안 잡힌 경우: 틀린 항목이 많아 템플릿은 상위 항목만 언급함
+    include_templated=True 면 모든 leaf / 상위 leaf끼리의 조합도 포함
+    """
+    ranked = [(path, value) for _, path, value in rank_leaves(answer_frame)]
+    top = ranked[:pair_top_k]
+
+    if include_templated:
+        diffs = [_nest([leaf]) for leaf in ranked]
+        diffs.extend(_nest(pair) for pair in combinations(top, 2))
+    else:
+        untemplated = [leaf for leaf in ranked if leaf_phrase(*leaf) is None]
+        diffs = [_nest([leaf]) for leaf in untemplated]
+        diffs.extend(_nest([leaf, other]) for leaf in untemplated for other in top if other != leaf)
+
+    for side in ("left", "right"):
+        diff = _missing_hand_diff(answer_frame, side)
+        if diff:
+            diffs.append(diff)
+    return diffs
+
+
+def logged_mistakes(path: str, lesson_ids: list[int] = None, min_count: int = PRECOMPUTE_MIN_MISTAKES) -> list:
+    """서비스가 기록한 실수 → [(레슨 ID, diff)] (많이 나온 순, lesson_ids가 있으면 그 레슨만)"""
+    counts = Counter()
+    diffs = {}
+    wanted = set(lesson_ids) if lesson_ids is not None else None
+    for entry in read_mistakes(path):
+        lid = entry.get("lesson_id")
+        if wanted is not None and lid not in wanted:
+            continue
+        key = feedback_key(lid, entry["wrong_parts"])
+        counts[key] += 1
+        diffs[key] = (lid, entry["wrong_parts"])
+    return [diffs[key] for key, count in counts.most_common() if count >= min_count]
+
+
+async def _stub_feedback(evaluation) -> str:
+    """로컬 테스트용 가짜 LLM: diff를 그대로 문장으로 (네트워크 호출 없음)"""
+    await asyncio.sleep(0)
+    leaves = [f"{'.'.join(path)}={value}" for _, path, value in rank_leaves(evaluation["wrong_parts"])]
+    return "Check " + ", ".join(leaves) + "."
+
+
+async def _list_lesson_ids() -> list[int]:
+    return [int(item["id"]) for item in await get_answer_repository().list_lessons()]
+
+
+async def precompute(lesson_ids: list[int] = None, out_path: str = FEEDBACK_TABLE_PATH,
+                     concurrency: int = PRECOMPUTE_CONCURRENCY, rps: float = PRECOMPUTE_RPS,
+                     pair_top_k: int = PRECOMPUTE_PAIR_TOP_K, include_templated: bool = False,
+                     mistakes_path: str = FEEDBACK_MISTAKE_LOG_PATH, min_mistakes: int = PRECOMPUTE_MIN_MISTAKES,
+                     generate=request_llm_feedback) -> dict:
+    started = time.time()
+    repository = get_answer_repository()
+    # 레슨을 지정하면 기록된 실수도 그 레슨 것만
+    mistakes = logged_mistakes(mistakes_path, lesson_ids, min_mistakes) if mistakes_path else []
+    if lesson_ids is None:
+        lesson_ids = await _list_lesson_ids()
+
+    # 이미 만든 키는 건너뜀 (재실행 시 이어서 진행)
+    done = {entry["key"] for entry in read_entries(out_path)}
+
+    summary = {"lessons": len(lesson_ids), "candidates": 0, "logged": len(mistakes), "templated": 0,
+               "already_done": 0, "generated": 0, "failed": 0}
+
+    queue = asyncio.Queue()
+    queued = set()
+
+    def enqueue(lid, diff):
+        key = feedback_key(lid, diff)
+        if key in queued:
+            return
+        queued.add(key)
+        summary["candidates"] += 1
+
+        # 서비스에서 템플릿 문장 하나로 다 설명하는 diff는 테이블을 조회하지 않음
+        if not include_templated and FEEDBACK_TEMPLATES_ENABLED and template_covers(diff):
+            summary["templated"] += 1
+            return
+        if key in done:
+            summary["already_done"] += 1
+            return
+        queue.put_nowait((key, lid, diff))
+
+    # 실제로 기록된 실수부터 (많이 나온 순)
+    for lid, diff in mistakes:
+        enqueue(lid, diff)
+    for lid in lesson_ids:
+        for answer_frame in await repository.get_answer_frames(lid):
+            for diff in candidate_diffs(answer_frame, pair_top_k, include_templated):
+                enqueue(lid, diff)
+
+    total = queue.qsize()
+    print(f"🧮 후보 {summary['candidates']}개 (기록된 실수 {summary['logged']}) 중 생성 대상 {total}개 "
+          f"(템플릿 {summary['templated']}, 완료됨 {summary['already_done']})")
+
+    limiter = RateLimiter(rps)
+
+    with open(out_path, "a", encoding="utf-8") as out:
+
+        async def worker():
+            while True:
+                try:
+                    key, lid, diff = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await limiter.acquire()
+                try:
+                    feedback = await generate({"is_correct": False, "wrong_parts": diff})
+                except Exception as e:
+                    # 실패한 항목은 기록하지 않음 → 다음 실행에서 다시 시도
+                    summary["failed"] += 1
+                    print(f"⚠️ 레슨 {lid} 피드백 생성 실패: {e}")
+                    continue
+
+                entry = {"key": key, "lesson_id": lid, "wrong_parts": diff, "feedback": feedback.strip()}
+                out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                out.flush()
+                summary["generated"] += 1
+                if summary["generated"] % 50 == 0:
+                    print(f"   ... {summary['generated']}/{total}")
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    summary["elapsed_sec"] = round(time.time() - started, 1)
+    print(f"✅ 피드백 사전 생성 완료: {summary}")
+    return summary
+
+
+if __name__ == "__main__":
+    # python -m app.services.feedback_precompute --out feedback_table.jsonl
+    # python -m app.services.feedback_precompute --lessons 1,2 --stub-llm            (네트워크 없이 테스트)
+    # python -m app.services.feedback_precompute --mistakes feedback_mistakes.jsonl  (서비스가 기록한 실수 포함)
+    # python -m app.services.feedback_precompute --llm-endpoint http://localhost:8001/ (로컬 OpenAI 호환 서버)
+    parser = argparse.ArgumentParser(description="레슨별 흔한 실수 피드백 사전 생성")
+    parser.add_argument("--out", default=FEEDBACK_TABLE_PATH)
+    parser.add_argument("--lessons", help="쉼표로 구분한 레슨 ID (기본: 카탈로그 전체)")
+    parser.add_argument("--concurrency", type=int, default=PRECOMPUTE_CONCURRENCY)
+    parser.add_argument("--rps", type=float, default=PRECOMPUTE_RPS)
+    parser.add_argument("--pair-top-k", type=int, default=PRECOMPUTE_PAIR_TOP_K)
+    parser.add_argument("--include-templated", action="store_true", help="템플릿으로 답하는 diff도 생성")
+    parser.add_argument("--mistakes", default=FEEDBACK_MISTAKE_LOG_PATH, help="서비스가 기록한 실수 JSONL")
+    parser.add_argument("--min-mistakes", type=int, default=PRECOMPUTE_MIN_MISTAKES)
+    parser.add_argument("--stub-llm", action="store_true", help="LLM 대신 가짜 생성기 사용")
+    parser.add_argument("--llm-endpoint", help="AZURE_OPENAI_ENDPOINT 대신 사용할 엔드포인트")
+    args = parser.parse_args()
+
+    if args.llm_endpoint:
+        llm_client.AZURE_OPENAI_ENDPOINT = args.llm_endpoint.rstrip("/") + "/"
+
+    async def main():
+        from app.services.backend_client import close_backend_client
+
+        try:
+            lesson_ids = [int(x) for x in args.lessons.split(",")] if args.lessons else None
+            await precompute(
+                lesson_ids=lesson_ids,
+                out_path=args.out,
+                concurrency=args.concurrency,
+                rps=args.rps,
+                pair_top_k=args.pair_top_k,
+                include_templated=args.include_templated,
+                mistakes_path=args.mistakes,
+                min_mistakes=args.min_mistakes,
+                generate=_stub_feedback if args.stub_llm else request_llm_feedback,
+            )
+        finally:
+            await llm_client.close_llm_client()
+            await close_backend_client()
+
+    asyncio.run(main())
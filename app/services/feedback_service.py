@@ -1,20 +1,162 @@
-from app.ai.llm_client import call_llm
+import os
+from app.ai.llm_client import call_llm, stream_llm
+from app.services.feedback_cache import feedback_cache, feedback_key
+from app.services.feedback_table import feedback_table, mistake_log
+from app.services.feedback_templates import (
+    render_template_feedback, template_phrases, FEEDBACK_TEMPLATE_MAX_PHRASES,
+)
+from app.services.diff_serializer import serialize_diff
+from app.utils.deadline import (
+    DeadlineExceeded, current_deadline, stage_allowed,
+    FEEDBACK_LLM_MIN_MS, STAGE_FEEDBACK, STAGE_FEEDBACK_LLM,
+)
 
-def generate_feedback(evaluation):
+# 규칙 기반 템플릿으로 만들 수 있는 피드백은 LLM을 거치지 않음
+FEEDBACK_TEMPLATES_ENABLED = os.getenv("FEEDBACK_TEMPLATES_ENABLED", "true").lower() == "true"
 
-    # 정답이면 LLM 호출 안 함
-    if evaluation["is_correct"]:
-        return "Congratulations!"
+# 피드백 생성 경로별 횟수
+# template_top: 항목이 많아 템플릿이 중요도 상위 항목만 언급한 경우
+feedback_stats = {"template": 0, "template_top": 0, "table": 0, "cache": 0, "llm": 0, "degraded": 0, "score_only": 0}
+
+# 마감 시간 때문에 LLM을 못 쓰고, 템플릿으로도 설명할 수 있는 항목이 없을 때
+FALLBACK_FEEDBACK = "Compare your sign with the example and try again."
 
-    prompt = f"""
+# 프롬프트에 diff를 "경로=값" 목록(상위 N개)으로 넣음, false면 기존 dict repr 방식
+FEEDBACK_PROMPT_COMPACT = os.getenv("FEEDBACK_PROMPT_COMPACT", "true").lower() == "true"
+
+def _legacy_prompt(wrong_parts) -> str:
+    return f"""
             너는 미국 수어 학습 코치야.
 
             사용자가 수어 동작을 틀렸는데, 원래는 다음과 같이 동작해야 하는데 사용자가 그렇게 동작하지 않았어.
 
             [정답 수어 특징]
-            {evaluation["wrong_parts"]}
+            {wrong_parts}
 
             사용자가 왜 틀렸는지, 그래서 어떻게 고쳐야 하는지 사용자에게 아주 짧고 핵심적으로 1 문장의 영어로 피드백해 줘. 지어야 하는 표정이 특성에 있다면 그것도 같이 말해줘. 강조 기호는 사용하지마. e.g.) Stretch your pinky finger, turn your wrist forward, etc..
             """
 
-    return call_llm(prompt)
+def _compact_prompt(wrong_parts) -> str:
+    features = "\n".join(serialize_diff(wrong_parts))
+    return (
+        "[정답 수어 특징] (중요한 순, 경로=정답 값)\n"
+        f"{features}\n\n"
+        "사용자가 위처럼 동작하지 않았어. 어떻게 고쳐야 하는지 영어 1 문장으로 짧게 알려줘. "
+        "e.g.) Stretch your pinky finger, turn your wrist forward"
+    )
+
+def build_feedback_prompt(wrong_parts, compact: bool = None) -> str:
+    if compact is None:
+        compact = FEEDBACK_PROMPT_COMPACT
+    return _compact_prompt(wrong_parts) if compact else _legacy_prompt(wrong_parts)
+
+async def _feedback_without_llm(evaluation, lesson_id: int = None):
+    """
+    LLM 없이 만들 수 있는 피드백 조회 → (피드백 또는 None, 캐시 키, 실수 기록 여부)
+    템플릿 문장 하나로 다 설명하지 못하는 diff는 사전 생성 배치의 후보가 되도록 기록한다.
+    """
+
+    # 정답이면 LLM 호출 안 함
+    if evaluation["is_correct"]:
+        return "Congratulations!", None, False
+
+    # 템플릿 문장 하나로 모든 틀린 항목을 언급할 수 있으면 바로 문장 생성
+    phrases = None
+    if FEEDBACK_TEMPLATES_ENABLED:
+        phrases = template_phrases(evaluation["wrong_parts"])
+        if phrases is not None and len(phrases) <= FEEDBACK_TEMPLATE_MAX_PHRASES:
+            feedback_stats["template"] += 1
+            return render_template_feedback(evaluation["wrong_parts"]), None, False
+
+    cache_key = feedback_key(lesson_id, evaluation["wrong_parts"])
+
+    # 오프라인 배치로 미리 만들어 둔 피드백 (feedback_precompute)
+    precomputed = feedback_table.get(cache_key)
+    if precomputed is not None:
+        feedback_stats["table"] += 1
+        return precomputed, cache_key, False
+
+    # 같은 레슨에서 같은 실수(diff)면 이전에 만든 피드백 재사용
+    cached = await feedback_cache.get(cache_key)
+    if cached is not None:
+        feedback_stats["cache"] += 1
+        return cached, cache_key, False
+
+    # 항목이 많아 템플릿은 상위 항목만 언급할 수 있음 → 미리 만든 문장이 없으면 그대로 사용 (LLM 호출 없음)
+    if phrases is not None:
+        feedback_stats["template_top"] += 1
+        return render_template_feedback(evaluation["wrong_parts"]), cache_key, True
+
+    return None, cache_key, True
+
+def _degraded_feedback(evaluation) -> str:
+    """
+    요청 마감 때문에 LLM을 건너뜀 → 아는 항목만으로 만든 템플릿 피드백
+    마감이 이미 지났으면 피드백 없이 점수만 (빈 문자열)
+    """
+    deadline = current_deadline()
+    deadline.skip(STAGE_FEEDBACK_LLM)
+    if deadline.expired():
+        deadline.skip(STAGE_FEEDBACK)
+        feedback_stats["score_only"] += 1
+        return ""
+    feedback_stats["degraded"] += 1
+    return render_template_feedback(evaluation["wrong_parts"], partial=True) or FALLBACK_FEEDBACK
+
+async def generate_feedback(evaluation, lesson_id: int = None):
+    feedback, cache_key, uncovered = await _feedback_without_llm(evaluation, lesson_id)
+    if uncovered:
+        await mistake_log.record(cache_key, lesson_id, evaluation["wrong_parts"])
+    if feedback is not None:
+        return feedback
+
+    if not stage_allowed(STAGE_FEEDBACK_LLM, FEEDBACK_LLM_MIN_MS):
+        return _degraded_feedback(evaluation)
+
+    feedback_stats["llm"] += 1
+    try:
+        feedback = await call_llm(build_feedback_prompt(evaluation["wrong_parts"]))
+    except DeadlineExceeded:
+        return _degraded_feedback(evaluation)
+    await feedback_cache.set(cache_key, feedback)
+    return feedback
+
+async def request_llm_feedback(evaluation) -> str:
+    """템플릿 / 캐시를 거치지 않고 바로 LLM으로 피드백 생성 (오프라인 사전 생성 배치용)"""
+    return await call_llm(build_feedback_prompt(evaluation["wrong_parts"]))
+
+async def stream_feedback(evaluation, lesson_id: int = None):
+    """
+    피드백을 생성되는 대로 조각 단위로 yield
+    정답 / 템플릿 / 캐시 적중이면 완성된 문장을 한 번에 내보냄
+    """
+    feedback, cache_key, uncovered = await _feedback_without_llm(evaluation, lesson_id)
+    if uncovered:
+        await mistake_log.record(cache_key, lesson_id, evaluation["wrong_parts"])
+    if feedback is not None:
+        yield feedback
+        return
+
+    if not stage_allowed(STAGE_FEEDBACK_LLM, FEEDBACK_LLM_MIN_MS):
+        feedback = _degraded_feedback(evaluation)
+        if feedback:
+            yield feedback
+        return
+
+    feedback_stats["llm"] += 1
+    tokens = []
+    try:
+        async for token in stream_llm(build_feedback_prompt(evaluation["wrong_parts"])):
+            tokens.append(token)
+            yield token
+    except DeadlineExceeded:
+        # 첫 토큰 전에 마감되면 대체 피드백 (이미 보낸 토큰이 있으면 거기서 끝냄)
+        if not tokens:
+            feedback = _degraded_feedback(evaluation)
+            if feedback:
+                yield feedback
+        return
+
+    # 끝까지 받은 경우에만 캐시 (중간에 연결이 끊기면 저장 안 함)
+    if tokens:
+        await feedback_cache.set(cache_key, "".join(tokens))
@@ -0,0 +1,113 @@
+import os
+import json
+import threading
+from app.utils.executors import io_executor, ExecutorBusy
+
+# 사전 생성된 피드백 조회 테이블
+# feedback_precompute 배치가 레슨별 흔한 실수(diff)에 대한 피드백을 미리 만들어 JSONL로 저장하고,
+# 서비스는 시작할 때 한 번 읽어서 메모리 dict로 조회한다. (키: feedback_key = "레슨 ID:diff 해시")
+#   {"key": "...", "lesson_id": 1, "wrong_parts": {...}, "feedback": "..."}
+FEEDBACK_TABLE_PATH = os.getenv("FEEDBACK_TABLE_PATH", "feedback_table.jsonl")
+# 템플릿 문장 하나로 다 설명하지 못한 실수(diff) 기록 → 다음 사전 생성 배치의 후보 (비워 두면 기록 안 함)
+#   {"key": "...", "lesson_id": 1, "wrong_parts": {...}}
+FEEDBACK_MISTAKE_LOG_PATH = os.getenv("FEEDBACK_MISTAKE_LOG_PATH")
+
+
+def read_entries(path: str):
+    """JSONL 항목을 차례로 반환 (배치가 중간에 끊겨 잘린 마지막 줄은 건너뜀)"""
+    if not path or not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("key") and entry.get("feedback"):
+                yield entry
+
+
+class FeedbackTable:
+    def __init__(self):
+        self._table = {}
+        self.path = None
+        self.hits = 0
+        self.lookups = 0
+
+    def load(self, path: str = FEEDBACK_TABLE_PATH) -> int:
+        """파일 전체를 읽어 테이블 교체, 읽은 항목 수 반환 (파일이 없으면 빈 테이블)"""
+        table = {entry["key"]: entry["feedback"] for entry in read_entries(path)}
+        self._table = table
+        self.path = path
+        if table:
+            print(f"✅ 사전 생성 피드백 로드: {path} ({len(table)}개)")
+        return len(table)
+
+    def get(self, key: str) -> str:
+        self.lookups += 1
+        text = self._table.get(key)
+        if text is not None:
+            self.hits += 1
+        return text
+
+    def __len__(self):
+        return len(self._table)
+
+    def __contains__(self, key):
+        return key in self._table
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "size": len(self._table),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+        }
+
+
+feedback_table = FeedbackTable()
+
+
+class MistakeLog:
+    """서비스에서 사전 생성 테이블이 필요했던 diff를 JSONL에 한 줄씩 추가 (워커 여러 개가 같은 파일에 append)"""
+
+    def __init__(self, path: str = FEEDBACK_MISTAKE_LOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def _append(self, line: str):
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    async def record(self, key: str, lesson_id, wrong_parts: dict):
+        if not self.path or not wrong_parts:
+            return
+        line = json.dumps({"key": key, "lesson_id": lesson_id, "wrong_parts": wrong_parts}, ensure_ascii=False) + "\n"
+        try:
+            await io_executor.run(self._append, line)
+            self.recorded += 1
+        except (OSError, ExecutorBusy) as e:
+            # 기록은 부가 기능이므로 실패해도 피드백 응답은 그대로
+            print(f"⚠️ 실수 기록 실패: {e}")
+
+
+def read_mistakes(path: str):
+    """실수 기록 JSONL 항목을 차례로 반환 (feedback 필드 없이 key / wrong_parts만 있음)"""
+    if not path or not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(entry, dict) and entry.get("key") and isinstance(entry.get("wrong_parts"), dict):
+                yield entry
+
+
+mistake_log = MistakeLog()
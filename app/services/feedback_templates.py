@@ -0,0 +1,209 @@
+from typing import Dict, List, Optional, Tuple
+
+# 규칙 기반 피드백 템플릿
+# compare_feature가 만든 diff(틀린 항목의 "정답 값")를 leaf 경로별 문장 조각으로 바꾼다.
+#   key  : (그룹, 항목)  예) ("finger_flexion", "pinky_extended")
+#   value: (정답이 True일 때 문구, 정답이 False일 때 문구, True 우선순위, False 우선순위)
+# 문구의 {side}는 "left " / "right " / "" 로 치환된다.
+# 우선순위가 높을수록 먼저 언급하며, 정답이 False인 항목("~하지 마")은 보통 낮게 둔다.
+
+FINGER_NAMES = {
+    "thumb": "thumb",
+    "index": "index finger",
+    "middle": "middle finger",
+    "ring": "ring finger",
+    "pinky": "pinky",
+}
+
+LEAF_RULES: Dict[Tuple[str, str], Tuple[str, str, int, int]] = {}
+
+
+def _rule(group: str, key: str, if_true: str, if_false: str, p_true: int, p_false: int):
+    LEAF_RULES[(group, key)] = (if_true, if_false, p_true, p_false)
+
+
+# --- 손 존재 여부 ---
+_rule("", "present", "use your {side}hand as well", "keep your {side}hand down", 100, 95)
+
+# --- 손 모양 ---
+for _f, _name in FINGER_NAMES.items():
+    _rule("finger_flexion", f"{_f}_extended", f"extend your {{side}}{_name}", f"fold your {{side}}{_name}", 80, 78)
+    _rule("finger_flexion", f"{_f}_folded", f"fold your {{side}}{_name}", f"extend your {{side}}{_name}", 80, 78)
+    _rule("finger_selection", _f, f"extend your {{side}}{_name}", f"fold your {{side}}{_name}", 40, 38)
+
+_rule("thumb_configuration", "thumb_opposed", "bring your {side}thumb across your palm", "keep your {side}thumb out to the side", 60, 40)
+_rule("thumb_configuration", "thumb_crossing", "cross your {side}thumb over your fingers", "keep your {side}thumb from crossing your fingers", 55, 35)
+for _f in ("index", "middle", "ring", "pinky"):
+    _rule("thumb_configuration", f"thumb_contact_{_f}",
+          f"touch your {{side}}thumb to your {FINGER_NAMES[_f]}",
+          f"keep your {{side}}thumb off your {FINGER_NAMES[_f]}", 60, 45)
+
+_rule("finger_contact", "index_middle_contact", "keep your {side}index and middle fingers together", "separate your {side}index and middle fingers", 50, 45)
+_rule("finger_contact", "middle_ring_contact", "keep your {side}middle and ring fingers together", "separate your {side}middle and ring fingers", 50, 45)
+_rule("finger_contact", "ring_pinky_contact", "keep your {side}ring finger and pinky together", "separate your {side}ring finger and pinky", 50, 45)
+_rule("finger_contact", "all_fingers_spread", "spread your {side}fingers apart", "don't spread your {side}fingers", 50, 30)
+_rule("finger_contact", "all_fingers_closed", "close your {side}fingers together", "open up your {side}fingers", 50, 30)
+
+# --- 방향 ---
+for _d in ("up", "down", "left", "right", "forward", "backward"):
+    _rule("orientation", f"palm_{_d}", f"turn your {{side}}palm {_d}", f"don't face your {{side}}palm {_d}", 70, 20)
+    _rule("orientation", f"fingers_{_d}", f"point your {{side}}fingers {_d}", f"don't point your {{side}}fingers {_d}", 65, 18)
+_rule("orientation", "wrist_pronated", "rotate your {side}wrist so the palm faces down", "don't rotate your {side}wrist palm-down", 55, 15)
+_rule("orientation", "wrist_supinated", "rotate your {side}wrist so the palm faces up", "don't rotate your {side}wrist palm-up", 55, 15)
+_rule("orientation", "wrist_neutral", "keep your {side}wrist straight", "rotate your {side}wrist", 50, 15)
+
+# --- 위치 ---
+for _part in ("head", "face", "neck", "torso", "arm"):
+    _rule("major", _part, f"move your {{side}}hand to your {_part}", f"move your {{side}}hand away from your {_part}", 65, 25)
+_rule("major", "handspace", "hold your {side}hand in the space in front of you", "don't hold your {side}hand out in front of you", 60, 20)
+for _part in ("forehead", "eye", "nose", "mouth", "chin", "cheek", "ear"):
+    _rule("face", _part, f"bring your {{side}}hand to your {_part}", f"move your {{side}}hand away from your {_part}", 62, 22)
+for _part in ("chest", "sternum", "stomach", "waist"):
+    _rule("torso", _part, f"bring your {{side}}hand to your {_part}", f"move your {{side}}hand away from your {_part}", 58, 22)
+_rule("arm", "upper_arm", "place your {side}hand on your upper arm", "move your {side}hand off your upper arm", 55, 20)
+_rule("arm", "forearm", "place your {side}hand on your forearm", "move your {side}hand off your forearm", 55, 20)
+_rule("arm", "wrist", "place your {side}hand at your wrist", "move your {side}hand away from your wrist", 55, 20)
+_rule("hand_relative", "palm", "touch the palm of your other hand", "don't touch the palm of your other hand", 55, 20)
+_rule("hand_relative", "back_of_hand", "touch the back of your other hand", "don't touch the back of your other hand", 55, 20)
+_rule("spatial_height", "high", "raise your {side}hand higher", "lower your {side}hand", 45, 25)
+_rule("spatial_height", "mid", "hold your {side}hand at chest height", "move your {side}hand away from chest height", 45, 20)
+_rule("spatial_height", "low", "lower your {side}hand", "raise your {side}hand", 45, 25)
+_rule("spatial_distance", "contact", "make contact with your body", "don't touch your body", 45, 25)
+_rule("spatial_distance", "near", "keep your {side}hand close to your body", "move your {side}hand further from your body", 40, 20)
+_rule("spatial_distance", "far", "hold your {side}hand further from your body", "bring your {side}hand closer to your body", 40, 20)
+
+# --- 양손 / 손가락 관계 ---
+# 손 하나의 present 항목과 항상 같이 틀리므로 우선순위를 낮게 둠 (중복 언급 방지)
+_rule("inter_hand_relation", "both_present", "use both hands", "use only one hand", 35, 35)
+_rule("inter_hand_relation", "forming_single_shape", "bring both hands together into a single shape", "keep your hands as separate shapes", 60, 30)
+_rule("inter_hand_relation", "mirrored_shape", "mirror the same shape with both hands", "don't mirror your hands", 55, 25)
+_rule("inter_hand_relation", "hand_distance_close", "bring your hands closer together", "keep your hands further apart", 55, 35)
+_rule("inter_hand_relation", "finger_tips_facing", "point your fingertips toward each other", "don't point your fingertips toward each other", 50, 25)
+_rule("finger_relation", "index_middle_crossed", "cross your index and middle fingers", "uncross your index and middle fingers", 55, 45)
+_rule("finger_relation", "index_over_middle", "put your index finger over your middle finger", "don't put your index finger over your middle finger", 50, 30)
+_rule("finger_relation", "middle_over_index", "put your middle finger over your index finger", "don't put your middle finger over your index finger", 50, 30)
+
+# --- 표정 (값이 문자열) ---
+EXPRESSION_PHRASES = {
+    "question": "raise your eyebrows with a questioning face",
+    "positive": "smile with a positive face",
+    "negative": "make a frowning, negative face",
+    "neutral": "keep a neutral face",
+}
+EXPRESSION_PRIORITY = 75
+
+FEEDBACK_TEMPLATE_MAX_PHRASES = 2
+
+
+def _as_bool(value) -> Optional[bool]:
+    # compare_feature와 같은 규칙으로 "true"/"false" 문자열도 허용
+    text = str(value).lower()
+    if text == "true":
+        return True
+    if text == "false":
+        return False
+    return None
+
+
+def _iter_leaves(d: dict, path: tuple = ()):
+    for k, v in d.items():
+        if isinstance(v, dict):
+            yield from _iter_leaves(v, path + (k,))
+        else:
+            yield path + (k,), v
+
+
+def leaf_phrase(path: tuple, value) -> Optional[Tuple[int, str]]:
+    """
+    diff leaf 하나 → (우선순위, 문장 조각), 템플릿이 없으면 None
+    path 예) ("right", "handshape", "finger_flexion", "pinky_extended")
+    """
+    if len(path) >= 2 and path[-2] == "non_manual_signal" and path[-1] == "expression":
+        phrase = EXPRESSION_PHRASES.get(str(value).lower())
+        return (EXPRESSION_PRIORITY, phrase) if phrase else None
+
+    side = ""
+    if path and path[0] in ("left", "right"):
+        side = f"{path[0]} "
+
+    group = path[-2] if len(path) >= 2 and path[-2] not in ("left", "right") else ""
+    rule = LEAF_RULES.get((group, path[-1]))
+    if rule is None:
+        return None
+
+    flag = _as_bool(value)
+    if flag is None:
+        return None
+
+    if_true, if_false, p_true, p_false = rule
+    template, priority = (if_true, p_true) if flag else (if_false, p_false)
+    return priority, template.format(side=side)
+
+
+def rank_leaves(wrong_parts: dict) -> List[Tuple[int, tuple, object]]:
+    """diff leaf들을 중요도 순으로 정렬 → [(우선순위, 경로, 정답 값)] (템플릿 없는 leaf는 우선순위 0)"""
+    ranked = []
+    for path, value in _iter_leaves(wrong_parts or {}):
+        rendered = leaf_phrase(path, value)
+        ranked.append((rendered[0] if rendered else 0, path, value))
+    ranked.sort(key=lambda x: -x[0])
+    return ranked
+
+
+def hidden_sides(wrong_parts: dict) -> set:
+    """정답에서 내려야 하는 손(present=False)은 나머지 세부 항목을 언급할 필요가 없음"""
+    return {
+        side for side in ("left", "right")
+        if isinstance(wrong_parts.get(side), dict) and _as_bool(wrong_parts[side].get("present")) is False
+    }
+
+
+def template_phrases(wrong_parts: dict, partial: bool = False) -> Optional[List[str]]:
+    """
+    diff → 중요도 순 문장 조각 (같은 문구 중복 제거, 개수 제한 없음)
+    하나라도 모르는 leaf가 있으면 None, partial=True 면 모르는 leaf는 건너뜀
+    """
+    if not wrong_parts:
+        return None
+
+    hidden = hidden_sides(wrong_parts)
+
+    phrases = []
+    for path, value in _iter_leaves(wrong_parts):
+        if path[0] in hidden and path[-1] != "present":
+            continue
+        rendered = leaf_phrase(path, value)
+        if rendered is None:
+            if partial:
+                continue
+            return None
+        phrases.append(rendered)
+
+    # 중요도 순 + 같은 문구 중복 제거 (예: pinky_extended=True / pinky_folded=False)
+    phrases.sort(key=lambda x: -x[0])
+    selected = []
+    for _, phrase in phrases:
+        if phrase not in selected:
+            selected.append(phrase)
+    return selected or None
+
+
+def template_covers(wrong_parts: dict, max_phrases: int = FEEDBACK_TEMPLATE_MAX_PHRASES) -> bool:
+    """템플릿 문장 하나로 diff의 모든 항목을 빠짐없이 언급할 수 있는지 (상위 항목만 고르는 경우는 False)"""
+    phrases = template_phrases(wrong_parts)
+    return phrases is not None and len(phrases) <= max_phrases
+
+
+def render_template_feedback(wrong_parts: dict, max_phrases: int = FEEDBACK_TEMPLATE_MAX_PHRASES,
+                             partial: bool = False) -> Optional[str]:
+    """
+    모든 diff leaf가 템플릿으로 커버되면 영어 1 문장 피드백을 만들고, 하나라도 모르는 leaf가 있으면 None (→ LLM 사용)
+    항목이 max_phrases보다 많으면 중요도 상위 항목만 언급한다.
+    partial=True 면 모르는 leaf는 건너뛰고 아는 것만으로 문장 생성 (LLM을 쓸 수 없을 때의 대체 피드백)
+    """
+    phrases = template_phrases(wrong_parts, partial=partial)
+    if not phrases:
+        return None
+
+    sentence = " and ".join(phrases[:max_phrases])
+    return sentence[0].upper() + sentence[1:] + "."
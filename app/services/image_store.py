@@ -0,0 +1,201 @@
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import threading
+import cv2
+import httpx
+import numpy as np
+from app.utils.executors import io_executor
+
+# 생성 이미지 로컬 저장소
+# DALL-E가 돌려주는 URL은 만료되므로, 생성 직후 한 번 내려받아 내용 해시(sha256) 이름으로 디스크에 보관하고
+# 우리 엔드포인트(/api/images/...)로 제공한다.
+#   {dir}/{sha[:2]}/{sha}.png        원본
+#   {dir}/{sha[:2]}/{sha}_{size}.jpg 썸네일 (선택)
+#   {dir}/index.db                   image_prompt 해시 → 이미지 (같은 / 거의 같은 프롬프트는 다시 생성하지 않음)
+IMAGE_STORE_ENABLED = os.getenv("IMAGE_STORE_ENABLED", "true").lower() == "true"
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "image_store")
+IMAGE_PUBLIC_BASE_URL = os.getenv("IMAGE_PUBLIC_BASE_URL", "").rstrip("/")  # 비우면 상대 경로 (/api/images/...)
+IMAGE_THUMB_SIZES = [int(s) for s in os.getenv("IMAGE_THUMB_SIZES", "256").split(",") if s.strip()]
+IMAGE_THUMB_QUALITY = int(os.getenv("IMAGE_THUMB_QUALITY", "85"))
+IMAGE_PROMPT_SIMILARITY = float(os.getenv("IMAGE_PROMPT_SIMILARITY", "0.9"))  # 단어 집합 Jaccard, 1.0이면 완전 일치만
+IMAGE_DOWNLOAD_TIMEOUT = float(os.getenv("IMAGE_DOWNLOAD_TIMEOUT", "30"))
+
+ASSET_NAME = re.compile(r"^([0-9a-f]{64})(?:_(\d+))?\.(png|jpg)$")
+_WORDS = re.compile(r"[a-z0-9]+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(_WORDS.findall(str(prompt or "").lower()))
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha1(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ImageStore:
+    def __init__(self, root: str = IMAGE_STORE_DIR, thumb_sizes: list = None,
+                 similarity: float = IMAGE_PROMPT_SIMILARITY):
+        self.root = root
+        self.thumb_sizes = IMAGE_THUMB_SIZES if thumb_sizes is None else thumb_sizes
+        self.similarity = similarity
+        self._db = None
+        self._lock = threading.Lock()
+        self._prompts = {}  # prompt_hash -> (단어 집합, sha)
+
+        # 지표
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.downloads = 0
+        self.download_failures = 0
+        self.stored_bytes = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        """처음 쓸 때 디렉토리 / 인덱스 생성 후 프롬프트 목록을 메모리로 읽어 둠"""
+        if self._db is None:
+            os.makedirs(self.root, exist_ok=True)
+            db = sqlite3.connect(os.path.join(self.root, "index.db"), check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS prompts ("
+                " prompt_hash TEXT PRIMARY KEY, prompt TEXT NOT NULL, sha TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            db.commit()
+            for key, prompt, sha in db.execute("SELECT prompt_hash, prompt, sha FROM prompts"):
+                if os.path.exists(self.path(sha)):
+                    self._prompts[key] = (frozenset(prompt.split()), sha)
+            self._db = db
+        return self._db
+
+    def path(self, sha: str, size: int = None) -> str:
+        name = f"{sha}_{size}.jpg" if size else f"{sha}.png"
+        return os.path.join(self.root, sha[:2], name)
+
+    def url(self, sha: str, size: int = None) -> str:
+        name = f"{sha}_{size}.jpg" if size else f"{sha}.png"
+        return f"{IMAGE_PUBLIC_BASE_URL}/api/images/{name}"
+
+    def find(self, image_prompt: str):
+        """같은 프롬프트(정규화 기준) → 없으면 단어 집합이 거의 같은 프롬프트의 이미지 sha (블로킹: 이벤트 루프에서는 lookup)"""
+        with self._lock:
+            self._conn()
+            key = prompt_hash(image_prompt)
+            hit = self._prompts.get(key)
+            if hit is not None:
+                self.exact_hits += 1
+                return hit[1]
+
+            if self.similarity < 1.0:
+                words = frozenset(normalize_prompt(image_prompt).split())
+                best, best_score = None, self.similarity
+                for other_words, sha in self._prompts.values():
+                    score = _jaccard(words, other_words)
+                    if score >= best_score:
+                        best, best_score = sha, score
+                if best is not None:
+                    self.similar_hits += 1
+                    return best
+
+            self.misses += 1
+            return None
+
+    async def lookup(self, image_prompt: str):
+        """find를 io 실행기에서 (첫 호출의 SQLite 열기 / 인덱스 읽기, 쓰기 중 lock 대기, 유사도 비교가 이벤트 루프를 막지 않게)"""
+        return await io_executor.run(self.find, image_prompt)
+
+    def _write(self, image_bytes: bytes) -> str:
+        sha = hashlib.sha256(image_bytes).hexdigest()
+        path = self.path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(image_bytes)
+            os.replace(tmp, path)  # 읽는 쪽이 반쯤 쓴 파일을 보지 않게
+            self.stored_bytes += len(image_bytes)
+            self._write_thumbnails(sha, image_bytes)
+        return sha
+
+    def _write_thumbnails(self, sha: str, image_bytes: bytes):
+        if not self.thumb_sizes:
+            return
+        image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return
+        h, w = image.shape[:2]
+        for size in self.thumb_sizes:
+            scale = size / max(h, w)
+            thumb = cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+            ok, encoded = cv2.imencode(".jpg", thumb, [cv2.IMWRITE_JPEG_QUALITY, IMAGE_THUMB_QUALITY])
+            if ok:
+                with open(self.path(sha, size), "wb") as f:
+                    f.write(encoded.tobytes())
+
+    def _index(self, image_prompt: str, sha: str):
+        key = prompt_hash(image_prompt)
+        normalized = normalize_prompt(image_prompt)
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO prompts (prompt_hash, prompt, sha, created_at) VALUES (?, ?, ?, ?)",
+                (key, normalized, sha, time.time())
+            )
+            db.commit()
+            self._prompts[key] = (frozenset(normalized.split()), sha)
+
+    def save(self, image_bytes: bytes, image_prompt: str = None) -> str:
+        """원본 + 썸네일 저장, 프롬프트 인덱스 등록 → sha (블로킹: 이벤트 루프에서는 io 실행기로)"""
+        sha = self._write(image_bytes)
+        if image_prompt:
+            self._index(image_prompt, sha)
+        return sha
+
+    async def save_from_url(self, url: str, image_prompt: str = None) -> str:
+        """만료되기 전에 공급자 URL에서 한 번 내려받아 저장"""
+        try:
+            # 결과 URL은 Azure 밖(blob 저장소)이므로 api-key 기본 헤더가 붙은 LLM 클라이언트를 쓰지 않음
+            async with httpx.AsyncClient(timeout=IMAGE_DOWNLOAD_TIMEOUT, follow_redirects=True) as client:
+                response = await client.get(url)
+            response.raise_for_status()
+        except Exception:
+            self.download_failures += 1
+            raise
+        self.downloads += 1
+        return await io_executor.run(self.save, response.content, image_prompt)
+
+    def resolve(self, name: str):
+        """/api/images/{name} → 파일 경로 (잘못된 이름 / 없는 파일이면 None)"""
+        match = ASSET_NAME.match(name)
+        if not match:
+            return None
+        sha, size, ext = match.group(1), match.group(2), match.group(3)
+        if (ext == "jpg") != (size is not None):
+            return None
+        path = self.path(sha, int(size) if size else None)
+        return path if os.path.exists(path) else None
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        return {
+            "enabled": IMAGE_STORE_ENABLED,
+            "prompts": len(self._prompts),
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "downloads": self.downloads,
+            "download_failures": self.download_failures,
+            "stored_bytes": self.stored_bytes,
+            "hit_rate": round((self.exact_hits + self.similar_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+image_store = ImageStore()
@@ -0,0 +1,331 @@
+import os
+import json
+import time
+import shutil
+import fcntl
+import asyncio
+import argparse
+import numpy as np
+import httpx
+from pathlib import Path
+from app.services.backend_client import backend_get
+from app.utils.executors import io_executor
+from app.utils.feature_codec import FeatureVocabulary, encode_frame, decode_frame
+
+# 레슨 카탈로그 스냅샷
+# 모든 레슨의 메타데이터 + 정답 프레임을 로컬 디스크에 압축 저장하고 memory-map 해서 읽는다.
+# 같은 노드의 워커 프로세스들은 OS 페이지 캐시를 공유하므로 콜드 스타트 시 백엔드를 두드리지 않음
+#
+# 디렉토리 구조
+#   {LESSON_SNAPSHOT_DIR}/CURRENT            → 현재 버전 디렉토리 이름
+#   {LESSON_SNAPSHOT_DIR}/v{timestamp}/
+#       paths.npy          uint16  모든 프레임의 leaf 경로 ID를 이어 붙인 배열
+#       values.npy         uint16  위와 같은 길이의 leaf 값 ID 배열
+#       frame_offsets.npy  int64   프레임 f의 leaf 구간 = [offsets[f], offsets[f+1])
+#       index.json                 사전(경로/값) + 레슨별 {title, meta, frame_start, frame_count, etag}
+LESSON_SNAPSHOT_DIR = Path(os.getenv("LESSON_SNAPSHOT_DIR", "snapshot"))
+LESSON_SNAPSHOT_REFRESH_SEC = float(os.getenv("LESSON_SNAPSHOT_REFRESH_SEC", "600"))
+LESSON_SNAPSHOT_BUILD_ON_STARTUP = os.getenv("LESSON_SNAPSHOT_BUILD_ON_STARTUP", "false").lower() == "true"
+LESSON_LIST_PATH = os.getenv("LESSON_LIST_PATH", "/api/lessons")
+SNAPSHOT_FETCH_CONCURRENCY = int(os.getenv("SNAPSHOT_FETCH_CONCURRENCY", "8"))
+
+
+class CatalogSnapshot:
+    """memory-map 된 스냅샷 한 버전 (읽기 전용)"""
+
+    def __init__(self, version_dir: Path):
+        self.version_dir = version_dir
+        with open(version_dir / "index.json", "r", encoding="utf-8") as f:
+            index = json.load(f)
+
+        self.version = index["version"]
+        self.paths = index["paths"]
+        self.values = [json.loads(v) for v in index["values"]]
+        self.lessons = {int(k): v for k, v in index["lessons"].items()}
+
+        # mmap_mode="r" → 실제 데이터는 필요할 때 페이지 단위로 올라오고 프로세스끼리 공유됨
+        self.path_ids = np.load(version_dir / "paths.npy", mmap_mode="r")
+        self.value_ids = np.load(version_dir / "values.npy", mmap_mode="r")
+        self.frame_offsets = np.load(version_dir / "frame_offsets.npy", mmap_mode="r")
+
+    def __contains__(self, lessonId: int) -> bool:
+        return lessonId in self.lessons
+
+    def get_frames(self, lessonId: int) -> list:
+        """레슨의 정답 프레임들을 백엔드 응답과 같은 형태([{"hand": {...}}, ...])로 복원"""
+        info = self.lessons.get(lessonId)
+        if info is None:
+            return None
+
+        frames = []
+        for f in range(info["frame_start"], info["frame_start"] + info["frame_count"]):
+            start, end = int(self.frame_offsets[f]), int(self.frame_offsets[f + 1])
+            hand = decode_frame(self.path_ids[start:end], self.value_ids[start:end], self.paths, self.values)
+            frames.append({"hand": hand})
+        return frames
+
+    def get_lesson(self, lessonId: int) -> dict:
+        return self.lessons.get(lessonId)
+
+    def etag(self, lessonId: int) -> str:
+        info = self.lessons.get(lessonId)
+        return info.get("etag") if info else None
+
+
+_snapshot: CatalogSnapshot = None
+_snapshot_current_mtime = None
+_refresher_task: asyncio.Task = None
+
+
+# ==========================================
+# 읽기 (워커 프로세스)
+# ==========================================
+def load_snapshot() -> CatalogSnapshot:
+    """CURRENT가 가리키는 버전을 memory-map (이미 같은 버전이면 그대로)"""
+    global _snapshot, _snapshot_current_mtime
+
+    current_file = LESSON_SNAPSHOT_DIR / "CURRENT"
+    try:
+        mtime = current_file.stat().st_mtime_ns
+    except FileNotFoundError:
+        return _snapshot
+
+    if _snapshot is not None and mtime == _snapshot_current_mtime:
+        return _snapshot
+
+    version_name = current_file.read_text(encoding="utf-8").strip()
+    try:
+        _snapshot = CatalogSnapshot(LESSON_SNAPSHOT_DIR / version_name)
+        _snapshot_current_mtime = mtime
+        print(f"✅ 레슨 카탈로그 스냅샷 로드: {version_name} (레슨 {len(_snapshot.lessons)}개)")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ 스냅샷 로드 실패 ({version_name}): {e}")
+    return _snapshot
+
+
+def get_snapshot() -> CatalogSnapshot:
+    """현재 스냅샷 (다른 워커가 새 버전을 썼으면 다시 매핑)"""
+    return load_snapshot()
+
+
+def get_snapshot_stats() -> dict:
+    if _snapshot is None:
+        return {"loaded": False}
+    return {
+        "loaded": True,
+        "version": _snapshot.version,
+        "lessons": len(_snapshot.lessons),
+        "frames": int(len(_snapshot.frame_offsets) - 1),
+        "leaves": int(len(_snapshot.path_ids)),
+    }
+
+
+# ==========================================
+# 쓰기 (CLI / 갱신 담당 워커 하나)
+# ==========================================
+def write_snapshot(lessons: dict) -> str:
+    """
+    lessons: {lesson_id: {"meta": {...}, "frames": [hand dict, ...], "etag": str|None}}
+    새 버전 디렉토리에 쓴 뒤 CURRENT를 원자적으로 교체
+    """
+    LESSON_SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    version = f"v{int(time.time() * 1000)}"
+    tmp_dir = LESSON_SNAPSHOT_DIR / f".{version}.tmp"
+    tmp_dir.mkdir()
+
+    vocab = FeatureVocabulary()
+    all_paths, all_values = [], []
+    offsets = [0]
+    index_lessons = {}
+
+    for lid in sorted(lessons):
+        item = lessons[lid]
+        frame_start = len(offsets) - 1
+        for frame in item["frames"]:
+            path_ids, value_ids = encode_frame(frame, vocab)
+            all_paths.extend(path_ids)
+            all_values.extend(value_ids)
+            offsets.append(len(all_paths))
+
+        meta = item.get("meta") or {}
+        index_lessons[str(lid)] = {
+            "title": meta.get("title"),
+            "meta": meta,
+            "frame_start": frame_start,
+            "frame_count": len(item["frames"]),
+            "etag": item.get("etag"),
+        }
+
+    if len(vocab.paths) > np.iinfo(np.uint16).max or len(vocab.values) > np.iinfo(np.uint16).max:
+        raise ValueError("스냅샷 사전 크기가 uint16 범위를 넘었습니다.")
+
+    np.save(tmp_dir / "paths.npy", np.asarray(all_paths, dtype=np.uint16))
+    np.save(tmp_dir / "values.npy", np.asarray(all_values, dtype=np.uint16))
+    np.save(tmp_dir / "frame_offsets.npy", np.asarray(offsets, dtype=np.int64))
+    with open(tmp_dir / "index.json", "w", encoding="utf-8") as f:
+        json.dump({"version": version, **vocab.to_dict(), "lessons": index_lessons}, f, ensure_ascii=False)
+
+    os.replace(tmp_dir, LESSON_SNAPSHOT_DIR / version)
+
+    current_tmp = LESSON_SNAPSHOT_DIR / "CURRENT.tmp"
+    current_tmp.write_text(version, encoding="utf-8")
+    os.replace(current_tmp, LESSON_SNAPSHOT_DIR / "CURRENT")
+
+    _cleanup_old_versions(keep=version)
+    print(f"✅ 스냅샷 저장: {version} (레슨 {len(lessons)}개, 프레임 {len(offsets) - 1}개)")
+    return version
+
+
+def _cleanup_old_versions(keep: str, keep_count: int = 2):
+    # 이미 매핑 중인 워커가 있어도 리눅스에서는 unlink 후에도 매핑이 유지됨
+    versions = sorted(p for p in LESSON_SNAPSHOT_DIR.glob("v*") if p.is_dir())
+    for old in versions[:-keep_count]:
+        if old.name != keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+async def _fetch_lesson_list() -> list:
+    response = await backend_get(LESSON_LIST_PATH)
+    data = response.json()
+    # 페이지 형태({"content": [...]})로 오는 경우도 처리
+    if isinstance(data, dict):
+        data = data.get("content") or data.get("lessons") or []
+    return data
+
+
+async def _fetch_answer_frames(lessonId: int, etag: str = None):
+    """(frames 또는 None(변경 없음), etag) 반환"""
+    headers = {"If-None-Match": etag} if etag else None
+    response = await backend_get(f"/api/lessons/{lessonId}/answer-frames", headers=headers)
+    if response.status_code == 304:
+        return None, etag
+    frames = [item.get("hand", {}) for item in (response.json() or [])]
+    return frames, response.headers.get("ETag")
+
+
+async def build_snapshot(previous: CatalogSnapshot = None) -> dict:
+    """
+    백엔드에서 전체 카탈로그를 받아 스냅샷을 만든다.
+    previous가 있으면 ETag로 조건부 요청 → 바뀐 레슨만 다시 받음 (증분 갱신)
+    반환: {"version", "changed", "removed", "total"}
+    """
+    lesson_list = await _fetch_lesson_list()
+    semaphore = asyncio.Semaphore(SNAPSHOT_FETCH_CONCURRENCY)
+    lessons = {}
+    changed = []
+
+    async def fetch(meta: dict):
+        lid = int(meta["id"])
+        prev_etag = previous.etag(lid) if previous is not None and lid in previous else None
+        async with semaphore:
+            try:
+                frames, etag = await _fetch_answer_frames(lid, prev_etag)
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"⚠️ 정답 프레임 조회 실패 (ID: {lid}): {e}")
+                if previous is not None and lid in previous:
+                    frames, etag = None, prev_etag  # 실패하면 이전 값 유지
+                else:
+                    return
+
+        if frames is None:
+            frames = [item["hand"] for item in previous.get_frames(lid)]
+        else:
+            changed.append(lid)
+        lessons[lid] = {"meta": meta, "frames": frames, "etag": etag}
+
+    await asyncio.gather(*(fetch(meta) for meta in lesson_list if meta.get("id") is not None))
+
+    removed = []
+    if previous is not None:
+        removed = [lid for lid in previous.lessons if lid not in lessons]
+        # 메타데이터(제목 등)만 바뀐 경우도 반영
+        for lid, item in lessons.items():
+            if lid not in changed and lid in previous and previous.get_lesson(lid).get("meta") != item["meta"]:
+                changed.append(lid)
+
+    version = previous.version if previous is not None else None
+    if previous is None or changed or removed:
+        # numpy 저장 / 파일 쓰기는 블로킹이므로 이벤트 루프 밖에서 (io 실행기)
+        version = await io_executor.run(write_snapshot, lessons)
+
+    return {"version": version, "changed": sorted(changed), "removed": sorted(removed), "total": len(lessons)}
+
+
+def _try_lock():
+    """노드 안에서 갱신 담당 워커는 하나만 (파일 락 획득 실패 시 None)"""
+    LESSON_SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    lock_file = open(LESSON_SNAPSHOT_DIR / ".lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return lock_file
+    except OSError:
+        lock_file.close()
+        return None
+
+
+async def refresh_snapshot() -> dict:
+    """증분 갱신 1회 (다른 워커가 갱신 중이면 건너뜀)"""
+    lock_file = _try_lock()
+    if lock_file is None:
+        return None
+    try:
+        result = await build_snapshot(await io_executor.run(load_snapshot))
+        await io_executor.run(load_snapshot)
+        return result
+    finally:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+
+async def _refresh_loop():
+    while True:
+        await asyncio.sleep(LESSON_SNAPSHOT_REFRESH_SEC)
+        try:
+            result = await refresh_snapshot()
+            if result and (result["changed"] or result["removed"]):
+                print(f"🔄 스냅샷 증분 갱신: 변경 {result['changed']} / 삭제 {result['removed']}")
+        except Exception as e:
+            print(f"❌ 스냅샷 갱신 실패: {e}")
+
+
+async def start_catalog():
+    """앱 시작 시: 스냅샷 매핑 (+ 없으면 선택적으로 빌드) 후 백그라운드 갱신 시작"""
+    global _refresher_task
+    if load_snapshot() is None and LESSON_SNAPSHOT_BUILD_ON_STARTUP:
+        try:
+            await refresh_snapshot()
+        except Exception as e:
+            print(f"❌ 시작 시 스냅샷 빌드 실패: {e}")
+
+    if LESSON_SNAPSHOT_REFRESH_SEC > 0 and _refresher_task is None:
+        _refresher_task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_catalog():
+    global _refresher_task
+    if _refresher_task is not None:
+        _refresher_task.cancel()
+        try:
+            await _refresher_task
+        except asyncio.CancelledError:
+            pass
+        _refresher_task = None
+
+
+if __name__ == "__main__":
+    # python -m app.services.lesson_catalog build    → 전체 다시 받기
+    # python -m app.services.lesson_catalog refresh  → 바뀐 레슨만 받기
+    parser = argparse.ArgumentParser(description="레슨 카탈로그 스냅샷 생성/갱신")
+    parser.add_argument("command", choices=["build", "refresh"])
+    args = parser.parse_args()
+
+    async def main():
+        from app.services.backend_client import close_backend_client
+        try:
+            previous = load_snapshot() if args.command == "refresh" else None
+            result = await build_snapshot(previous)
+            print(json.dumps(result, ensure_ascii=False))
+        finally:
+            await close_backend_client()
+
+    asyncio.run(main())
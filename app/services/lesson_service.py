@@ -1,16 +1,132 @@
 import json
 from pathlib import Path
 import os 
-import requests
+import asyncio
+import httpx
+from app.utils.cache import TTLCache, FRESH, STALE
+from app.utils.singleflight import SingleFlight
+from app.services.backend_client import backend_get
+from app.services.lesson_catalog import get_snapshot
 
-API_BASE_URL = os.getenv("BACKEND_ENDPOINT")
-def get_answer_frame(lessonId: int) -> dict:
+# 정답 프레임 캐시 (레슨 ID -> answer-frames 원본 리스트)
+# 정답 데이터는 거의 바뀌지 않으므로 TTL 이후에도 stale 구간 동안은 바로 응답하고 백그라운드에서 갱신
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "300"))
+ANSWER_CACHE_STALE_TTL = float(os.getenv("ANSWER_CACHE_STALE_TTL", "3600"))
+ANSWER_CACHE_MAXSIZE = int(os.getenv("ANSWER_CACHE_MAXSIZE", "512"))
+
+_answer_cache = TTLCache(
+    maxsize=ANSWER_CACHE_MAXSIZE,
+    ttl=ANSWER_CACHE_TTL,
+    stale_ttl=ANSWER_CACHE_STALE_TTL
+)
+_refresh_tasks = {}  # 백그라운드 갱신 중인 레슨 ID -> Task (중복 갱신 방지 + 참조 유지)
+
+# 같은 레슨에 대한 동시 백엔드 조회는 하나로 합침 (수업 시작 시 같은 레슨 요청이 몰리는 경우)
+_answer_flight = SingleFlight("answer_frames")
+_word_flight = SingleFlight("lesson_word")
+
+# 레슨 제목(단어) 캐시 / 일괄 조회 설정
+LESSON_TITLE_CACHE_TTL = float(os.getenv("LESSON_TITLE_CACHE_TTL", "3600"))
+LESSON_LOOKUP_CONCURRENCY = int(os.getenv("LESSON_LOOKUP_CONCURRENCY", "8"))
+# ?ids=1,2,3 을 지원하는 일괄 조회 경로 (지원하지 않으면 첫 404/405 이후 개별 조회로 전환)
+LESSON_BATCH_PATH = os.getenv("LESSON_BATCH_PATH", "/api/lessons")
+
+_title_cache = TTLCache(maxsize=2048, ttl=LESSON_TITLE_CACHE_TTL)
+_batch_supported = True
+
+
+async def _revalidate_answer_frames(lessonId: int, entry=None) -> list:
     """
-    GET /api/lessons/{lessonId}/answer-frames
+    백엔드에서 answer-frames를 받아 캐시에 저장
+    이전 항목에 ETag / Last-Modified가 있으면 조건부 요청을 보내고, 304면 기존 값을 재사용
+    동시에 들어온 같은 레슨 요청은 하나의 백엔드 호출을 공유한다.
+    """
+    return await _answer_flight.do(lessonId, lambda: _do_revalidate_answer_frames(lessonId, entry))
+
+
+async def _do_revalidate_answer_frames(lessonId: int, entry=None) -> list:
+    headers = {}
+    if entry is not None:
+        if entry.meta.get("etag"):
+            headers["If-None-Match"] = entry.meta["etag"]
+        if entry.meta.get("last_modified"):
+            headers["If-Modified-Since"] = entry.meta["last_modified"]
+
+    response = await backend_get(f"/api/lessons/{lessonId}/answer-frames", headers=headers)
+
+    if response.status_code == 304 and entry is not None:
+        _answer_cache.touch(lessonId)
+        return entry.value
+
+    frames_list = response.json() or []
+
+    _answer_cache.set(lessonId, frames_list, meta={
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    })
+    return frames_list
+
+
+def _refresh_in_background(lessonId: int, entry):
+    """stale-while-revalidate: 기존 값은 바로 돌려주고 갱신은 백그라운드 태스크로"""
+    if lessonId in _refresh_tasks:
+        return
+
+    async def worker():
+        try:
+            await _revalidate_answer_frames(lessonId, entry)
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"⚠️ 정답 프레임 백그라운드 갱신 실패 (ID: {lessonId}): {e}")
+        finally:
+            _refresh_tasks.pop(lessonId, None)
+
+    _refresh_tasks[lessonId] = asyncio.create_task(worker())
+
+
+async def _load_answer_frames(lessonId: int) -> list:
+    """
+    캐시 → 로컬 스냅샷 → 백엔드 순으로 answer-frames 원본 리스트 조회
+    get_answer_frame / get_answer_frames가 같은 캐시를 공유한다.
+    """
+    entry = _answer_cache.get_entry(lessonId)
+
+    if entry is not None and entry.state() == FRESH:
+        return entry.value
+
+    # 캐시에 없을 때만 스냅샷으로 채움 (스냅샷 ETag를 같이 넣어 두므로
+    # TTL이 지나면 아래의 stale / 조건부 재검증 경로를 그대로 탐)
+    if entry is None:
+        snapshot = get_snapshot()
+        if snapshot is not None and lessonId in snapshot:
+            frames_list = snapshot.get_frames(lessonId)
+            _answer_cache.set(lessonId, frames_list, meta={"etag": snapshot.etag(lessonId)})
+            return frames_list
+
+    if entry is not None:
+        if entry.state() == STALE:
+            _refresh_in_background(lessonId, entry)
+            return entry.value
+
+    try:
+        return await _revalidate_answer_frames(lessonId, entry)
+    except (httpx.HTTPError, ValueError):
+        # 백엔드 장애 시 만료된 값이라도 있으면 그걸 사용
+        if entry is not None:
+            print(f"⚠️ 백엔드 조회 실패 → 만료된 캐시 사용 (ID: {lessonId})")
+            return entry.value
+        raise
+
+
+def get_answer_cache_stats() -> dict:
+    """정답 프레임 캐시 적중/미스 지표"""
+    return _answer_cache.stats()
+
+
+def parse_answer_frame(frames_list: list) -> dict:
+    """
+    answer-frames 응답 리스트([{"hand": {...}}, ...]) → 채점용 정답 프레임 1개
     API 응답의 'hand' 필드 안에 있는 데이터를 추출하여 반환
     """
-    url = f"{API_BASE_URL}/api/lessons/{lessonId}/answer-frames"
-    
     # 반환할 기본 구조 초기화
     result_data = {
         "left": {},
@@ -19,89 +135,89 @@ def get_answer_frame(lessonId: int) -> dict:
         "finger_relation": {}
     }
 
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        frames_list = response.json()
+    # 데이터가 비어있으면 빈 딕셔너리 반환
+    if not frames_list:
+        print("⚠️ API 응답 리스트가 비어있습니다.")
+        return result_data
+
+    # 리스트의 첫 번째 아이템(혹은 필요한 아이템)을 가져옵니다.
+    # 보통 정답 프레임은 하나라고 가정합니다.
+    item = frames_list[0]
+    
+    # 'hand' 딕셔너리를 가져옴 (여기에 진짜 데이터가 있음)
+    hand_data = item.get('hand', {})
+    
+    if not isinstance(hand_data, dict):
+        print(f"⚠️ 'hand' 필드가 딕셔너리가 아닙니다: {type(hand_data)}")
+        return result_data
+
+    # API 구조 그대로 매핑
+    # hand_data 안에 이미 'left', 'right' 키가 존재함
+    if 'left' in hand_data:
+        result_data['left'] = hand_data['left']
+    
+    if 'right' in hand_data:
+        result_data['right'] = hand_data['right']
         
-        # 데이터가 비어있으면 빈 딕셔너리 반환
-        if not frames_list:
-            print("⚠️ API 응답 리스트가 비어있습니다.")
-            return result_data
-
-        # 리스트의 첫 번째 아이템(혹은 필요한 아이템)을 가져옵니다.
-        # 보통 정답 프레임은 하나라고 가정합니다.
-        item = frames_list[0]
+    if 'inter_hand_relation' in hand_data:
+        result_data['inter_hand_relation'] = hand_data['inter_hand_relation']
         
-        # 'hand' 딕셔너리를 가져옴 (여기에 진짜 데이터가 있음)
+    if 'finger_relation' in hand_data:
+        result_data['finger_relation'] = hand_data['finger_relation']
+
+    if 'non_manual_signal' in hand_data:
+        result_data['non_manual_signal'] = hand_data['non_manual_signal']
+
+    print("✅ 정답 데이터 로딩 성공!")
+    return result_data
+
+
+def parse_answer_frames(frames_list: list) -> list[dict]:
+    """answer-frames 응답 리스트 → 채점용 정답 프레임 리스트 (동적 수어)"""
+    if not frames_list:
+        print("⚠️ API 응답 리스트가 비어있습니다.")
+        return []
+
+    clean_frames = []
+
+    # 리스트를 순회하며 필요한 데이터만 정제
+    for item in frames_list:
         hand_data = item.get('hand', {})
         
-        if not isinstance(hand_data, dict):
-            print(f"⚠️ 'hand' 필드가 딕셔너리가 아닙니다: {type(hand_data)}")
-            return result_data
-
-        # API 구조 그대로 매핑
-        # hand_data 안에 이미 'left', 'right' 키가 존재함
-        if 'left' in hand_data:
-            result_data['left'] = hand_data['left']
-        
-        if 'right' in hand_data:
-            result_data['right'] = hand_data['right']
-            
-        if 'inter_hand_relation' in hand_data:
-            result_data['inter_hand_relation'] = hand_data['inter_hand_relation']
-            
-        if 'finger_relation' in hand_data:
-            result_data['finger_relation'] = hand_data['finger_relation']
-
-        if 'non_manual_signal' in hand_data:
-            result_data['non_manual_signal'] = hand_data['non_manual_signal']
-
-        print("✅ 정답 데이터 로딩 성공!")
-        return result_data
+        # 데이터 구조 매핑 (null safe)
+        frame_data = {
+            "left": hand_data.get('left', {}),
+            "right": hand_data.get('right', {}),
+            "inter_hand_relation": hand_data.get('inter_hand_relation', {}),
+            "finger_relation": hand_data.get('finger_relation', {})
+        }
+        clean_frames.append(frame_data)
+
+    print(f"✅ 총 {len(clean_frames)}개의 정답 프레임 로딩 성공!")
+    return clean_frames
+
 
-    except requests.exceptions.RequestException as e:
+async def load_answer_frames(lessonId: int) -> list:
+    """answer-frames 원본 리스트 조회 (백엔드 오류 시 빈 리스트)"""
+    try:
+        return await _load_answer_frames(lessonId)
+    except (httpx.HTTPError, ValueError) as e:
         print(f"❌ API 호출 중 오류 발생: {e}")
-        return result_data
+        return []
+
+
+async def get_answer_frame(lessonId: int) -> dict:
+    """
+    GET /api/lessons/{lessonId}/answer-frames
+    API 응답의 'hand' 필드 안에 있는 데이터를 추출하여 반환
+    """
+    return parse_answer_frame(await load_answer_frames(lessonId))
     
-def get_answer_frames(lessonId: int) -> list[dict]:
+async def get_answer_frames(lessonId: int) -> list[dict]:
     """
     [NEW] DB에 저장된 정답 프레임 '전체 리스트'를 가져와서 반환
     """
-    url = f"{API_BASE_URL}/api/lessons/{lessonId}/answer-frames"
-    
-    clean_frames = []
-
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        frames_list = response.json()
-        
-        if not frames_list:
-            print("⚠️ API 응답 리스트가 비어있습니다.")
-            return []
-
-        # 리스트를 순회하며 필요한 데이터만 정제
-        for item in frames_list:
-            hand_data = item.get('hand', {})
-            
-            # 데이터 구조 매핑 (null safe)
-            frame_data = {
-                "left": hand_data.get('left', {}),
-                "right": hand_data.get('right', {}),
-                "inter_hand_relation": hand_data.get('inter_hand_relation', {}),
-                "finger_relation": hand_data.get('finger_relation', {})
-            }
-            clean_frames.append(frame_data)
-
-        print(f"✅ 총 {len(clean_frames)}개의 정답 프레임 로딩 성공!")
-        return clean_frames
-
-    except requests.exceptions.RequestException as e:
-        print(f"❌ API 호출 중 오류 발생: {e}")
-        return []
+    return parse_answer_frames(await load_answer_frames(lessonId))
 
 def get_test_answer_frame():
     """
@@ -121,16 +237,25 @@ def get_test_answer_frame():
 
     return answer_data
 
-def get_lesson_word(lessonId: int) -> str:
+async def get_lesson_word(lessonId: int) -> str:
     """
     [NEW] GET /api/lessons/{lessonId}
     레슨 ID로 단어 이름(wordName)을 조회하여 반환
     """
-    url = f"{API_BASE_URL}/api/lessons/{lessonId}"
-    
+    word_name = _cached_title(lessonId)
+    if word_name:
+        return word_name
+
+    return await _fetch_lesson_word(lessonId)
+
+
+async def _fetch_lesson_word(lessonId: int) -> str:
+    return await _word_flight.do(lessonId, lambda: _do_fetch_lesson_word(lessonId))
+
+
+async def _do_fetch_lesson_word(lessonId: int) -> str:
     try:
-        response = requests.get(url)
-        response.raise_for_status()
+        response = await backend_get(f"/api/lessons/{lessonId}")
         
         data = response.json()
         
@@ -141,8 +266,111 @@ def get_lesson_word(lessonId: int) -> str:
             return None
 
         print(f"✅ 단어 조회 성공: ID {lessonId} -> {word_name}")
+        _title_cache.set(lessonId, word_name)
         return word_name
 
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         print(f"❌ 단어 조회 API 실패 (ID: {lessonId}): {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def _cached_title(lessonId: int) -> str:
+    """제목 캐시 → 로컬 스냅샷 순으로 조회 (없으면 None)"""
+    word_name = _title_cache.get(lessonId)
+    if word_name:
+        return word_name
+
+    snapshot = get_snapshot()
+    if snapshot is not None and lessonId in snapshot:
+        return snapshot.get_lesson(lessonId).get("title")
+    return None
+
+
+async def _fetch_lesson_titles_batch(lesson_ids: list[int]) -> dict:
+    """
+    일괄 조회 경로로 여러 레슨 제목을 한 번에 조회
+    백엔드가 경로를 지원하지 않으면 이후로는 시도하지 않음
+    """
+    global _batch_supported
+
+    try:
+        response = await backend_get(LESSON_BATCH_PATH, params={"ids": ",".join(map(str, lesson_ids))})
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code in (404, 405, 501):
+            _batch_supported = False
+            print("⚠️ 레슨 일괄 조회 미지원 → 개별 조회로 전환")
+        else:
+            print(f"⚠️ 레슨 일괄 조회 실패: {e}")
+        return {}
+    except httpx.HTTPError as e:
+        print(f"⚠️ 레슨 일괄 조회 실패: {e}")
+        return {}
+
+    try:
+        data = response.json()
+    except ValueError as e:
+        print(f"⚠️ 레슨 일괄 조회 응답 파싱 실패: {e}")
+        return {}
+    if isinstance(data, dict):
+        data = data.get("content") or data.get("lessons") or []
+    if not isinstance(data, list):
+        print(f"⚠️ 레슨 일괄 조회 응답 형식이 올바르지 않습니다: {type(data)}")
+        return {}
+
+    # 백엔드가 ids 파라미터를 무시하고 전체 목록을 줘도 요청한 ID만 골라 씀
+    wanted = set(lesson_ids)
+    titles = {}
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        lid = item.get("id")
+        if lid in wanted and item.get("title"):
+            titles[lid] = item["title"]
+            _title_cache.set(lid, item["title"])
+    return titles
+
+
+async def get_lesson_words(lesson_ids: list[int]) -> dict:
+    """
+    [NEW] 여러 레슨 ID의 단어 이름을 한 번에 조회 → {lesson_id: word_name}
+    캐시/스냅샷 → 일괄 조회 경로 → 남은 ID 개별 동시 조회(동시성 제한) 순서
+    조회에 실패한 ID는 결과에서만 빠진다 (나머지 단어는 그대로 사용 가능)
+    """
+    unique_ids = list(dict.fromkeys(lesson_ids))
+    titles = {}
+
+    for lid in unique_ids:
+        word_name = _cached_title(lid)
+        if word_name:
+            titles[lid] = word_name
+
+    missing = [lid for lid in unique_ids if lid not in titles]
+    if len(missing) > 1 and _batch_supported:
+        titles.update(await _fetch_lesson_titles_batch(missing))
+        missing = [lid for lid in missing if lid not in titles]
+
+    if missing:
+        semaphore = asyncio.Semaphore(LESSON_LOOKUP_CONCURRENCY)
+
+        async def fetch(lid: int):
+            async with semaphore:
+                return lid, await _fetch_lesson_word(lid)
+
+        for lid, word_name in await asyncio.gather(*(fetch(lid) for lid in missing)):
+            if word_name:
+                titles[lid] = word_name
+
+    # 요청 순서 유지
+    return {lid: titles[lid] for lid in unique_ids if lid in titles}
+
+
+def get_title_cache_stats() -> dict:
+    return _title_cache.stats()
+
+
+def get_singleflight_stats() -> dict:
+    """동시 요청 합치기(single-flight) 지표"""
+    return {
+        "answer_frames": _answer_flight.stats(),
+        "lesson_word": _word_flight.stats(),
+    }
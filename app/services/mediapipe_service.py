@@ -1,3 +1,4 @@
+import threading
 import mediapipe as mp
 import cv2
 import numpy as np
@@ -5,6 +6,27 @@ import numpy as np
 # MediaPipe 초기화
 mp_holistic = mp.solutions.holistic
 
+# Holistic 그래프는 만들 때 모델 파일을 읽고 내부 스레드를 띄우므로 요청마다 만들지 않고 재사용한다.
+# - 그래프 객체는 스레드 안전하지 않으므로 실행기 스레드마다 하나씩
+# - 그래프의 내부 스레드는 fork를 넘어가지 못하므로 pre-fork 부모(app.serve)에서는 만들지 않고
+#   각 워커에서 처음 쓸 때 만든다
+# static_image_mode=True 라 프레임 사이 추적 상태가 없어서 재사용해도 결과는 같다.
+_local = threading.local()
+
+
+def get_holistic():
+    holistic = getattr(_local, "holistic", None)
+    if holistic is None:
+        holistic = mp_holistic.Holistic(
+            static_image_mode=True,
+            model_complexity=2,
+            enable_segmentation=False,
+            refine_face_landmarks=True
+        )
+        _local.holistic = holistic
+        print(f"✅ MediaPipe Holistic 그래프 생성 ({threading.current_thread().name})")
+    return holistic
+
 # 1. 점(Point) 하나를 흉내 내는 클래스
 class ProtoLandmark:
     def __init__(self, x, y, z, visibility=0.0):
@@ -61,14 +83,8 @@ def process_image_to_landmarks(image_bytes: bytes):
     # 2. BGR -> RGB 변환
     img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
 
-    # 3. MediaPipe Holistic 수행
-    with mp_holistic.Holistic(
-        static_image_mode=True,
-        model_complexity=2,
-        enable_segmentation=False,
-        refine_face_landmarks=True
-    ) as holistic:
-        raw_results = holistic.process(img_rgb)
+    # 3. MediaPipe Holistic 수행 (스레드별로 만들어 둔 그래프 재사용)
+    raw_results = get_holistic().process(img_rgb)
 
     # 4. 결과 변환 (구조 흉내)
     return MediaPipeResultAdapter(raw_results)
\ No newline at end of file
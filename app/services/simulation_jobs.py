@@ -0,0 +1,241 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from app.utils.cache import TTLCache
+from app.utils.executors import io_executor, Overloaded
+from app.models.schemas import DialogueLine, SimulationResponse
+from app.services.simulation_service import (
+    generate_scenario_script, generate_scenario_image, scenario_key, scenario_store,
+)
+
+# 비동기 시뮬레이션 작업
+# GPT 시나리오가 나오면 바로 응답하고, DALL-E 이미지는 백그라운드에서 만들어 나중에 전달한다.
+# 작업 상태는 크기 제한 + 만료가 있는 인메모리 캐시에 보관 (프로세스 재시작 시 사라짐)
+# 워커가 여러 개면(app.serve) 폴링 / SSE 요청이 작업을 만든 워커로 간다는 보장이 없으므로
+# SIMULATION_JOB_DB(SQLite 파일)에 상태를 같이 기록하고, 다른 워커는 그 파일을 읽는다.
+SIMULATION_JOB_MAX = int(os.getenv("SIMULATION_JOB_MAX", "1000"))
+SIMULATION_JOB_TTL = float(os.getenv("SIMULATION_JOB_TTL", "1800"))
+SIMULATION_JOB_DB = os.getenv("SIMULATION_JOB_DB")  # 비우면 프로세스 메모리에만 (단일 워커)
+SIMULATION_JOB_POLL = float(os.getenv("SIMULATION_JOB_POLL", "1.0"))  # 다른 워커의 작업 상태 확인 주기 (초)
+# 종료 시 진행 중인 이미지 생성을 기다리는 최대 시간 (초), 넘기면 취소
+# (SIGHUP 워커 교체 때 생성 중이던 DALL-E 결과를 버리지 않게, app.serve 는 이 시간까지 더 기다린 뒤 SIGKILL)
+SIMULATION_JOB_DRAIN_TIMEOUT = float(os.getenv("SIMULATION_JOB_DRAIN_TIMEOUT", "30"))
+
+IMAGE_PENDING = "pending"
+IMAGE_READY = "ready"
+IMAGE_FAILED = "failed"
+
+
+class SimulationJob:
+    def __init__(self, lesson_words: dict, script: dict):
+        self.job_id = uuid.uuid4().hex
+        self.lesson_words = lesson_words
+        self.situation = script["situation"]
+        self.image_prompt = script["image_prompt"]
+        self.dialogue = script["dialogue"]
+        self.image_url = None
+        self.image_status = IMAGE_PENDING
+        self.error = None
+        self.created_at = time.time()
+        self.image_done = asyncio.Event()
+        self.remote = False  # 다른 워커가 만든 작업을 공유 저장소에서 읽어 온 사본
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SimulationJob":
+        job = cls({}, {"situation": data["situation"], "image_prompt": None,
+                       "dialogue": [DialogueLine(**line) for line in data["dialogue"]]})
+        job.job_id = data["job_id"]
+        job.image_url = data.get("image_url")
+        job.image_status = data.get("image_status", IMAGE_PENDING)
+        job.error = data.get("error")
+        job.created_at = data.get("created_at", job.created_at)
+        job.remote = True
+        if job.image_status != IMAGE_PENDING:
+            job.image_done.set()
+        return job
+
+    def finish_image(self, image_url: str = None, error: str = None):
+        self.image_url = image_url
+        self.image_status = IMAGE_READY if image_url else IMAGE_FAILED
+        self.error = error
+        self.image_done.set()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "situation": self.situation,
+            "dialogue": [line.model_dump() for line in self.dialogue],
+            "image_url": self.image_url,
+            "image_status": self.image_status,
+            "error": self.error,
+        }
+
+
+class SharedJobStore:
+    """워커 간 공유 작업 상태 (SQLite, 작업 하나 = JSON 한 줄)"""
+
+    def __init__(self, path: str, ttl: float = SIMULATION_JOB_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY, data TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_created_at ON jobs (created_at)")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _reopen_after_fork(self):
+        # 부모의 연결은 자식에서 쓰면 안 되므로 처음 쓸 때 새로 연결
+        self._lock = threading.Lock()
+        self._db = None
+
+    def save(self, job: SimulationJob):
+        data = json.dumps({**job.to_dict(), "created_at": job.created_at}, ensure_ascii=False)
+        with self._lock:
+            db = self._conn()
+            db.execute("INSERT OR REPLACE INTO jobs (job_id, data, created_at) VALUES (?, ?, ?)",
+                       (job.job_id, data, job.created_at))
+            db.execute("DELETE FROM jobs WHERE created_at < ?", (time.time() - self.ttl,))
+            db.commit()
+
+    def load(self, job_id: str):
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT data, created_at FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl:
+            return None
+        return SimulationJob.from_dict(json.loads(row[0]))
+
+
+_jobs = TTLCache(maxsize=SIMULATION_JOB_MAX, ttl=SIMULATION_JOB_TTL)
+_image_tasks = set()  # 진행 중인 이미지 생성 태스크 (GC 방지 + 종료 시 정리)
+_shared = SharedJobStore(SIMULATION_JOB_DB) if SIMULATION_JOB_DB else None
+
+# SQLite 연결은 fork를 넘어 공유하면 안 되므로 (app.serve pre-fork 워커) 자식에서 새로 연결
+if _shared is not None and hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_shared._reopen_after_fork)
+
+
+async def _publish(job: SimulationJob):
+    """공유 저장소에 현재 상태 기록 (단일 워커면 아무것도 안 함)"""
+    if _shared is None:
+        return
+    try:
+        await io_executor.run(_shared.save, job)
+    except (sqlite3.Error, Overloaded) as e:
+        print(f"⚠️ 시뮬레이션 작업 상태 공유 실패 ({job.job_id}): {e}")
+
+
+async def _generate_image(job: SimulationJob):
+    try:
+        image_url = await generate_scenario_image(job.image_prompt)
+        job.finish_image(image_url=image_url)
+        await _publish(job)
+        # 완성된 시나리오는 /api/simulation 과 같은 캐시에 변형으로 저장
+        scenario_store.add(scenario_key(job.lesson_words), SimulationResponse(
+            situation=job.situation, image_url=image_url, dialogue=job.dialogue,
+        ))
+        print(f"🖼️ 시뮬레이션 이미지 완료: {job.job_id}")
+    except asyncio.CancelledError:
+        job.finish_image(error="cancelled")
+        if _shared is not None:
+            _shared.save(job)  # 종료 중이라 실행기를 거치지 않고 바로 기록
+        raise
+    except Exception as e:
+        print(f"❌ 시뮬레이션 이미지 생성 실패 ({job.job_id}): {e}")
+        job.finish_image(error=str(e))
+        await _publish(job)
+
+
+def start_image(job: SimulationJob):
+    task = asyncio.create_task(_generate_image(job))
+    _image_tasks.add(task)
+    task.add_done_callback(_image_tasks.discard)
+
+
+async def register_job(job: SimulationJob):
+    _jobs.set(job.job_id, job)
+    await _publish(job)
+
+
+async def create_simulation_job(lesson_words: dict) -> SimulationJob:
+    """시나리오(GPT)까지 기다린 뒤 작업을 등록하고, 이미지는 백그라운드로 시작"""
+    cached = scenario_store.get(scenario_key(lesson_words))
+    if cached is not None:
+        # 캐시된 변형은 이미지까지 완성되어 있으므로 바로 ready
+        job = SimulationJob(lesson_words, {"situation": cached.situation, "image_prompt": None,
+                                           "dialogue": cached.dialogue})
+        job.finish_image(image_url=cached.image_url)
+        await register_job(job)
+        return job
+
+    script = await generate_scenario_script(lesson_words)
+    job = SimulationJob(lesson_words, script)
+    await register_job(job)
+    start_image(job)
+    return job
+
+
+async def get_simulation_job(job_id: str) -> SimulationJob:
+    """이 워커의 작업 → 없으면 공유 저장소 (다른 워커가 만든 작업)"""
+    job = _jobs.get(job_id)
+    if job is None and _shared is not None:
+        job = await io_executor.run(_shared.load, job_id)
+    return job
+
+
+async def wait_job_image(job: SimulationJob, timeout: float) -> SimulationJob:
+    """
+    이미지가 끝나거나 timeout이 지날 때까지 대기 → 최신 작업 상태
+    다른 워커의 작업은 완료 이벤트를 받을 수 없으므로 공유 저장소를 주기적으로 다시 읽는다.
+    """
+    if not job.remote:
+        try:
+            await asyncio.wait_for(job.image_done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not job.image_done.is_set():
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        await asyncio.sleep(min(SIMULATION_JOB_POLL, remaining))
+        job = await io_executor.run(_shared.load, job.job_id) or job
+    return job
+
+
+async def stop_simulation_jobs(timeout: float = SIMULATION_JOB_DRAIN_TIMEOUT):
+    """앱 종료(lifespan) 시 진행 중인 이미지 생성을 timeout까지 기다리고, 남은 것만 취소"""
+    tasks = list(_image_tasks)
+    if not tasks:
+        return
+    print(f"⏳ 진행 중인 시뮬레이션 이미지 {len(tasks)}개 완료 대기 (최대 {timeout:g}초)")
+    pending = set(tasks)
+    if timeout > 0:
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        print(f"⚠️ 시뮬레이션 이미지 {len(pending)}개 취소")
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def get_simulation_job_stats() -> dict:
+    return {**_jobs.stats(), "images_in_progress": len(_image_tasks), "shared": _shared is not None}
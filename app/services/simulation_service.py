@@ -1,15 +1,37 @@
+import os
 import json
+import time
+import asyncio
+import heapq
+import threading
+from collections import OrderedDict
+from datetime import datetime
 from app.ai.llm_client import call_gpt_json_async, call_dalle_image_async
-from app.models.schemas import SimulationResponse, DialogueLine
+from app.models.schemas import SimulationResponse
+from app.services.dialogue_validator import WordIndex, validate_and_repair
+from app.services.image_store import image_store, IMAGE_STORE_ENABLED
 
-async def generate_simulation_scenario(lesson_words: dict) -> SimulationResponse:
-    """
-    lesson_words: {lesson_id: "단어명", ...}
-    """
-    words_str = ", ".join(lesson_words.values())
-    
-    # 1. GPT 프롬프트 작성
-    system_prompt = """
+# 시나리오 캐시
+# 같은 날 같은 레슨 묶음을 끝낸 학습자들은 같은 lesson_ids로 요청하므로,
+# (정렬된 레슨 ID 집합) 기준으로 완성된 시나리오를 몇 개씩 보관하고 돌아가며 내준다.
+# 자주 요청되는 조합은 한가한 시간대에 백그라운드에서 미리 채워 둔다.
+SCENARIO_CACHE_KEYS = int(os.getenv("SCENARIO_CACHE_KEYS", "512"))
+SCENARIO_CACHE_TTL = float(os.getenv("SCENARIO_CACHE_TTL", str(12 * 3600)))  # 이미지 저장소를 끄면 DALL-E URL 만료(약 24시간)보다 짧게
+SCENARIO_VARIANTS = int(os.getenv("SCENARIO_VARIANTS", "3"))
+# 인기도를 기록하는 조합 수 상한 (넘으면 상위 조합은 남기고 가장 오래 안 불린 조합부터 정리)
+SCENARIO_POPULARITY_KEYS = int(os.getenv("SCENARIO_POPULARITY_KEYS", "4096"))
+SCENARIO_PREGEN_ENABLED = os.getenv("SCENARIO_PREGEN_ENABLED", "true").lower() == "true"
+SCENARIO_PREGEN_HOURS = os.getenv("SCENARIO_PREGEN_HOURS", "2-6")  # 서버 로컬 시각 [시작, 끝)
+SCENARIO_PREGEN_INTERVAL = float(os.getenv("SCENARIO_PREGEN_INTERVAL", "600"))
+SCENARIO_PREGEN_TOP_K = int(os.getenv("SCENARIO_PREGEN_TOP_K", "20"))
+SCENARIO_PREGEN_MIN_REQUESTS = int(os.getenv("SCENARIO_PREGEN_MIN_REQUESTS", "2"))
+SCENARIO_PREGEN_LESSON_SETS = os.getenv("SCENARIO_PREGEN_LESSON_SETS", "")  # 항상 채워 둘 조합 (예: "1,2,3;4,5")
+
+# 로컬에서 고칠 수 없는 대화 구조일 때만 문제점을 짚어서 다시 요청하는 횟수
+SIMULATION_REPAIR_RETRIES = int(os.getenv("SIMULATION_REPAIR_RETRIES", "1"))
+dialogue_stats = {"valid": 0, "repaired": 0, "retried": 0, "failed": 0}
+
+SIMULATION_SYSTEM_PROMPT = """
 You are a scenario writer for a sign language learning app.
 Your task is to generate a short first-person role-play conversation
 where the AI speaks directly to the user.
@@ -98,39 +120,317 @@ Before outputting:
 - If ANY check fails, REGENERATE internally before outputting
 """
 
+
+async def generate_scenario_script(lesson_words: dict) -> dict:
+    """
+    GPT로 상황 / 이미지 프롬프트 / 대화 생성 (이미지는 만들지 않음)
+    반환: {"situation": str, "image_prompt": str, "dialogue": [DialogueLine, ...]}
+    """
     user_prompt = f"사용할 단어 목록: {json.dumps(lesson_words, ensure_ascii=False)}"
 
-    # 2. GPT 호출 (JSON 모드)
-    scenario_data = await call_gpt_json_async(system_prompt, user_prompt)
-    
-    # 3. DALL-E 3 이미지 생성 호출
+    # GPT 호출 (JSON 모드)
+    scenario_data = await call_gpt_json_async(SIMULATION_SYSTEM_PROMPT, user_prompt)
+
+    # 구조 검증 + 로컬 복구 (단어명 -> ID 변환 포함), 고칠 수 없을 때만 문제점을 알려 주고 다시 요청
+    index = WordIndex(lesson_words)
+    for attempt in range(SIMULATION_REPAIR_RETRIES + 1):
+        dialogue_list, issues, repairs = validate_and_repair(scenario_data.get("dialogue"), lesson_words, index)
+        if not scenario_data.get("situation") or not scenario_data.get("image_prompt"):
+            issues.append("situation and image_prompt are required")
+        if not issues:
+            break
+        if attempt == SIMULATION_REPAIR_RETRIES:
+            dialogue_stats["failed"] += 1
+            raise ValueError(f"시나리오 대화 구조가 올바르지 않습니다: {issues}")
+
+        dialogue_stats["retried"] += 1
+        print(f"⚠️ 시나리오 구조 오류, 재요청: {issues}")
+        retry_prompt = (
+            f"{user_prompt}\n\n"
+            "Your previous output was INVALID:\n- " + "\n- ".join(issues) + "\n\n"
+            f"Previous output:\n{json.dumps(scenario_data, ensure_ascii=False)}\n\n"
+            "Fix ONLY these problems and return the full JSON object again."
+        )
+        scenario_data = await call_gpt_json_async(SIMULATION_SYSTEM_PROMPT, retry_prompt)
+
+    if repairs:
+        dialogue_stats["repaired"] += 1
+        print(f"🔧 시나리오 대화 로컬 복구: {repairs}")
+    else:
+        dialogue_stats["valid"] += 1
+
+    return {
+        "situation": scenario_data["situation"],
+        "image_prompt": scenario_data["image_prompt"],
+        "dialogue": dialogue_list,
+    }
+
+async def generate_scenario_image(image_prompt: str) -> str:
+    """DALL-E 3 이미지 생성 → 이미지 URL (로컬 저장소를 쓰면 우리 서버 URL)"""
+    if IMAGE_STORE_ENABLED:
+        # 같은 / 거의 같은 프롬프트로 만든 이미지가 있으면 재사용
+        sha = await image_store.lookup(image_prompt)
+        if sha is not None:
+            return image_store.url(sha)
+
     # 프롬프트에 '1인칭 시점' 등 스타일 추가
-    final_image_prompt = f"First-person view, photorealistic, {scenario_data['image_prompt']}, high quality"
+    final_image_prompt = f"First-person view, photorealistic, {image_prompt}, high quality"
     image_url = await call_dalle_image_async(final_image_prompt)
 
-    # 4. 결과 매핑 (단어명 -> ID 변환)
-    word_to_id = {v: k for k, v in lesson_words.items()}
-    dialogue_list = []
-    
-    for line in scenario_data["dialogue"]:
-        lid = None
-        # User 차례이고 target_word가 있으면 ID 찾기
-        if line["speaker"] == "User" and "target_word" in line:
-            target_w = line["target_word"]
-            # 정확히 일치하거나 포함되는 단어 찾기
-            for w, i in word_to_id.items():
-                if w in target_w or target_w in w:
-                    lid = i
-                    break
-        
-        dialogue_list.append(DialogueLine(
-            speaker=line["speaker"],
-            text=line["text"],
-            target_lesson_id=lid
-        ))
+    if IMAGE_STORE_ENABLED:
+        # 공급자 URL은 만료되므로 한 번 내려받아 보관 (실패하면 원래 URL 그대로)
+        try:
+            sha = await image_store.save_from_url(image_url, image_prompt)
+            return image_store.url(sha)
+        except Exception as e:
+            print(f"⚠️ 시나리오 이미지 저장 실패, 원본 URL 사용: {e}")
+    return image_url
+
+async def generate_simulation_scenario(lesson_words: dict) -> SimulationResponse:
+    """
+    lesson_words: {lesson_id: "단어명", ...}
+    """
+    # 1. GPT 시나리오 생성
+    script = await generate_scenario_script(lesson_words)
+
+    # 2. DALL-E 3 이미지 생성 호출
+    image_url = await generate_scenario_image(script["image_prompt"])
 
     return SimulationResponse(
-        situation=scenario_data["situation"],
+        situation=script["situation"],
         image_url=image_url,
-        dialogue=dialogue_list
-    )
\ No newline at end of file
+        dialogue=script["dialogue"]
+    )
+
+
+# ==========================================
+# 시나리오 캐시 (레슨 ID 집합 → 변형 여러 개)
+# ==========================================
+def scenario_key(lesson_ids) -> tuple:
+    """순서 / 중복과 무관한 레슨 조합 키"""
+    return tuple(sorted(set(lesson_ids)))
+
+
+pregen_stats = {"runs": 0, "generated": 0, "failed": 0}
+
+
+class ScenarioStore:
+    def __init__(self, maxsize: int = SCENARIO_CACHE_KEYS, ttl: float = SCENARIO_CACHE_TTL,
+                 variants: int = SCENARIO_VARIANTS, popularity_size: int = SCENARIO_POPULARITY_KEYS,
+                 protected: int = SCENARIO_PREGEN_TOP_K):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.variants = variants
+        self._data = OrderedDict()  # key -> [(생성 시각, SimulationResponse), ...] (LRU)
+        self._cursor = {}           # key -> 다음에 내줄 변형 번호
+        self._lock = threading.Lock()
+        # key -> 요청 수 (사전 생성 대상 선정용, 하루 단위로 반감)
+        # 최근에 불린 순서로 유지하고 popularity_size를 넘으면 정리 (상위 protected개는 항상 남김)
+        self.popularity = OrderedDict()
+        self.popularity_size = popularity_size
+        self.protected = protected
+        self.popularity_evictions = 0
+
+        # 지표
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evictions = 0
+
+    def _fresh(self, key) -> list:
+        """만료된 변형을 걸러낸 목록 (lock 안에서 호출)"""
+        now = time.time()
+        variants = [v for v in self._data.get(key, []) if now - v[0] < self.ttl]
+        if variants:
+            self._data[key] = variants
+            self._data.move_to_end(key)
+        else:
+            self._data.pop(key, None)
+            self._cursor.pop(key, None)
+        return variants
+
+    def get(self, key):
+        """요청 경로 조회: 인기도를 올리고, 변형이 있으면 돌아가며 하나 반환"""
+        with self._lock:
+            self._track(key)
+            variants = self._fresh(key)
+            if not variants:
+                self.misses += 1
+                return None
+            self.hits += 1
+            index = self._cursor.get(key, 0) % len(variants)
+            self._cursor[key] = index + 1
+            return variants[index][1]
+
+    def _track(self, key):
+        """인기도 +1 (lock 안에서 호출)"""
+        self.popularity[key] = self.popularity.get(key, 0) + 1
+        self.popularity.move_to_end(key)
+        if len(self.popularity) <= self.popularity_size:
+            return
+        # 한 번에 1/4 정도 비워서 정리 비용을 나눔: 상위 조합을 빼고 가장 오래 안 불린 것부터
+        target = self.popularity_size - max(1, self.popularity_size // 4)
+        keep = set(heapq.nlargest(self.protected, self.popularity, key=self.popularity.get))
+        keep.add(key)
+        for old_key in list(self.popularity):
+            if len(self.popularity) <= target:
+                break
+            if old_key not in keep:
+                del self.popularity[old_key]
+                self.popularity_evictions += 1
+
+    def add(self, key, scenario: SimulationResponse):
+        """변형 추가 (가득 차면 가장 오래된 변형부터 교체)"""
+        with self._lock:
+            variants = self._fresh(key)
+            variants.append((time.time(), scenario))
+            self._data[key] = variants[-self.variants:]
+            self._data.move_to_end(key)
+            self.stored += 1
+            while len(self._data) > self.maxsize:
+                old_key, _ = self._data.popitem(last=False)
+                self._cursor.pop(old_key, None)
+                self.evictions += 1
+
+    def missing(self, key) -> int:
+        """목표 변형 수까지 더 만들어야 하는 개수"""
+        with self._lock:
+            return max(0, self.variants - len(self._fresh(key)))
+
+    def popular(self, top_k: int, min_requests: int) -> list:
+        with self._lock:
+            top = heapq.nlargest(top_k, self.popularity.items(), key=lambda item: item[1])
+            return [key for key, count in top if count >= min_requests]
+
+    def decay(self):
+        """인기도 반감 (오래전에 많이 불린 조합이 계속 자리를 차지하지 않게)"""
+        with self._lock:
+            self.popularity = OrderedDict((k, c // 2) for k, c in self.popularity.items() if c // 2 > 0)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "keys": len(self._data),
+            "maxsize": self.maxsize,
+            "variants": sum(len(v) for v in self._data.values()),
+            "variants_per_key": self.variants,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stored,
+            "evictions": self.evictions,
+            "tracked_lesson_sets": len(self.popularity),
+            "popularity_evictions": self.popularity_evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "pregen": pregen_stats,
+        }
+
+
+scenario_store = ScenarioStore()
+
+
+async def get_simulation_scenario(lesson_words: dict) -> SimulationResponse:
+    """캐시된 변형이 있으면 바로 반환, 없으면 새로 생성해서 저장"""
+    key = scenario_key(lesson_words)
+    cached = scenario_store.get(key)
+    if cached is not None:
+        print(f"♻️ 시나리오 캐시 적중: {key}")
+        return cached
+
+    scenario = await generate_simulation_scenario(lesson_words)
+    scenario_store.add(key, scenario)
+    return scenario
+
+
+# ==========================================
+# 한가한 시간대 사전 생성
+# ==========================================
+_pregen_task = None
+_last_decay_date = None
+
+
+def _in_quiet_hours(now: datetime = None) -> bool:
+    start, end = (int(h) for h in SCENARIO_PREGEN_HOURS.split("-"))
+    hour = (now or datetime.now()).hour
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end  # 예: "23-5" (자정을 넘기는 구간)
+
+
+def _configured_lesson_sets() -> list:
+    sets = []
+    for chunk in SCENARIO_PREGEN_LESSON_SETS.split(";"):
+        ids = [int(x) for x in chunk.split(",") if x.strip()]
+        if ids:
+            sets.append(scenario_key(ids))
+    return sets
+
+
+async def pregenerate_scenarios(top_k: int = SCENARIO_PREGEN_TOP_K,
+                                min_requests: int = SCENARIO_PREGEN_MIN_REQUESTS) -> int:
+    """고정 조합 + 인기 조합의 빈 변형을 채움 (한가한 시간대가 끝나면 중단). 새로 만든 개수 반환"""
+    from app.services.answer_repository import get_answer_repository
+
+    keys = list(dict.fromkeys(_configured_lesson_sets() + scenario_store.popular(top_k, min_requests)))
+    made = 0
+    for key in keys:
+        if scenario_store.missing(key) == 0:
+            continue
+        lesson_words = await get_answer_repository().get_lesson_words(list(key))
+        if not lesson_words:
+            continue
+        # 일부 단어를 못 가져왔으면 API 경로와 같은 키(조회된 단어 기준)로 저장
+        words_key = scenario_key(lesson_words)
+        for _ in range(scenario_store.missing(words_key)):
+            if not _in_quiet_hours():
+                return made
+            try:
+                scenario = await generate_simulation_scenario(lesson_words)
+            except Exception as e:
+                pregen_stats["failed"] += 1
+                print(f"❌ 시나리오 사전 생성 실패 {words_key}: {e}")
+                break
+            scenario_store.add(words_key, scenario)
+            pregen_stats["generated"] += 1
+            made += 1
+    return made
+
+
+async def _pregen_loop():
+    global _last_decay_date
+    while True:
+        await asyncio.sleep(SCENARIO_PREGEN_INTERVAL)
+        if not _in_quiet_hours():
+            continue
+        try:
+            pregen_stats["runs"] += 1
+            made = await pregenerate_scenarios()
+            if made:
+                print(f"🌙 시나리오 사전 생성: {made}개")
+        except Exception as e:
+            print(f"❌ 시나리오 사전 생성 루프 에러: {e}")
+
+        # 하루에 한 번 인기도 반감 (그날 채울 조합을 고른 뒤)
+        today = datetime.now().date()
+        if _last_decay_date != today:
+            scenario_store.decay()
+            _last_decay_date = today
+
+
+async def start_scenario_pregen():
+    global _pregen_task
+    # pre-fork 워커(app.serve)는 0번 워커만 사전 생성 (fork 이후에 정해지므로 시작 시점에 읽음)
+    if os.getenv("SERVE_WORKER_INDEX", "0") != "0":
+        return
+    if SCENARIO_PREGEN_ENABLED and SCENARIO_PREGEN_INTERVAL > 0 and _pregen_task is None:
+        _pregen_task = asyncio.create_task(_pregen_loop())
+
+
+async def stop_scenario_pregen():
+    global _pregen_task
+    if _pregen_task is not None:
+        _pregen_task.cancel()
+        try:
+            await _pregen_task
+        except asyncio.CancelledError:
+            pass
+        _pregen_task = None
@@ -0,0 +1,115 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# 캐시 항목 상태
+FRESH = "fresh"      # TTL 이내 → 그대로 사용
+STALE = "stale"      # TTL 지났지만 stale 허용 구간 → 일단 사용하고 백그라운드 갱신
+EXPIRED = "expired"  # stale 구간도 지남 → 다시 받아와야 함 (조건부 재검증용 메타는 남아 있음)
+
+
+class CacheEntry:
+    def __init__(self, value, meta: Optional[dict], ttl: float, stale_ttl: float):
+        self.value = value
+        self.meta = meta or {}  # ETag / Last-Modified 등 재검증용 정보
+        self.reset(ttl, stale_ttl)
+
+    def reset(self, ttl: float, stale_ttl: float):
+        now = time.monotonic()
+        self.expires_at = now + ttl
+        self.stale_until = now + ttl + stale_ttl
+
+    def state(self) -> str:
+        now = time.monotonic()
+        if now < self.expires_at:
+            return FRESH
+        if now < self.stale_until:
+            return STALE
+        return EXPIRED
+
+
+class TTLCache:
+    """
+    TTL 만료 + 크기 제한(LRU) 인메모리 캐시
+    만료된 항목도 maxsize 안에서는 남겨 두어 ETag/Last-Modified 재검증에 쓸 수 있게 한다.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0, stale_ttl: float = 0.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._data: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 지표
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0  # 304 Not Modified로 재사용된 횟수
+        self.evictions = 0
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """항목 조회 (상태 판단은 호출 측에서 entry.state()로) + 지표 기록"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            state = entry.state()
+            if state == FRESH:
+                self.hits += 1
+            elif state == STALE:
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """신선한(FRESH) 값만 반환하는 단순 조회"""
+        entry = self.get_entry(key)
+        if entry is None or entry.state() != FRESH:
+            return default
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, meta: Optional[dict] = None):
+        with self._lock:
+            self._data[key] = CacheEntry(value, meta, self.ttl, self.stale_ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def touch(self, key: Hashable):
+        """재검증 결과 변경 없음(304) → 값은 그대로 두고 만료 시간만 연장"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                entry.reset(self.ttl, self.stale_ttl)
+                self.revalidations += 1
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+        }
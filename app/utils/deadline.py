@@ -0,0 +1,100 @@
+import os
+import time
+import asyncio
+from contextvars import ContextVar
+from typing import List, Optional
+
+# 요청 단위 마감 시간 (contextvars로 호출 깊은 곳까지 전달)
+# 각 단계는 시작 전에 남은 시간을 보고, 부족하면 더 싼 경로로 내려간다.
+#   1. 표정 Vision LLM 생략 → "Unknown"
+#   2. 피드백 LLM 생략 → 템플릿 피드백
+#   3. 마감이 지나면 피드백 없이 점수만
+# 건너뛴 단계는 skipped에 남아 응답에 그대로 실린다.
+FEEDBACK_DEADLINE_MS = float(os.getenv("FEEDBACK_DEADLINE_MS", "8000"))  # 0이면 마감 없음
+# 단계를 시작하려면 최소한 이만큼은 남아 있어야 함 (ms)
+EXPRESSION_LLM_MIN_MS = float(os.getenv("EXPRESSION_LLM_MIN_MS", "4000"))
+FEEDBACK_LLM_MIN_MS = float(os.getenv("FEEDBACK_LLM_MIN_MS", "1500"))
+
+STAGE_EXPRESSION_LLM = "expression_llm"
+STAGE_FEEDBACK_LLM = "feedback_llm"
+STAGE_FEEDBACK = "feedback"
+
+
+class DeadlineExceeded(Exception):
+    """마감 시간이 지나 외부 호출을 시작하지 않음"""
+
+
+class Deadline:
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self.expires_at = time.monotonic() + budget_ms / 1000
+        self.skipped: List[str] = []
+
+    def remaining(self) -> float:
+        """남은 시간 (초, 음수 없음)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, min_ms: float) -> bool:
+        return self.remaining() * 1000 >= min_ms
+
+    def skip(self, stage: str):
+        if stage not in self.skipped:
+            self.skipped.append(stage)
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def start_deadline(budget_ms: float = FEEDBACK_DEADLINE_MS) -> Optional[Deadline]:
+    """현재 요청의 마감 시간 설정 (budget_ms <= 0 이면 마감 없음)"""
+    deadline = Deadline(budget_ms) if budget_ms > 0 else None
+    _current.set(deadline)
+    return deadline
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+def stage_allowed(stage: str, min_ms: float) -> bool:
+    """마감이 없거나 남은 시간이 충분하면 True, 아니면 건너뛴 단계로 기록하고 False"""
+    deadline = _current.get()
+    if deadline is None or deadline.allows(min_ms):
+        return True
+    deadline.skip(stage)
+    return False
+
+
+def skipped_stages() -> List[str]:
+    deadline = _current.get()
+    return list(deadline.skipped) if deadline else []
+
+
+def cap_timeout(timeout: float) -> float:
+    """외부 호출 타임아웃을 남은 시간 이내로 (마감이 지났으면 DeadlineExceeded)"""
+    deadline = _current.get()
+    if deadline is None:
+        return timeout
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded("요청 마감 시간 초과")
+    return min(timeout, remaining)
+
+
+async def within_deadline(awaitable):
+    """남은 시간 안에 끝나지 않으면 DeadlineExceeded (마감이 없으면 그대로 await)"""
+    deadline = _current.get()
+    if deadline is None:
+        return await awaitable
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        if hasattr(awaitable, "close"):
+            awaitable.close()  # 시작하지 않은 코루틴 정리 (never awaited 경고 방지)
+        raise DeadlineExceeded("요청 마감 시간 초과")
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("요청 마감 시간 초과") from None
@@ -0,0 +1,125 @@
+import os
+import math
+import time
+import asyncio
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# 작업 종류별 실행기 (이벤트 루프 / Starlette 기본 스레드풀과 분리)
+#   cpu : MediaPipe 추론, 특징 추출, OpenCV 이미지 처리
+#   io  : 디스크 쓰기 등 블로킹 I/O
+# LLM 호출은 app.ai.scheduler 의 배포별 대기열이 같은 역할을 한다.
+# 각 실행기는 (작업자 수 + 대기열 상한)을 넘으면 기다리게 하지 않고 바로 거절하고,
+# API는 503 + Retry-After 로 응답한다 (과부하 때 지연이 끝없이 늘어나지 않게).
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", str(os.cpu_count() or 2)))
+CPU_EXECUTOR_QUEUE = int(os.getenv("CPU_EXECUTOR_QUEUE", "32"))
+IO_EXECUTOR_WORKERS = int(os.getenv("IO_EXECUTOR_WORKERS", "8"))
+IO_EXECUTOR_QUEUE = int(os.getenv("IO_EXECUTOR_QUEUE", "128"))
+RUN_SAMPLE_SIZE = 500
+
+
+class Overloaded(Exception):
+    """처리 대기열이 가득 참 → 503 (retry_after: 권장 재시도 대기 초)"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ExecutorBusy(Overloaded):
+    def __init__(self, stage: str, retry_after: float):
+        super().__init__(f"{stage} 실행기 대기열 가득 참", retry_after)
+        self.stage = stage
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._pool = None
+        self.pending = 0  # 실행 중 + 대기 중
+
+        # 지표
+        self.max_pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.run_ms = deque(maxlen=RUN_SAMPLE_SIZE)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{self.name}-executor")
+        return self._pool
+
+    def retry_after(self) -> float:
+        """앞선 작업이 다 빠지는 데 걸릴 대략적인 시간 (최소 1초)"""
+        avg_sec = (sum(self.run_ms) / len(self.run_ms) / 1000) if self.run_ms else 1.0
+        waiting = max(0, self.pending - self.workers + 1)
+        return max(1.0, math.ceil(waiting * avg_sec / self.workers))
+
+    async def run(self, fn, *args, **kwargs):
+        """fn을 실행기 스레드에서 실행, 대기열이 가득 차면 ExecutorBusy"""
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise ExecutorBusy(self.name, self.retry_after())
+
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        # 집계는 스레드 쪽 작업이 실제로 끝났을 때 (await 하던 요청이 취소돼도 실행 중인 작업은 계속 자리를 차지하므로
+        # finally에서 빼면 pending이 실제보다 작아져 대기열 상한을 넘겨 받게 됨)
+        future = self._executor().submit(functools.partial(fn, *args, **kwargs))
+        future.add_done_callback(functools.partial(self._on_done, loop, start))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _on_done(self, loop, start: float, future):
+        # 작업자 스레드(또는 취소한 쪽)에서 불림 → 지표는 이벤트 루프 스레드에서 갱신
+        try:
+            loop.call_soon_threadsafe(self._finish, start, future)
+        except RuntimeError:  # 루프가 이미 닫힘 (종료 중)
+            self._finish(start, future)
+
+    def _finish(self, start: float, future):
+        self.pending -= 1
+        self.run_ms.append((time.perf_counter() - start) * 1000)
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        ordered = sorted(self.run_ms)
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_ms": round(sum(ordered) / len(ordered), 1) if ordered else 0.0,
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1) if ordered else 0.0,
+        }
+
+
+cpu_executor = BoundedExecutor("cpu", CPU_EXECUTOR_WORKERS, CPU_EXECUTOR_QUEUE)
+io_executor = BoundedExecutor("io", IO_EXECUTOR_WORKERS, IO_EXECUTOR_QUEUE)
+
+
+def shutdown_executors():
+    cpu_executor.shutdown()
+    io_executor.shutdown()
+
+
+def get_executor_stats() -> dict:
+    return {"cpu": cpu_executor.stats(), "io": io_executor.stats()}
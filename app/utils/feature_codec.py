@@ -0,0 +1,80 @@
+import json
+from typing import Dict, List, Tuple
+
+# 정답 프레임(hand.json 구조) <-> 압축 정수 배열 변환기
+# 중첩 dict를 "leaf 경로 ID" / "값 ID" 쌍의 나열로 바꿔서 저장한다.
+# (경로 문자열 / 값은 사전(vocabulary)에 한 번만 저장 → 프레임마다 반복되는 키 문자열을 없앰)
+
+PATH_SEP = "."
+
+
+class FeatureVocabulary:
+    """leaf 경로와 leaf 값에 번호를 붙이는 사전"""
+
+    def __init__(self, paths: List[str] = None, values: List[str] = None):
+        self.paths = list(paths or [])
+        self.values = list(values or [])  # 값은 JSON 문자열로 보관 (true / false / "Neutral" / null ...)
+        self._path_ids = {p: i for i, p in enumerate(self.paths)}
+        self._value_ids = {v: i for i, v in enumerate(self.values)}
+
+    def path_id(self, path: str) -> int:
+        pid = self._path_ids.get(path)
+        if pid is None:
+            pid = len(self.paths)
+            self.paths.append(path)
+            self._path_ids[path] = pid
+        return pid
+
+    def value_id(self, value) -> int:
+        key = json.dumps(value, ensure_ascii=False)
+        vid = self._value_ids.get(key)
+        if vid is None:
+            vid = len(self.values)
+            self.values.append(key)
+            self._value_ids[key] = vid
+        return vid
+
+    def to_dict(self) -> dict:
+        return {"paths": self.paths, "values": self.values}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FeatureVocabulary":
+        return cls(data.get("paths"), data.get("values"))
+
+
+def _walk(d: dict, prefix: str, out: list):
+    for k, v in d.items():
+        path = f"{prefix}{PATH_SEP}{k}" if prefix else k
+        if isinstance(v, dict):
+            if not v:
+                out.append((path, {}))  # 빈 dict도 구조 보존을 위해 leaf로 기록
+            else:
+                _walk(v, path, out)
+        else:
+            out.append((path, v))
+
+
+def encode_frame(frame: dict, vocab: FeatureVocabulary) -> Tuple[List[int], List[int]]:
+    """중첩 dict → (경로 ID 리스트, 값 ID 리스트)"""
+    leaves = []
+    _walk(frame, "", leaves)
+    path_ids = [vocab.path_id(p) for p, _ in leaves]
+    value_ids = [vocab.value_id(v) for _, v in leaves]
+    return path_ids, value_ids
+
+
+def decode_frame(path_ids, value_ids, paths: List[str], decoded_values: List) -> Dict:
+    """
+    (경로 ID, 값 ID) 나열 → 중첩 dict
+    decoded_values는 vocab.values를 json.loads 해 둔 리스트 (매 호출마다 파싱하지 않도록)
+    """
+    frame = {}
+    for pid, vid in zip(path_ids, value_ids):
+        keys = paths[int(pid)].split(PATH_SEP)
+        cur = frame
+        for k in keys[:-1]:
+            cur = cur.setdefault(k, {})
+        value = decoded_values[int(vid)]
+        # 빈 dict 값은 프레임끼리 공유되지 않도록 새로 생성
+        cur[keys[-1]] = {} if isinstance(value, dict) else value
+    return frame
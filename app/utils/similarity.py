@@ -1,4 +1,4 @@
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List, Iterator
 
 def compare_feature(user: dict, answer: dict) -> Tuple[float, Dict[str, Any]]:
     total = 0
@@ -41,6 +41,120 @@ def compare_feature(user: dict, answer: dict) -> Tuple[float, Dict[str, Any]]:
     # 점수와 틀린 부분(정답 기준) 딕셔너리를 함께 반환
     return score, diff_log
 
+_MISSING = object()  # 키 자체가 없는 경우 (값이 None인 경우와 구분)
+
+
+def _normalize_leaf(val) -> str:
+    # compare_feature와 동일한 규칙: 문자열 "true"/"false" 와 불리언 True/False를 같은 값으로 취급
+    return str(val).lower() if val is not None else "none"
+
+
+def _lookup_leaf(d, path: tuple):
+    """중첩 dict에서 path 위치의 값을 꺼냄 (중간에 dict가 아니면 None)"""
+    cur = d
+    for k in path:
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(k)
+    return cur
+
+
+def _has_path(d, path: tuple) -> bool:
+    cur = d
+    for k in path:
+        if not isinstance(cur, dict) or k not in cur:
+            return False
+        cur = cur[k]
+    return True
+
+
+def _collect_leaf_paths(d: dict, prefix: tuple, out: dict):
+    """answer 프레임의 모든 leaf 경로 -> 값 수집 (첫 프레임에서 한 번만 수행)"""
+    for k, v in d.items():
+        if isinstance(v, dict):
+            _collect_leaf_paths(v, prefix + (k,), out)
+        else:
+            out[prefix + (k,)] = v
+
+
+def _changed_leaf_paths(prev, curr, prefix: tuple, out: set):
+    """
+    연속된 두 프레임 사이에서 바뀐 leaf 경로만 수집
+    동일한 하위 트리는 dict 비교(==, C 레벨)로 통째로 건너뛰므로 변경된 부분만 내려감
+    단, True == 1 / False == 0 이지만 채점(_normalize_leaf)에서는 "true" != "1" 이므로
+    repr까지 같을 때만 같은 하위 트리로 본다. leaf는 채점과 같은 규칙으로 비교.
+    """
+    for k in prev.keys() | curr.keys():
+        p = prev.get(k, _MISSING)
+        c = curr.get(k, _MISSING)
+        if p is c:
+            continue
+
+        p_is_dict = isinstance(p, dict)
+        c_is_dict = isinstance(c, dict)
+        if p_is_dict and c_is_dict:
+            if p == c and repr(p) == repr(c):
+                continue
+            _changed_leaf_paths(p, c, prefix + (k,), out)
+        elif p_is_dict or c_is_dict:
+            _changed_leaf_paths(p if p_is_dict else {}, c if c_is_dict else {}, prefix + (k,), out)
+            # 한쪽만 leaf였던 경우 (구조 자체가 바뀐 경우) 그 경로도 포함
+            out.add(prefix + (k,))
+        elif p is _MISSING or c is _MISSING or _normalize_leaf(p) != _normalize_leaf(c):
+            out.add(prefix + (k,))
+
+
+def iter_frame_scores(user_frames: List[dict], answer_frames: List[dict]) -> Iterator[float]:
+    """
+    [NEW] 동적 수어용 증분 채점기
+    첫 프레임만 전체 비교하고, 이후 프레임은 양쪽(사용자/정답)에서 직전 프레임 대비
+    바뀐 leaf만 다시 비교해 일치 개수를 갱신한다.
+    점수는 compare_feature와 동일한 값(소수 3자리 반올림)을 프레임 순서대로 yield 한다.
+    틀린 부분(diff dict)은 만들지 않으므로 필요하면 해당 프레임만 compare_feature로 다시 계산할 것.
+    """
+    matches = {}  # answer leaf 경로 -> 일치 여부
+    matched = 0
+    prev_user = None
+    prev_answer = None
+
+    for user, answer in zip(user_frames, answer_frames):
+        if prev_answer is None:
+            # 첫 프레임: 전체 비교
+            answer_leaves = {}
+            _collect_leaf_paths(answer, (), answer_leaves)
+            for path, ans_val in answer_leaves.items():
+                ok = _normalize_leaf(_lookup_leaf(user, path)) == _normalize_leaf(ans_val)
+                matches[path] = ok
+                matched += ok
+        else:
+            changed = set()
+            _changed_leaf_paths(prev_answer, answer, (), changed)
+            _changed_leaf_paths(prev_user, user, (), changed)
+
+            for path in changed:
+                old = matches.pop(path, None)
+                if old:
+                    matched -= 1
+
+                # 이번 정답 프레임에 없는 경로이거나 leaf가 아닌 하위 트리면 건너뜀
+                # (하위 트리의 leaf들은 changed에 따로 들어 있음)
+                if not _has_path(answer, path):
+                    continue
+                ans_val = _lookup_leaf(answer, path)
+                if isinstance(ans_val, dict):
+                    continue
+
+                ok = _normalize_leaf(_lookup_leaf(user, path)) == _normalize_leaf(ans_val)
+                matches[path] = ok
+                matched += ok
+
+        prev_user = user
+        prev_answer = answer
+
+        total = len(matches)
+        yield round(matched / total, 3) if total else 0.0
+
+
 # def compare_feature(user: dict, answer: dict) -> float:
 #     total = 0
 #     matched = 0
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    같은 키에 대한 동시 요청을 하나의 실행으로 합치는 장치 (Go의 singleflight와 같은 개념)
+    먼저 들어온 요청만 실제로 fn을 실행하고, 실행 중에 들어온 같은 키 요청은 그 결과(또는 예외)를 함께 받는다.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+        # 지표
+        self.calls = 0       # 전체 요청 수
+        self.executions = 0  # 실제 실행 수
+        self.coalesced = 0   # 다른 요청에 합쳐진 수
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # fn은 별도 태스크로 실행: 먼저 들어온 요청이 취소돼도 공유 실행은 끝까지 진행되고
+            # 기다리던 다른 요청들은 결과(또는 예외)를 그대로 받는다.
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self.executions += 1
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        # shield: 기다리던 요청 하나가 취소돼도 공유 실행은 계속됨
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 기다리는 쪽이 모두 취소됐으면 "exception was never retrieved" 경고가 나므로 소비 처리
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
@@ -0,0 +1,14 @@
+import json
+
+# Server-Sent Events 응답 헬퍼
+# 프록시(nginx 등)가 응답을 모아서 보내지 않도록 버퍼링을 끈다.
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data) -> str:
+    """event: <이름> / data: <JSON> 형식의 SSE 메시지 하나"""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
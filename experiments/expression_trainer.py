@@ -0,0 +1,203 @@
+import sys
+import os
+
+# 프로젝트 루트를 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+import json
+import asyncio
+import argparse
+import numpy as np
+from app.services.mediapipe_service import process_image_to_landmarks
+from app.services.expression_analyzation_service import (
+    EXPRESSION_MODEL_PATH, EXPRESSION_LOCAL_MIN_AGREEMENT, FACE_FEATURES, ExpressionClassifier,
+    analyze_expression_with_llm, face_geometry_features,
+)
+from app.ai.llm_client import close_llm_client
+
+# 로컬 표정 분류기 학습
+#   python experiments/expression_trainer.py --images data/expressions
+#       data/expressions/{Question,Positive,Negative,Neutral}/*.jpg  (폴더 이름 = 라벨)
+#   python experiments/expression_trainer.py --unlabeled data/frames --teacher-llm
+#       라벨 없는 이미지를 Vision LLM으로 라벨링해서 학습 (기존 LLM 판정과 맞추는 증류)
+#   python experiments/expression_trainer.py --unlabeled data/frames --teacher-llm --evaluate-only
+#       저장된 모델을 LLM 라벨과 비교만 해서 일치율을 모델 파일에 기록
+# 검증 구간의 LLM 라벨 대비 일치율(evaluation.llm_agreement)이 EXPRESSION_LOCAL_MIN_AGREEMENT 이상이면
+# 서비스 기본값(EXPRESSION_BACKEND=auto)이 로컬 분류기를 쓴다.
+LABELS = ["Question", "Positive", "Negative", "Neutral"]
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+def _image_files(root: str):
+    for dirpath, _, names in os.walk(root):
+        for name in sorted(names):
+            if name.lower().endswith(IMAGE_EXTS):
+                yield os.path.join(dirpath, name)
+
+
+def _features(image_bytes: bytes):
+    try:
+        return face_geometry_features(process_image_to_landmarks(image_bytes).face_landmarks)
+    except ValueError:
+        return None
+
+
+def load_labeled(root: str):
+    X, y = [], []
+    for label in LABELS:
+        folder = os.path.join(root, label)
+        if not os.path.isdir(folder):
+            continue
+        for path in _image_files(folder):
+            with open(path, "rb") as f:
+                features = _features(f.read())
+            if features is not None:
+                X.append(features)
+                y.append(LABELS.index(label))
+    return X, y
+
+
+async def load_teacher_labeled(root: str):
+    X, y = [], []
+    for path in _image_files(root):
+        with open(path, "rb") as f:
+            image_bytes = f.read()
+        features = _features(image_bytes)
+        if features is None:
+            continue
+        label = await analyze_expression_with_llm(image_bytes)
+        if label in LABELS:
+            X.append(features)
+            y.append(LABELS.index(label))
+            print(f"   {os.path.basename(path)} → {label}")
+    return X, y
+
+
+def train_softmax(X: np.ndarray, y: np.ndarray, epochs: int, lr: float, l2: float):
+    """표준화 후 전체 배치 경사하강법 (클래스 불균형은 가중치로 보정)"""
+    mean = X.mean(axis=0)
+    std = X.std(axis=0) + 1e-6
+    Z = (X - mean) / std
+
+    n, f = Z.shape
+    k = len(LABELS)
+    W = np.zeros((k, f))
+    b = np.zeros(k)
+    onehot = np.eye(k)[y]
+    counts = np.bincount(y, minlength=k)
+    sample_weight = (n / (k * np.maximum(counts, 1)))[y][:, None]
+
+    for _ in range(epochs):
+        logits = Z @ W.T + b
+        logits -= logits.max(axis=1, keepdims=True)
+        proba = np.exp(logits)
+        proba /= proba.sum(axis=1, keepdims=True)
+        grad = (proba - onehot) * sample_weight / n
+        W -= lr * (grad.T @ Z + l2 * W)
+        b -= lr * grad.sum(axis=0)
+
+    return ExpressionClassifier(LABELS, FACE_FEATURES, mean, std, W, b)
+
+
+def evaluate(model: ExpressionClassifier, X: np.ndarray, y: np.ndarray):
+    confusion = np.zeros((len(LABELS), len(LABELS)), dtype=int)
+    for features, label in zip(X, y):
+        predicted, _ = model.predict(features)
+        confusion[label, LABELS.index(predicted)] += 1
+    accuracy = np.trace(confusion) / max(1, confusion.sum())
+    return accuracy, confusion
+
+
+def evaluate_against_llm(path: str, X: list, y: list, sources: list):
+    """저장된 모델을 LLM 라벨과 비교해 일치율을 모델 파일의 evaluation에 기록"""
+    llm = [i for i, source in enumerate(sources) if source == "llm"]
+    if not llm:
+        print("❌ LLM 라벨 샘플이 없습니다 (--unlabeled DIR --teacher-llm)")
+        return
+
+    model = ExpressionClassifier.load(path)
+    agreement, confusion = evaluate(model, np.stack([X[i] for i in llm]), np.asarray([y[i] for i in llm]))
+    print(f"LLM 라벨 대비 일치율: {agreement:.3f} ({len(llm)}개, 기준 {EXPRESSION_LOCAL_MIN_AGREEMENT})")
+    print(f"혼동 행렬 (행=LLM, 열=예측, 순서 {LABELS}):\n{confusion}")
+
+    model.evaluation = {**model.evaluation, "llm_agreement": round(float(agreement), 4), "llm_samples": len(llm)}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(model.to_dict(), f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(f"✅ 평가 결과 저장: {path}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="로컬 표정 분류기 학습")
+    parser.add_argument("--images", help="라벨별 폴더가 있는 이미지 디렉토리")
+    parser.add_argument("--unlabeled", help="라벨 없는 이미지 디렉토리 (--teacher-llm 과 함께)")
+    parser.add_argument("--teacher-llm", action="store_true")
+    parser.add_argument("--out", default=EXPRESSION_MODEL_PATH)
+    parser.add_argument("--epochs", type=int, default=2000)
+    parser.add_argument("--lr", type=float, default=0.5)
+    parser.add_argument("--l2", type=float, default=1e-3)
+    parser.add_argument("--val-ratio", type=float, default=0.2)
+    parser.add_argument("--evaluate-only", action="store_true", help="학습 없이 --out 모델을 LLM 라벨과 비교")
+    args = parser.parse_args()
+
+    X, y, sources = [], [], []
+    try:
+        if args.images:
+            X, y = load_labeled(args.images)
+            sources = ["manual"] * len(y)
+        if args.unlabeled and args.teacher_llm:
+            tx, ty = await load_teacher_labeled(args.unlabeled)
+            X += tx
+            y += ty
+            sources += ["llm"] * len(ty)
+    finally:
+        await close_llm_client()
+
+    if args.evaluate_only:
+        evaluate_against_llm(args.out, X, y, sources)
+        return
+
+    if len(X) < len(LABELS) * 2:
+        print(f"❌ 학습 데이터가 부족합니다 ({len(X)}개)")
+        return
+
+    X = np.stack(X)
+    y = np.asarray(y)
+    sources = np.asarray(sources)
+    print(f"📄 샘플 {len(y)}개, 라벨별 {dict(zip(LABELS, np.bincount(y, minlength=len(LABELS)).tolist()))}")
+
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(y))
+    n_val = int(len(y) * args.val_ratio)
+    val_idx, train_idx = order[:n_val], order[n_val:]
+
+    model = train_softmax(X[train_idx], y[train_idx], args.epochs, args.lr, args.l2)
+    train_acc, _ = evaluate(model, X[train_idx], y[train_idx])
+    print(f"학습 정확도: {train_acc:.3f}")
+    evaluation = {"train_samples": int(len(train_idx)), "validation_samples": int(n_val)}
+    if n_val:
+        val_acc, confusion = evaluate(model, X[val_idx], y[val_idx])
+        evaluation["validation_accuracy"] = round(float(val_acc), 4)
+        print(f"검증 정확도: {val_acc:.3f}")
+        print(f"혼동 행렬 (행=정답, 열=예측, 순서 {LABELS}):\n{confusion}")
+
+        # 서비스 기본 경로를 정하는 값: 검증 구간 중 LLM이 라벨을 붙인 샘플과의 일치율
+        llm_idx = val_idx[sources[val_idx] == "llm"]
+        if len(llm_idx):
+            agreement, _ = evaluate(model, X[llm_idx], y[llm_idx])
+            evaluation["llm_agreement"] = round(float(agreement), 4)
+            evaluation["llm_samples"] = int(len(llm_idx))
+            print(f"LLM 라벨 대비 일치율: {agreement:.3f} ({len(llm_idx)}개, 기준 {EXPRESSION_LOCAL_MIN_AGREEMENT})")
+
+    # 검증까지 끝나면 전체 데이터로 다시 학습해서 저장 (평가 수치는 위의 검증 결과)
+    model = train_softmax(X, y, args.epochs, args.lr, args.l2)
+    model.source = f"trained ({len(y)} samples)"
+    model.evaluation = evaluation
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(model.to_dict(), f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(f"✅ 표정 모델 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+import sys
+import os
+
+# 프로젝트 루트를 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from itertools import permutations
+from app.ai.llm_client import _post, _chat_url, close_llm_client, _feedback_messages, FEEDBACK_MAX_TOKENS
+from app.services.feedback_service import build_feedback_prompt
+from app.utils.similarity import compare_feature
+
+# 피드백 프롬프트 비교: 기존(dict repr, max_tokens 300) vs 압축("경로=값" 상위 N개, 1 문장 출력 상한)
+#   python experiments/feedback_prompt_benchmark.py                              (answers/ 정답끼리의 diff로 토큰 수만)
+#   python experiments/feedback_prompt_benchmark.py --diffs feedback_table.jsonl  (기록된 diff 사용)
+#   python experiments/feedback_prompt_benchmark.py --call-llm --samples 20       (실제 LLM 지연 시간 + API usage 토큰 수)
+# 한국어 / 영어가 섞인 프롬프트는 글자 수로 토큰을 어림하면 크게 틀리므로 tiktoken으로 실제 토크나이저 기준으로 센다.
+# (pip install -r requirements-dev.txt, 네트워크가 없으면 TIKTOKEN_CACHE_DIR에 인코딩 파일을 미리 받아 둠)
+# (--call-llm 에서는 API 응답의 usage 필드 값을 그대로 사용)
+LEGACY_MAX_TOKENS = 300
+TOKEN_ENCODING = os.getenv("BENCH_TOKEN_ENCODING", "o200k_base")  # gpt-4o 계열 토크나이저
+# chat 형식 오버헤드 (메시지마다 역할 / 구분자 3토큰 + 답변 시작 3토큰)
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+try:
+    import tiktoken
+except ImportError:
+    sys.exit("❌ tiktoken이 필요합니다: pip install -r requirements-dev.txt")
+
+try:
+    _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+except Exception as e:
+    # 인코딩 파일은 처음 한 번 내려받음 (오프라인이면 TIKTOKEN_CACHE_DIR에 미리 받아 둔 파일 사용)
+    sys.exit(f"❌ tiktoken 인코딩 로드 실패 ({TOKEN_ENCODING}): {e}")
+
+
+def count_tokens(text: str) -> int:
+    return len(_encoding.encode(text))
+
+
+def prompt_tokens(prompt: str) -> int:
+    messages = _feedback_messages(prompt)
+    return sum(TOKENS_PER_MESSAGE + count_tokens(m["content"]) for m in messages) + TOKENS_PER_REPLY
+
+
+def load_diffs(path: str) -> list[dict]:
+    """JSONL (한 줄에 {"wrong_parts": {...}}) 또는 JSON 리스트"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            items = [json.loads(line) for line in f if line.strip()]
+        else:
+            items = json.load(f)
+    return [item.get("wrong_parts", item) for item in items if item]
+
+
+def answer_diffs(answer_dir: str) -> list[dict]:
+    """기록된 diff가 없으면 answers/ 정답 프레임끼리 비교한 diff 사용 (양손 수어의 큰 diff 포함)"""
+    frames = []
+    for name in sorted(os.listdir(answer_dir)):
+        if name.endswith(".json") and name != "index.json":
+            with open(os.path.join(answer_dir, name), "r", encoding="utf-8") as f:
+                frames.append(json.load(f))
+    return [diff for user, answer in permutations(frames, 2) for diff in [compare_feature(user, answer)[1]] if diff]
+
+
+def summarize(values: list) -> str:
+    if not values:
+        return "-"
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"mean {statistics.mean(values):.1f} / p50 {statistics.median(values):.1f} / p95 {p95:.1f}"
+
+
+async def measure_latency(diffs: list[dict], compact: bool) -> tuple[list, list, list]:
+    """실제 호출 → (지연 ms, API가 보고한 입력 토큰, 출력 토큰)"""
+    latencies, input_tokens, output_tokens = [], [], []
+    max_tokens = FEEDBACK_MAX_TOKENS if compact else LEGACY_MAX_TOKENS
+    for diff in diffs:
+        messages = _feedback_messages(build_feedback_prompt(diff, compact=compact))
+        start = time.perf_counter()
+        result = await _post(_chat_url(), {"messages": messages, "temperature": 0.4, "max_tokens": max_tokens}, timeout=60)
+        latencies.append((time.perf_counter() - start) * 1000)
+        usage = result.get("usage") or {}
+        input_tokens.append(usage.get("prompt_tokens", 0))
+        output_tokens.append(usage.get("completion_tokens", 0))
+    return latencies, input_tokens, output_tokens
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="피드백 프롬프트 토큰 수 / 지연 시간 비교")
+    parser.add_argument("--diffs", help="기록된 diff 파일 (.jsonl / .json)")
+    parser.add_argument("--answers", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "answers"))
+    parser.add_argument("--call-llm", action="store_true", help="실제 LLM 호출로 지연 시간 측정")
+    parser.add_argument("--samples", type=int, default=10, help="LLM 측정에 쓸 diff 수")
+    args = parser.parse_args()
+
+    diffs = load_diffs(args.diffs) if args.diffs else answer_diffs(args.answers)
+    print(f"📄 diff {len(diffs)}개 (토큰 계산: tiktoken {TOKEN_ENCODING})")
+
+    legacy = [prompt_tokens(build_feedback_prompt(d, compact=False)) for d in diffs]
+    compact = [prompt_tokens(build_feedback_prompt(d, compact=True)) for d in diffs]
+    print(f"입력 토큰  기존: {summarize(legacy)}")
+    print(f"입력 토큰  압축: {summarize(compact)}")
+    print(f"출력 상한  기존: {LEGACY_MAX_TOKENS} / 압축: {FEEDBACK_MAX_TOKENS}")
+
+    if args.call_llm:
+        sample = diffs[:args.samples]
+        try:
+            for label, is_compact in (("기존", False), ("압축", True)):
+                latencies, inputs, outputs = await measure_latency(sample, is_compact)
+                print(f"LLM 지연(ms) {label}: {summarize(latencies)}")
+                print(f"API usage  {label}: 입력 토큰 {summarize(inputs)} | 출력 토큰 {summarize(outputs)}")
+        finally:
+            await close_llm_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
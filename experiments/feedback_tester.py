@@ -10,6 +10,7 @@ import json
 import time
 import numpy as np
 import os
+import asyncio
 from app.services.feature_extractor import extract_feature_json
 from app.services.lesson_service import get_answer_frame, get_test_answer_frame
 from app.services.evaluation_service import evaluate_static_sign
@@ -98,18 +99,16 @@ def main():
             json.dump(captured_data, f, indent=2, cls=NumpyEncoder)
         print(f"\n✅ 성공적으로 저장되었습니다: {filename}")
 
-    answer_feature = get_answer_frame(lesson_id)
+    answer_feature = asyncio.run(get_answer_frame(lesson_id))
 
     # 3. 정답 여부 판단
     result = evaluate_static_sign(captured_data, answer_feature)
 
     # 4. 자연어 피드백 생성
-    feedback = generate_feedback(
-        lesson_id=lesson_id,
-        user_feature=captured_data,
-        answer_feature=answer_feature,
-        evaluation=result
-    )
+    feedback = asyncio.run(generate_feedback(
+        evaluation=result,
+        lesson_id=lesson_id
+    ))
 
     print(feedback)
     print(result)
@@ -7,13 +7,14 @@ import time
 import numpy as np
 import requests
 import tempfile
+import asyncio
 from datetime import datetime
 
 # 현재 파일(answer_generator.py)의 부모의 부모 디렉토리(프로젝트 루트)를 경로에 추가
 sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
 
 from app.services.feature_extractor import extract_feature_json
-from app.services.expression_analyzation_service import analyze_expression_with_llm
+from app.services.expression_analyzation_service import classify_expression, classify_expressions
 
 API_BASE_URL = os.getenv("BACKEND_ENDPOINT")
 X_ADMIN_KEY = os.getenv("X_ADMIN_KEY")
@@ -22,6 +23,12 @@ X_ADMIN_KEY = os.getenv("X_ADMIN_KEY")
 mp_holistic = mp.solutions.holistic
 mp_drawing = mp.solutions.drawing_utils
 
+# LLM 클라이언트(커넥션 풀)가 이벤트 루프에 묶이므로 스크립트 전체에서 루프 하나를 재사용
+_loop = asyncio.new_event_loop()
+
+def run_async(coro):
+    return _loop.run_until_complete(coro)
+
 class NumpyEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, np.integer):
@@ -75,11 +82,12 @@ def generate_static_lesson():
                 image.flags.writeable = False
                 results = holistic.process(image)
 
-                # LLM 분석용 바이트 변환 (정방향 사용)
+                # 표정 분류용 바이트 변환 (정방향 사용)
+                # 사용자 시도와 같은 경로(EXPRESSION_BACKEND)로 라벨을 붙임
                 _, buffer = cv2.imencode('.jpg', analysis_frame)
                 image_bytes = buffer.tobytes()
 
-                expression = analyze_expression_with_llm(image_bytes)
+                expression = run_async(classify_expression(results, image_bytes))
                 captured_data = extract_feature_json(results, expression)
                 
                 # 2. [수정됨] 업로드용 이미지는 '거울모드'로 저장
@@ -181,6 +189,7 @@ def generate_dynamic_lesson(duration_sec):
         min_detection_confidence=0.5,
         min_tracking_confidence=0.5) as holistic:
         
+        processed = []
         for idx, analysis_frame in enumerate(frames_to_analyze):
             # print(f"  ... Analyzing frame {idx + 1}")
             image_rgb = cv2.cvtColor(analysis_frame, cv2.COLOR_BGR2RGB)
@@ -188,11 +197,14 @@ def generate_dynamic_lesson(duration_sec):
             results = holistic.process(image_rgb)
 
             _, buffer = cv2.imencode('.jpg', analysis_frame)
-            image_bytes = buffer.tobytes()
+            processed.append((results, buffer.tobytes()))
 
-            expression = analyze_expression_with_llm(image_bytes)
+        # 표정은 녹화 전체에서 한 번 분류하고, 얼굴이 바뀐 프레임에서만 다시 분류
+        expressions, expression_report = run_async(classify_expressions(processed))
+        print(f">>> 🙂 표정 분류 호출 {expression_report['classified']}회 (절약 {expression_report['saved']}회)")
+
+        for (results, _), expression in zip(processed, expressions):
             feature_json = extract_feature_json(results, expression)
-            
             captured_jsons.append(feature_json)
 
     if os.path.exists(save_path) and os.path.getsize(save_path) > 0:
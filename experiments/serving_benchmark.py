@@ -0,0 +1,135 @@
+import sys
+import os
+
+# 프로젝트 루트를 경로에 추가
+ROOT = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(ROOT)
+
+import time
+import signal
+import argparse
+import subprocess
+import urllib.request
+
+# pre-fork(app.serve) vs 독립 uvicorn 프로세스 N개 비교
+#   python experiments/serving_benchmark.py --workers 4
+# 측정 항목
+#   - 시작 시간: 실행 ~ 모든 워커가 /metrics 에 응답할 때까지
+#   - 노드 메모리: 관련 프로세스 전체의 PSS 합 (공유 페이지를 나눠서 계산 → 실제 노드 사용량에 가까움) / RSS 합
+# /proc/<pid>/smaps_rollup 을 읽으므로 Linux 전용
+# 주의: 준비 직후(요청 전) 측정이므로 MediaPipe Holistic 그래프는 포함되지 않는다.
+#       그래프는 두 방식 모두 워커(실행기 스레드)마다 첫 요청 때 따로 만들어지므로 공유로 줄어드는 양이 아니다.
+
+
+def _read_kb(pid: int, field: str) -> int:
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def _children(pid: int) -> list:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except FileNotFoundError:
+        return []
+
+
+def _wait_http(url: str, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except Exception:
+            time.sleep(0.1)
+    return False
+
+
+def _memory(pids: list) -> dict:
+    return {
+        "processes": len(pids),
+        "pss_mb": round(sum(_read_kb(p, "Pss") for p in pids) / 1024, 1),
+        "rss_mb": round(sum(_read_kb(p, "Rss") for p in pids) / 1024, 1),
+    }
+
+
+def _stop(procs: list):
+    for proc in procs:
+        proc.send_signal(signal.SIGTERM)
+    for proc in procs:
+        try:
+            proc.wait(timeout=40)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def bench_prefork(workers: int, port: int, timeout: float, settle: float) -> dict:
+    start = time.monotonic()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        # 모든 워커가 준비되어야 응답 가능하지는 않으므로, 워커 수가 다 찰 때까지도 확인
+        ok = _wait_http(f"http://127.0.0.1:{port}/metrics", timeout)
+        while ok and len(_children(proc.pid)) < workers and time.monotonic() - start < timeout:
+            time.sleep(0.1)
+        startup = time.monotonic() - start
+        time.sleep(settle)
+        return {"mode": f"prefork x{workers}", "ok": ok, "startup_sec": round(startup, 2),
+                **_memory([proc.pid] + _children(proc.pid))}
+    finally:
+        _stop([proc])
+
+
+def bench_independent(workers: int, port: int, timeout: float, settle: float) -> dict:
+    start = time.monotonic()
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port + i), "--host", "127.0.0.1"],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        for i in range(workers)
+    ]
+    try:
+        ok = all(_wait_http(f"http://127.0.0.1:{port + i}/metrics", timeout) for i in range(workers))
+        startup = time.monotonic() - start
+        time.sleep(settle)
+        return {"mode": f"independent x{workers}", "ok": ok, "startup_sec": round(startup, 2),
+                **_memory([p.pid for p in procs])}
+    finally:
+        _stop(procs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pre-fork vs 독립 프로세스 메모리 / 시작 시간 비교")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--settle", type=float, default=2.0, help="준비 후 메모리 측정 전 대기 (초)")
+    args = parser.parse_args()
+
+    results = [
+        bench_prefork(args.workers, args.port, args.timeout, args.settle),
+        bench_independent(args.workers, args.port + 100, args.timeout, args.settle),
+    ]
+
+    print(f"{'mode':<16} {'ok':<5} {'startup(s)':>10} {'procs':>6} {'PSS(MB)':>9} {'RSS(MB)':>9}")
+    for r in results:
+        print(f"{r['mode']:<16} {str(r['ok']):<5} {r['startup_sec']:>10} {r['processes']:>6} {r['pss_mb']:>9} {r['rss_mb']:>9}")
+
+    prefork, independent = results
+    if independent["pss_mb"]:
+        saved = 1 - prefork["pss_mb"] / independent["pss_mb"]
+        print(f"\n📉 노드 메모리(PSS) {saved * 100:.0f}% 절감, 시작 시간 {independent['startup_sec']}s → {prefork['startup_sec']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,26 @@
 import asyncio
 import json
+from contextlib import asynccontextmanager
 from mcp.server.fastmcp import FastMCP
 
 # 기존 서비스 함수들 임포트 (경로에 맞게 수정하세요)
-from app.services.lesson_service import get_lesson_word, get_answer_frame
+from app.services.answer_repository import get_answer_repository
 from app.services.simulation_service import generate_simulation_scenario
 from app.services.feedback_service import generate_feedback
 from app.services.evaluation_service import evaluate_static_sign
+from app.services.backend_client import start_backend_client, close_backend_client
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    # FastAPI 앱과 동일하게 백엔드 커넥션 풀을 서버 수명 동안 공유
+    await start_backend_client()
+    try:
+        yield
+    finally:
+        await close_backend_client()
 
 # 1. MCP 서버 초기화 (이름: SignLanguageTutor)
-mcp = FastMCP("Equal Sign - Sign Language Tutor")
+mcp = FastMCP("Equal Sign - Sign Language Tutor", lifespan=lifespan)
 
 # ==========================================
 # 🛠️ 도구 1: 레슨 조회 (Resource/Tool)
@@ -39,17 +50,17 @@ def search_lesson_id(word_name: str) -> str:
 # 🛠️ 도구 2: 시뮬레이션 생성
 # ==========================================
 @mcp.tool()
-def create_roleplay_scenario(lesson_ids: list[int]) -> str:
+async def create_roleplay_scenario(lesson_ids: list[int]) -> str:
     """
     오늘 배울 레슨 ID 리스트를 받아서,
     몰입형 1인칭 상황극(시나리오 + 이미지 URL)을 생성합니다.
     """
     try:
         # 기존 로직 재활용 (Mocking word lookup for demo)
-        lesson_words = {lid: get_lesson_word(lid) for lid in lesson_ids} # 실제로는 get_lesson_word 사용
+        lesson_words = await get_answer_repository().get_lesson_words(lesson_ids)
         
         # 시뮬레이션 서비스 호출
-        result = generate_simulation_scenario(lesson_words)
+        result = await generate_simulation_scenario(lesson_words)
         
         return json.dumps({
             "situation": result.situation,
@@ -63,7 +74,7 @@ def create_roleplay_scenario(lesson_ids: list[int]) -> str:
 # 🛠️ 도구 3: 수어 피드백 (핵심)
 # ==========================================
 @mcp.tool()
-def evaluate_sign_language(lesson_id: int, user_landmarks_json: str) -> str:
+async def evaluate_sign_language(lesson_id: int, user_landmarks_json: str) -> str:
     """
     사용자의 수어 동작(MediaPipe 랜드마크 JSON)을 입력받아,
     정답과 비교하고 교정 피드백을 반환합니다.
@@ -74,30 +85,23 @@ def evaluate_sign_language(lesson_id: int, user_landmarks_json: str) -> str:
         
         # 2. 정답 데이터 가져오기 (기존 서비스 활용)
         # get_answer_frame 함수가 dict를 반환한다고 가정
-        answer_feature = get_answer_frame(lesson_id)
+        answer_feature = await get_answer_repository().get_answer_frame(lesson_id)
         
         if not answer_feature:
             return "정답 데이터를 찾을 수 없습니다."
 
         # 3. 채점 (기존 서비스 활용)
-        score, diff_log = evaluate_static_sign(user_feature, answer_feature) # 아까 수정한 버전 가정
-        
-        evaluation = {
-            "is_correct": score == 1.0,
-            "score": score
-        }
+        evaluation = evaluate_static_sign(user_feature, answer_feature)
 
         # 4. 피드백 생성 (LLM 호출)
         # 정답이면 칭찬, 틀렸으면 피드백
         if evaluation["is_correct"]:
             return "완벽합니다! 정확한 동작이에요. 🎉"
         else:
-            # 틀린 부분만 넘겨서 피드백 생성
-            feedback = generate_feedback(
-                lesson_id=lesson_id,
-                user_feature=user_feature,
-                answer_feature=diff_log, # 틀린 부분만 전달
-                evaluation=evaluation
+            # 틀린 부분(evaluation["wrong_parts"])을 기준으로 피드백 생성
+            feedback = await generate_feedback(
+                evaluation=evaluation,
+                lesson_id=lesson_id
             )
             return feedback
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 프로젝트 루트를 경로에 추가 (python -m pytest 를 어디서 실행해도 app 패키지를 찾도록)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,108 @@
+import asyncio
+import httpx
+import pytest
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache, FRESH, STALE, EXPIRED
+from app.services import lesson_service
+
+FRAMES = [{"hand": {"left": {"shape": "fist"}}}]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", fake)
+    return fake
+
+
+def test_entry_moves_from_fresh_to_stale_to_expired(clock):
+    cache = TTLCache(maxsize=4, ttl=10, stale_ttl=20)
+    cache.set("k", "v", meta={"etag": '"1"'})
+
+    assert cache.get_entry("k").state() == FRESH
+    clock.now += 15
+    assert cache.get_entry("k").state() == STALE
+    assert cache.get("k") is None  # get()은 FRESH만 반환
+    clock.now += 20
+    entry = cache.get_entry("k")
+    # 만료돼도 재검증용 메타는 남아 있음
+    assert entry.state() == EXPIRED and entry.meta["etag"] == '"1"'
+
+    cache.touch("k")
+    assert cache.get("k") == "v"
+    stats = cache.stats()
+    assert stats["revalidations"] == 1 and stats["stale_hits"] == 2
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.fixture
+def backend(monkeypatch, clock):
+    """백엔드 answer-frames 호출을 가짜 응답으로 대체하고 요청 헤더를 기록"""
+    calls = []
+    state = {"status": 200}
+
+    async def fake_backend_get(path, headers=None, **kwargs):
+        calls.append(dict(headers or {}))
+        if state["status"] == 304:
+            return httpx.Response(304)
+        return httpx.Response(200, json=FRAMES, headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr(lesson_service, "backend_get", fake_backend_get)
+    monkeypatch.setattr(lesson_service, "get_snapshot", lambda: None)
+    monkeypatch.setattr(lesson_service, "_answer_cache", TTLCache(maxsize=8, ttl=10, stale_ttl=20))
+    return calls, state
+
+
+def test_expired_entry_is_revalidated_with_etag(backend, clock):
+    calls, state = backend
+
+    async def main():
+        first = await lesson_service._load_answer_frames(1)
+        cached = await lesson_service._load_answer_frames(1)
+        clock.now += 40  # stale 구간까지 지남
+        state["status"] = 304
+        revalidated = await lesson_service._load_answer_frames(1)
+        return first, cached, revalidated
+
+    first, cached, revalidated = asyncio.run(main())
+    assert first == cached == revalidated == FRAMES
+    # 두 번째 조회는 캐시, 세 번째는 조건부 요청 → 304
+    assert len(calls) == 2
+    assert calls[1]["If-None-Match"] == '"v1"'
+    stats = lesson_service.get_answer_cache_stats()
+    assert stats["revalidations"] == 1
+    assert lesson_service._answer_cache.get_entry(1).state() == FRESH
+
+
+def test_stale_entry_is_served_while_refreshing(backend, clock):
+    calls, state = backend
+
+    async def main():
+        await lesson_service._load_answer_frames(1)
+        clock.now += 15  # STALE
+        state["status"] = 304
+        value = await lesson_service._load_answer_frames(1)
+        # 백그라운드 갱신 완료 대기
+        await asyncio.gather(*list(lesson_service._refresh_tasks.values()))
+        return value
+
+    assert asyncio.run(main()) == FRAMES
+    assert len(calls) == 2
+    assert lesson_service._answer_cache.get_entry(1).state() == FRESH
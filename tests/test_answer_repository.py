@@ -0,0 +1,60 @@
+import asyncio
+import json
+from pathlib import Path
+from app.services.answer_repository import JsonDirAnswerRepository, SqliteAnswerRepository
+
+ANSWERS_DIR = Path(__file__).resolve().parent.parent / "answers"
+
+
+def test_json_repository_reads_shipped_answers():
+    repo = JsonDirAnswerRepository(ANSWERS_DIR)
+
+    async def main():
+        return (
+            await repo.get_lesson_words([2, 1, 99]),
+            await repo.load_frames(1),
+            await repo.load_frames(99),
+        )
+
+    words, frames, missing = asyncio.run(main())
+    assert words == {2: "I LOVE YOU", 1: "HAND"}
+    assert repo.find_lesson_id("i_love_you") == 2
+    with open(ANSWERS_DIR / "hand.json", "r", encoding="utf-8") as f:
+        assert frames == [{"hand": json.load(f)}]
+    assert missing == []
+
+
+def test_scan_without_index(tmp_path):
+    (tmp_path / "12.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "thank_you.json").write_text("[]", encoding="utf-8")
+    index = JsonDirAnswerRepository.scan(tmp_path)
+    assert index == {
+        12: {"title": None, "file": "12.json"},
+        13: {"title": "THANK YOU", "file": "thank_you.json"},
+    }
+
+
+def test_sqlite_repository_matches_json_source(tmp_path):
+    source = JsonDirAnswerRepository(ANSWERS_DIR)
+
+    async def build():
+        lessons = {}
+        for meta in await source.list_lessons():
+            frames_list = await source.load_frames(meta["id"])
+            lessons[meta["id"]] = {"meta": meta, "frames": [item["hand"] for item in frames_list]}
+        return lessons
+
+    lessons = asyncio.run(build())
+    db_path = str(tmp_path / "answers.db")
+    SqliteAnswerRepository.build(db_path, lessons)
+    repo = SqliteAnswerRepository(db_path)
+
+    async def main():
+        return (
+            {lid: await repo.load_frames(lid) for lid in lessons},
+            await repo.get_lesson_words([2, 1, 99]),
+        )
+
+    frames, words = asyncio.run(main())
+    assert frames == {lid: [{"hand": frame} for frame in item["frames"]] for lid, item in lessons.items()}
+    assert words == {2: "I LOVE YOU", 1: "HAND"}
@@ -0,0 +1,45 @@
+import asyncio
+import httpx
+import pytest
+from app.services import backend_client, lesson_service
+from app.utils.cache import TTLCache
+
+
+def _install(monkeypatch, handler):
+    """공용 클라이언트를 MockTransport 기반으로 교체"""
+    calls = []
+
+    def record(request):
+        calls.append(request)
+        return handler(request, len(calls))
+
+    client = httpx.AsyncClient(base_url="http://backend", transport=httpx.MockTransport(record))
+    monkeypatch.setattr(backend_client, "_client", client)
+    return calls
+
+
+def test_retries_server_errors_then_succeeds(monkeypatch):
+    calls = _install(monkeypatch, lambda req, n: httpx.Response(503 if n == 1 else 200, json={"ok": n}))
+    response = asyncio.run(backend_client.backend_get("/api/lessons/1"))
+    assert response.json() == {"ok": 2}
+    assert len(calls) == 2
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    calls = _install(monkeypatch, lambda req, n: httpx.Response(404))
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(backend_client.backend_get("/api/lessons/1"))
+    assert len(calls) == 1
+
+
+def test_not_modified_is_returned_without_error(monkeypatch):
+    _install(monkeypatch, lambda req, n: httpx.Response(304))
+    response = asyncio.run(backend_client.backend_get("/api/lessons/1", headers={"If-None-Match": '"v1"'}))
+    assert response.status_code == 304
+
+
+def test_malformed_answer_json_degrades_to_empty(monkeypatch):
+    _install(monkeypatch, lambda req, n: httpx.Response(200, content=b"<html>oops"))
+    monkeypatch.setattr(lesson_service, "get_snapshot", lambda: None)
+    monkeypatch.setattr(lesson_service, "_answer_cache", TTLCache(maxsize=8, ttl=10))
+    assert asyncio.run(lesson_service.load_answer_frames(1)) == []
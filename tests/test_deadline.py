@@ -0,0 +1,131 @@
+import asyncio
+import time
+import pytest
+from app.services import feedback_service
+from app.services.feedback_cache import FeedbackCache
+from app.utils.deadline import (
+    DeadlineExceeded, STAGE_FEEDBACK, STAGE_FEEDBACK_LLM,
+    cap_timeout, current_deadline, skipped_stages, stage_allowed, start_deadline, within_deadline,
+)
+
+# 템플릿으로 일부만 설명할 수 있는 diff (palm_angle은 템플릿 없음)
+PARTIAL = {"left": {"orientation": {"palm_angle": 35}, "finger_flexion": {"index_extended": True}}}
+UNKNOWN = {"left": {"orientation": {"palm_angle": 35}}}
+
+
+def _advance(deadline, seconds: float):
+    # time.monotonic은 이벤트 루프도 쓰므로 바꾸지 않고 마감 시각을 앞당김
+    deadline.expires_at -= seconds
+
+
+def test_no_deadline_allows_everything():
+    async def main():
+        assert start_deadline(0) is None
+        assert stage_allowed(STAGE_FEEDBACK_LLM, 10 ** 9)
+        assert cap_timeout(30) == 30
+        assert await within_deadline(asyncio.sleep(0, "ok")) == "ok"
+        return skipped_stages()
+
+    assert asyncio.run(main()) == []
+
+
+def test_stage_is_skipped_once_when_budget_runs_low():
+    async def main():
+        deadline = start_deadline(5000)
+        assert stage_allowed(STAGE_FEEDBACK_LLM, 4000)
+        _advance(deadline, 2)
+        assert not stage_allowed(STAGE_FEEDBACK_LLM, 4000)
+        assert not stage_allowed(STAGE_FEEDBACK_LLM, 4000)
+        assert cap_timeout(30) == pytest.approx(3, abs=0.1)
+        _advance(deadline, 3)
+        assert deadline.expired()
+        with pytest.raises(DeadlineExceeded):
+            cap_timeout(30)
+        return skipped_stages()
+
+    assert asyncio.run(main()) == [STAGE_FEEDBACK_LLM]
+
+
+def test_deadline_is_per_request_context():
+    async def request(budget_ms):
+        start_deadline(budget_ms)
+        await asyncio.sleep(0)
+        stage_allowed(STAGE_FEEDBACK_LLM, 1000)
+        return skipped_stages()
+
+    async def main():
+        return await asyncio.gather(request(10), request(0))
+
+    assert asyncio.run(main()) == [[STAGE_FEEDBACK_LLM], []]
+
+
+def test_within_deadline_times_out_and_closes_unstarted_coroutines():
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def main():
+        deadline = start_deadline(1000)
+        _advance(deadline, 0.95)
+        started = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            await within_deadline(slow())
+        elapsed = time.perf_counter() - started
+
+        _advance(deadline, 1)
+        never = slow()
+        with pytest.raises(DeadlineExceeded):
+            await within_deadline(never)
+        return elapsed, never.cr_frame
+
+    elapsed, frame = asyncio.run(main())
+    assert elapsed < 1
+    assert frame is None  # close() 됨
+
+
+@pytest.fixture
+def no_llm(monkeypatch):
+    async def fail_llm(prompt):
+        raise AssertionError("LLM은 호출되지 않아야 함")
+
+    monkeypatch.setattr(feedback_service, "call_llm", fail_llm)
+    monkeypatch.setattr(feedback_service, "feedback_cache", FeedbackCache(path=None))
+
+
+def test_low_budget_degrades_to_partial_template(no_llm):
+    async def main():
+        start_deadline(1000)
+        feedback = await feedback_service.generate_feedback({"is_correct": False, "wrong_parts": PARTIAL}, 1)
+        unknown = await feedback_service.generate_feedback({"is_correct": False, "wrong_parts": UNKNOWN}, 1)
+        return feedback, unknown, skipped_stages()
+
+    feedback, unknown, skipped = asyncio.run(main())
+    assert "index finger" in feedback
+    assert unknown == feedback_service.FALLBACK_FEEDBACK
+    assert skipped == [STAGE_FEEDBACK_LLM]
+
+
+def test_expired_deadline_returns_score_only(no_llm):
+    async def main():
+        _advance(start_deadline(1000), 2)
+        chunks = [c async for c in feedback_service.stream_feedback({"is_correct": False, "wrong_parts": UNKNOWN}, 1)]
+        return chunks, skipped_stages()
+
+    chunks, skipped = asyncio.run(main())
+    assert chunks == []
+    assert skipped == [STAGE_FEEDBACK_LLM, STAGE_FEEDBACK]
+
+
+def test_deadline_passing_during_llm_call_returns_score_only(monkeypatch):
+    async def slow_llm(prompt):
+        _advance(current_deadline(), 15)
+        raise DeadlineExceeded("요청 마감 시간 초과")
+
+    monkeypatch.setattr(feedback_service, "call_llm", slow_llm)
+    monkeypatch.setattr(feedback_service, "feedback_cache", FeedbackCache(path=None))
+
+    async def main():
+        start_deadline(10000)
+        feedback = await feedback_service.generate_feedback({"is_correct": False, "wrong_parts": UNKNOWN}, 1)
+        return feedback, skipped_stages()
+
+    assert asyncio.run(main()) == ("", [STAGE_FEEDBACK_LLM, STAGE_FEEDBACK])
@@ -0,0 +1,73 @@
+from app.services.dialogue_validator import validate_and_repair, CLOSING_LINE
+
+WORDS = {1: "HELLO", 2: "I LOVE YOU"}
+
+
+def _lines(dialogue):
+    return [(line.speaker, line.text, line.target_lesson_id) for line in dialogue]
+
+
+def test_valid_dialogue_passes_unchanged():
+    raw = [
+        {"speaker": "AI", "text": "Hi there!"},
+        {"speaker": "User", "text": "Hello", "target_word": "HELLO"},
+        {"speaker": "AI", "text": "What do you say to your mom?"},
+        {"speaker": "User", "text": "I love you", "target_word": "I LOVE YOU"},
+        {"speaker": "AI", "text": "So sweet!"},
+    ]
+    dialogue, issues, repairs = validate_and_repair(raw, WORDS)
+    assert issues == []
+    assert repairs == []
+    assert [lid for _, _, lid in _lines(dialogue)] == [None, 1, None, 2, None]
+
+
+def test_merges_consecutive_ai_turns_and_appends_closing_line():
+    raw = [
+        {"speaker": "assistant", "text": "Hi!"},
+        {"speaker": "AI", "text": "Nice to meet you."},
+        {"speaker": "User", "text": "hello!"},
+        {"speaker": "AI", "text": "How do you feel?"},
+        {"speaker": "learner", "text": "I love you"},
+    ]
+    dialogue, issues, repairs = validate_and_repair(raw, WORDS)
+    assert issues == []
+    assert "merged consecutive AI turns" in repairs
+    assert "appended AI closing turn" in repairs
+    lines = _lines(dialogue)
+    assert lines[0] == ("AI", "Hi! Nice to meet you.", None)
+    assert lines[-1] == ("AI", CLOSING_LINE, None)
+
+
+def test_drops_repeated_word_exchange_and_fills_empty_user_text():
+    raw = [
+        {"speaker": "AI", "text": "Hi!"},
+        {"speaker": "User", "text": "", "target_word": "HELLO"},
+        {"speaker": "AI", "text": "Say it again?"},
+        {"speaker": "User", "text": "Hello", "target_word": "HELLO"},
+        {"speaker": "AI", "text": "Anything else?"},
+        {"speaker": "User", "text": "I luv you", "target_word": "I LUV YOU"},  # 오타는 유사도로 매칭
+        {"speaker": "AI", "text": "Bye!"},
+    ]
+    dialogue, issues, repairs = validate_and_repair(raw, WORDS)
+    # 중복된 User 턴과 바로 뒤 AI 답변이 함께 빠짐
+    assert issues == []
+    assert "dropped repeated word 'HELLO'" in repairs
+    assert "filled empty User text with 'HELLO'" in repairs
+    assert _lines(dialogue) == [
+        ("AI", "Hi!", None),
+        ("User", "HELLO", 1),
+        ("AI", "Say it again?", None),
+        ("User", "I luv you", 2),
+        ("AI", "Bye!", None),
+    ]
+
+
+def test_reports_unfixable_issues():
+    raw = [
+        {"speaker": "User", "text": "Goodbye"},
+        {"speaker": "AI", "text": "See you!"},
+    ]
+    _, issues, _ = validate_and_repair(raw, WORDS)
+    assert "dialogue must start with an AI turn" in issues
+    assert any("does not use a vocabulary word" in issue for issue in issues)
+    assert any("never used" in issue for issue in issues)
@@ -0,0 +1,33 @@
+from app.services.diff_serializer import compact_path, serialize_diff
+from app.services.feedback_service import build_feedback_prompt
+
+
+def test_serializes_in_priority_order_with_limit():
+    wrong_parts = {
+        "right": {
+            "present": True,
+            "handshape": {"finger_flexion": {"pinky_extended": True}},
+            "location": {"spatial_height": {"high": "True"}},
+        },
+        "finger_relation": {"index_over_middle": False},
+    }
+    assert serialize_diff(wrong_parts) == [
+        "right.present=true",
+        "right.finger_flexion.pinky_extended=true",
+        "right.spatial_height.high=true",
+        "finger_relation.index_over_middle=false",
+    ]
+    assert serialize_diff(wrong_parts, max_leaves=2) == serialize_diff(wrong_parts)[:2]
+
+
+def test_hidden_hand_keeps_only_present():
+    wrong_parts = {"left": {"present": False, "orientation": {"palm_up": True}}}
+    assert serialize_diff(wrong_parts) == ["left.present=false"]
+
+
+def test_compact_prompt_is_shorter_than_legacy():
+    wrong_parts = {"right": {"handshape": {"finger_flexion": {f"{f}_extended": True for f in ("index", "middle", "ring")}}}}
+    compact = build_feedback_prompt(wrong_parts, compact=True)
+    assert "right.finger_flexion.index_extended=true" in compact
+    assert len(compact) < len(build_feedback_prompt(wrong_parts, compact=False))
+    assert compact_path(("non_manual_signal", "expression")) == "non_manual_signal.expression"
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import pytest
+from app.utils.executors import BoundedExecutor, ExecutorBusy
+
+
+def test_rejects_when_workers_and_queue_are_full():
+    executor = BoundedExecutor("test", workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorBusy) as busy:
+            await executor.run(lambda: "rejected")
+        release.set()
+        return busy.value, await queued, await running
+
+    busy, queued, running = asyncio.run(main())
+    executor.shutdown()
+    assert busy.stage == "test" and busy.retry_after >= 1.0
+    assert (queued, running) == ("queued", True)
+    stats = executor.stats()
+    assert (stats["pending"], stats["completed"], stats["rejected"], stats["max_pending"]) == (0, 2, 1, 2)
+
+
+def test_failures_are_counted_and_raised():
+    executor = BoundedExecutor("test", workers=1, max_queue=0)
+
+    def boom():
+        raise ValueError("boom")
+
+    async def main():
+        with pytest.raises(ValueError):
+            await executor.run(boom)
+        await asyncio.sleep(0)  # 집계 콜백
+
+    asyncio.run(main())
+    executor.shutdown()
+    assert (executor.pending, executor.failed, executor.completed) == (0, 1, 0)
+
+
+def test_cancelled_caller_keeps_slot_until_thread_finishes():
+    executor = BoundedExecutor("test", workers=1, max_queue=1)
+    started, release = threading.Event(), threading.Event()
+
+    def work():
+        started.set()
+        release.wait()
+        return "done"
+
+    async def main():
+        running = asyncio.ensure_future(executor.run(work))
+        queued = asyncio.ensure_future(executor.run(lambda: "never"))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        running.cancel()
+        queued.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        # 아직 시작하지 않은 작업은 취소되어 자리를 돌려주지만, 실행 중인 스레드는 계속 자리를 차지
+        in_flight = executor.pending
+        release.set()
+        for _ in range(100):
+            if executor.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        return in_flight
+
+    in_flight = asyncio.run(main())
+    executor.shutdown()
+    assert in_flight == 1
+    assert (executor.pending, executor.completed) == (0, 1)
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from app.services import expression_analyzation_service as service
+from app.services.expression_analyzation_service import _parse_label_array
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('["Question", "Neutral"]', ["Question", "Neutral"]),
+    ('Labels:\n```json\n["Positive", " Negative "]\n```', ["Positive", "Negative"]),
+    ('["Question"]', None),                 # 개수가 다름
+    ('["Question", "Happy"]', None),        # 모르는 라벨
+    ('Question, Neutral', None),
+    ('["Question", "Neutral"', None),
+])
+def test_parse_label_array(text, expected):
+    assert _parse_label_array(text, 2) == expected
+
+
+@pytest.fixture
+def vision(monkeypatch):
+    calls = {"batch": [], "single": 0}
+    monkeypatch.setattr(service, "prepare_face_image", lambda image_bytes, landmarks=None: image_bytes)
+    monkeypatch.setattr(service, "EXPRESSION_BATCH_SIZE", 3)
+
+    async def single(results, image_bytes):
+        calls["single"] += 1
+        return "Neutral"
+
+    monkeypatch.setattr(service, "_expression_with_llm", single)
+    return calls
+
+
+def test_batches_frames_into_one_call(monkeypatch, vision):
+    async def multi(system_prompt, text, images, max_tokens, detail):
+        vision["batch"].append(len(images))
+        return '["Question", "Positive", "Negative"]' if len(images) == 3 else '["Positive", "Question"]'
+
+    monkeypatch.setattr(service, "call_vision_llm_multi_async", multi)
+    frames = [(None, b"img")] * 5
+    labels = asyncio.run(service._expressions_with_llm_batch(frames))
+    assert labels == ["Question", "Positive", "Negative", "Positive", "Question"]
+    assert vision["batch"] == [3, 2] and vision["single"] == 0
+
+
+def test_unparseable_batch_falls_back_to_single_calls(monkeypatch, vision):
+    async def multi(*args, **kwargs):
+        return "I think they look happy."
+
+    monkeypatch.setattr(service, "call_vision_llm_multi_async", multi)
+    labels = asyncio.run(service._expressions_with_llm_batch([(None, b"img")] * 3))
+    assert labels == ["Neutral"] * 3
+    assert vision["single"] == 3
@@ -0,0 +1,43 @@
+import json
+import numpy as np
+import pytest
+from app.services import expression_analyzation_service as service
+from app.services.expression_analyzation_service import ExpressionClassifier, FACE_FEATURES, EXPRESSION_MODEL_PATH
+
+
+def _model(evaluation=None) -> ExpressionClassifier:
+    k, f = 4, len(FACE_FEATURES)
+    weights = np.zeros((k, f))
+    weights[0, 0] = 2.0  # 첫 번째 특징이 크면 Question
+    return ExpressionClassifier(["Question", "Positive", "Negative", "Neutral"], FACE_FEATURES,
+                                np.zeros(f), np.ones(f), weights, np.zeros(k), "test", evaluation)
+
+
+def test_round_trip_keeps_evaluation():
+    model = _model({"llm_agreement": 0.9, "llm_samples": 120})
+    restored = ExpressionClassifier.from_dict(json.loads(json.dumps(model.to_dict())))
+    assert restored.evaluation == {"llm_agreement": 0.9, "llm_samples": 120}
+    x = np.zeros(len(FACE_FEATURES))
+    x[0] = 3.0
+    assert restored.predict(x)[0] == "Question"
+    assert np.isclose(restored.predict_proba(x).sum(), 1.0)
+
+
+def test_shipped_model_loads():
+    model = ExpressionClassifier.load(EXPRESSION_MODEL_PATH)
+    assert model.features == FACE_FEATURES
+
+
+@pytest.mark.parametrize("backend, evaluation, expected", [
+    ("auto", {"llm_agreement": 0.91}, "local"),
+    ("auto", {"llm_agreement": 0.5}, "llm"),
+    ("auto", {}, "llm"),              # 평가 기록 없는 모델 (손으로 정한 가중치)
+    ("local", {}, "local"),
+    ("llm", {"llm_agreement": 0.99}, "llm"),
+])
+def test_backend_follows_recorded_llm_agreement(monkeypatch, backend, evaluation, expected):
+    monkeypatch.setattr(service, "EXPRESSION_BACKEND", backend)
+    monkeypatch.setattr(service, "EXPRESSION_LOCAL_MIN_AGREEMENT", 0.85)
+    monkeypatch.setattr(service, "_classifier", _model(evaluation))
+    monkeypatch.setattr(service, "_backend", None)
+    assert service.expression_backend() == expected
@@ -0,0 +1,44 @@
+import asyncio
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from app.services import expression_analyzation_service as service
+
+
+@pytest.fixture
+def local_classifier(monkeypatch):
+    """얼굴 기하 특징을 그대로 넘기고, 분류 호출을 기록하는 가짜 로컬 분류기"""
+    calls = []
+
+    def route(results, image_bytes=None):
+        calls.append(results)
+        return results.label, False
+
+    monkeypatch.setattr(service, "face_geometry_features", lambda lm: lm)
+    monkeypatch.setattr(service, "_route_expression", route)
+    monkeypatch.setattr(service, "_classifier", SimpleNamespace(std=np.ones(2)))
+    return calls
+
+
+def _frame(features, label):
+    return SimpleNamespace(face_landmarks=None if features is None else np.asarray(features, float), label=label), None
+
+
+def test_reuses_label_until_face_moves(local_classifier):
+    frames = [
+        _frame([0.0, 0.0], "Neutral"),
+        _frame([0.2, 0.1], "Positive"),   # 조금만 움직임 → 앞 라벨 재사용
+        _frame([1.5, 0.0], "Question"),   # 기준 프레임 대비 1.0 이상 → 다시 분류
+        _frame([1.6, 0.2], "Neutral"),
+    ]
+    labels, report = asyncio.run(service.classify_expressions(frames, threshold=1.0))
+    assert labels == ["Neutral", "Neutral", "Question", "Question"]
+    assert report == {"frames": 4, "classified": 2, "saved": 2}
+    assert len(local_classifier) == 2
+
+
+def test_missing_face_is_always_reclassified(local_classifier):
+    frames = [_frame([0.0, 0.0], "Neutral"), _frame(None, "Unknown"), _frame(None, "Unknown")]
+    labels, report = asyncio.run(service.classify_expressions(frames, threshold=1.0))
+    assert labels == ["Neutral", "Unknown", "Unknown"]
+    assert report["classified"] == 3
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+import cv2
+import numpy as np
+from app.services import expression_analyzation_service as service
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    ok, buffer = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    assert ok
+    return buffer.tobytes()
+
+
+def _decode(image_bytes: bytes):
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+
+def test_crops_to_face_and_downscales():
+    image = _jpeg(1280, 720)
+    # 화면 가운데 얼굴 (정규화 좌표), zero-padding 점은 무시
+    points = [SimpleNamespace(x=x, y=y) for x, y in ((0.4, 0.3), (0.6, 0.3), (0.5, 0.7), (0.0, 0.0))]
+    prepared = service.prepare_face_image(image, SimpleNamespace(landmark=points))
+
+    img = _decode(prepared)
+    assert max(img.shape[:2]) <= service.EXPRESSION_CROP_SIZE
+    assert abs(img.shape[0] - img.shape[1]) <= 1  # 정사각형 crop
+    assert len(prepared) < len(image)
+
+
+def test_without_face_only_downscales():
+    image = _jpeg(1280, 720)
+    img = _decode(service.prepare_face_image(image, None))
+    assert max(img.shape[:2]) == service.EXPRESSION_FULL_MAX_SIZE
+    assert round(img.shape[1] / img.shape[0], 1) == round(1280 / 720, 1)
+
+
+def test_undecodable_input_is_returned_as_is():
+    assert service.prepare_face_image(b"not an image") == b"not an image"
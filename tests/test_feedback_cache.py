@@ -0,0 +1,54 @@
+import asyncio
+from app.services.feedback_cache import FeedbackCache, diff_hash, feedback_key
+
+
+def test_key_ignores_order_and_value_spelling():
+    a = {"left": {"handshape": {"index_extended": True, "thumb_folded": False}}, "right": {"palm": "up"}}
+    b = {"right": {"palm": "up"}, "left": {"handshape": {"thumb_folded": "false", "index_extended": "True"}}}
+    assert diff_hash(a) == diff_hash(b)
+    assert feedback_key(3, a) == feedback_key(3, b)
+
+
+def test_key_separates_lessons_and_values():
+    diff = {"left": {"palm": "up"}}
+    assert feedback_key(1, diff) != feedback_key(2, diff)
+    assert feedback_key(1, diff) != feedback_key(1, {"left": {"palm": "down"}})
+    assert feedback_key(None, diff).startswith("*:")
+    # 같은 문자열이라도 다른 경로면 다른 키
+    assert diff_hash({"a": {"b": "x"}}) != diff_hash({"a.b": {"c": "x"}})
+    assert diff_hash(None) == diff_hash({})
+
+
+def test_persistent_layer_survives_a_new_process(tmp_path):
+    path = str(tmp_path / "feedback.db")
+    key = feedback_key(1, {"left": {"palm": "up"}})
+
+    async def main():
+        first = FeedbackCache(path=path)
+        await first.set(key, "손바닥을 아래로 향하게 해 보세요.")
+        await first.set("memory-only", "x", persist=False)
+
+        second = FeedbackCache(path=path)
+        return second, await second.get(key), await second.get("memory-only")
+
+    second, persisted, memory_only = asyncio.run(main())
+    assert persisted == "손바닥을 아래로 향하게 해 보세요."
+    assert memory_only is None
+    assert second.stats()["persistent_hits"] == 1
+
+
+def test_busy_io_executor_degrades_to_memory(tmp_path, monkeypatch):
+    from app.services import feedback_cache as cache_module
+    from app.utils.executors import ExecutorBusy
+
+    async def busy(fn, *args, **kwargs):
+        raise ExecutorBusy("io", 1.0)
+
+    cache = FeedbackCache(path=str(tmp_path / "feedback.db"))
+    monkeypatch.setattr(cache_module.io_executor, "run", busy)
+
+    async def main():
+        await cache.set("k", "v")  # 영구 저장 실패해도 예외 없음
+        return await cache.get("k"), await cache.get("other")
+
+    assert asyncio.run(main()) == ("v", None)
@@ -0,0 +1,85 @@
+import asyncio
+import json
+from pathlib import Path
+import pytest
+from app.services import feedback_precompute, feedback_service
+from app.services.answer_repository import JsonDirAnswerRepository
+from app.services.feedback_cache import FeedbackCache, feedback_key
+from app.services.feedback_table import FeedbackTable, MistakeLog, read_entries
+from app.services.feedback_templates import template_covers
+
+ANSWERS_DIR = Path(__file__).resolve().parent.parent / "answers"
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    repo = JsonDirAnswerRepository(ANSWERS_DIR)
+    monkeypatch.setattr(feedback_precompute, "get_answer_repository", lambda: repo)
+    return repo
+
+
+def test_shipped_lesson_has_non_templated_candidates(repository):
+    frames = asyncio.run(repository.get_answer_frames(1))
+    diffs = feedback_precompute.candidate_diffs(frames[0])
+    assert diffs
+    # 템플릿 문장 하나로 다 설명되는 diff는 후보에서 빠짐
+    assert not any(template_covers(diff) for diff in diffs)
+    # 손이 안 잡힌 경우: 손 존재 여부가 포함됨
+    assert any(diff.get("right", {}).get("present") is True for diff in diffs)
+
+
+def test_batch_writes_entries_the_service_looks_up(repository, tmp_path, monkeypatch):
+    out = str(tmp_path / "table.jsonl")
+    mistakes = tmp_path / "mistakes.jsonl"
+    logged = {"left": {"orientation": {"palm_angle": 35}}}  # 템플릿이 없는 leaf
+    mistakes.write_text(json.dumps({"key": "x", "lesson_id": 2, "wrong_parts": logged}) + "\n", encoding="utf-8")
+
+    async def fake_generate(evaluation):
+        return "Precomputed sentence."
+
+    def run():
+        return asyncio.run(feedback_precompute.precompute(
+            lesson_ids=[1, 2], out_path=out, rps=0, mistakes_path=str(mistakes), generate=fake_generate,
+        ))
+
+    summary = run()
+    entries = list(read_entries(out))
+    assert summary["generated"] == len(entries) > 0
+    assert summary["logged"] == 1
+    assert any(entry["lesson_id"] == 1 for entry in entries)
+    assert feedback_key(2, logged) in {entry["key"] for entry in entries}
+    assert not any(template_covers(entry["wrong_parts"]) for entry in entries)
+
+    # 다시 실행하면 이어서 진행 (이미 만든 키는 건너뜀)
+    assert run()["generated"] == 0
+
+    # 서비스는 템플릿이 상위 항목만 언급할 diff에 대해 사전 생성 문장을 사용
+    table = FeedbackTable()
+    table.load(out)
+    monkeypatch.setattr(feedback_service, "feedback_table", table)
+    monkeypatch.setattr(feedback_service, "feedback_cache", FeedbackCache(path=None))
+    entry = next(e for e in entries if e["lesson_id"] == 1)
+    evaluation = {"is_correct": False, "wrong_parts": entry["wrong_parts"]}
+    assert asyncio.run(feedback_service.generate_feedback(evaluation, lesson_id=1)) == "Precomputed sentence."
+
+
+def test_service_logs_diffs_templates_only_partly_cover(tmp_path, monkeypatch):
+    log = MistakeLog(str(tmp_path / "mistakes.jsonl"))
+    monkeypatch.setattr(feedback_service, "mistake_log", log)
+    monkeypatch.setattr(feedback_service, "feedback_table", FeedbackTable())
+    monkeypatch.setattr(feedback_service, "feedback_cache", FeedbackCache(path=None))
+
+    covered = {"right": {"orientation": {"palm_up": True}}}
+    many = {"right": {"present": True, "orientation": {"palm_up": True, "fingers_up": True}}}
+
+    async def main():
+        first = await feedback_service.generate_feedback({"is_correct": False, "wrong_parts": covered}, 1)
+        second = await feedback_service.generate_feedback({"is_correct": False, "wrong_parts": many}, 1)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == "Turn your right palm up."
+    # 사전 생성 문장이 없으면 중요도 상위 항목만으로 템플릿 (LLM 호출 없음)
+    assert second == "Use your right hand as well and turn your right palm up."
+    logged = [json.loads(line) for line in open(log.path, encoding="utf-8")]
+    assert [entry["wrong_parts"] for entry in logged] == [many]
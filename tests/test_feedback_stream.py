@@ -0,0 +1,58 @@
+import asyncio
+import json
+import pytest
+from app.services import feedback_service
+from app.services.feedback_cache import FeedbackCache, feedback_key
+from app.utils.sse import sse_event
+
+# 템플릿이 없는 leaf → LLM 경로
+WRONG = {"left": {"orientation": {"palm_angle": 35}}}
+
+
+def test_sse_event_format():
+    message = sse_event("score", {"score": 0.5, "feedback": "손을 드세요"})
+    event, data, blank = message.split("\n", 2)
+    assert event == "event: score"
+    assert json.loads(data[len("data: "):]) == {"score": 0.5, "feedback": "손을 드세요"}
+    assert blank == "\n"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = FeedbackCache(path=None)
+    monkeypatch.setattr(feedback_service, "feedback_cache", cache)
+    return cache
+
+
+def test_streams_llm_tokens_and_caches_the_sentence(monkeypatch, cache):
+    async def fake_stream_llm(prompt):
+        for token in ("Tilt ", "your ", "palm."):
+            yield token
+
+    monkeypatch.setattr(feedback_service, "stream_llm", fake_stream_llm)
+
+    async def collect():
+        return [t async for t in feedback_service.stream_feedback({"is_correct": False, "wrong_parts": WRONG}, 4)]
+
+    assert asyncio.run(collect()) == ["Tilt ", "your ", "palm."]
+    assert asyncio.run(cache.get(feedback_key(4, WRONG))) == "Tilt your palm."
+    # 두 번째는 캐시에서 한 번에
+    assert asyncio.run(collect()) == ["Tilt your palm."]
+
+
+def test_interrupted_stream_is_not_cached(monkeypatch, cache):
+    async def broken_stream_llm(prompt):
+        yield "Tilt "
+        raise ConnectionError("client went away")
+
+    monkeypatch.setattr(feedback_service, "stream_llm", broken_stream_llm)
+
+    async def collect():
+        tokens = []
+        with pytest.raises(ConnectionError):
+            async for token in feedback_service.stream_feedback({"is_correct": False, "wrong_parts": WRONG}, 4):
+                tokens.append(token)
+        return tokens
+
+    assert asyncio.run(collect()) == ["Tilt "]
+    assert asyncio.run(cache.get(feedback_key(4, WRONG))) is None
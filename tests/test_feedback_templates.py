@@ -0,0 +1,38 @@
+from app.services.feedback_templates import leaf_phrase, rank_leaves, render_template_feedback
+
+
+def test_renders_top_phrases_in_priority_order():
+    wrong_parts = {
+        "right": {
+            "handshape": {"finger_flexion": {"pinky_extended": True, "pinky_folded": False}},
+            "orientation": {"palm_up": "true"},
+        },
+        "non_manual_signal": {"expression": "question"},
+    }
+    assert render_template_feedback(wrong_parts) == (
+        "Extend your right pinky and raise your eyebrows with a questioning face."
+    )
+    # 같은 문구(pinky_extended=True / pinky_folded=False)는 한 번만
+    assert render_template_feedback(wrong_parts, max_phrases=5).count("pinky") == 1
+
+
+def test_unknown_leaf_falls_back_to_llm():
+    wrong_parts = {"left": {"orientation": {"palm_up": True, "palm_angle": 35}}}
+    assert render_template_feedback(wrong_parts) is None
+    assert render_template_feedback(wrong_parts, partial=True) == "Turn your left palm up."
+    assert render_template_feedback({}) is None
+
+
+def test_hidden_hand_only_mentions_present():
+    wrong_parts = {"left": {"present": False, "handshape": {"finger_selection": {"index": True}}}}
+    assert render_template_feedback(wrong_parts) == "Keep your left hand down."
+
+
+def test_leaf_phrase_and_ranking():
+    assert leaf_phrase(("left", "location", "face", "chin"), True) == (62, "bring your left hand to your chin")
+    assert leaf_phrase(("left", "orientation", "palm_up"), "sideways") is None
+    assert leaf_phrase(("non_manual_signal", "expression"), "angry") is None
+
+    ranked = rank_leaves({"left": {"present": True, "unknown": 1}})
+    assert [path for _, path, _ in ranked] == [("left", "present"), ("left", "unknown")]
+    assert ranked[-1][0] == 0
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import cv2
+import httpx
+import numpy as np
+import pytest
+from app.services import image_store as image_store_module
+from app.services.image_store import ImageStore, normalize_prompt, prompt_hash
+
+
+def _png(color: int = 128) -> bytes:
+    ok, encoded = cv2.imencode(".png", np.full((40, 80, 3), color, np.uint8))
+    assert ok
+    return encoded.tobytes()
+
+
+def test_prompt_hash_ignores_case_and_punctuation():
+    assert normalize_prompt("A Cat, sitting!") == "a cat sitting"
+    assert prompt_hash("A Cat, sitting!") == prompt_hash("a cat   sitting")
+
+
+def test_save_writes_content_addressed_original_and_thumbnail(tmp_path):
+    store = ImageStore(root=str(tmp_path), thumb_sizes=[32])
+    data = _png()
+    sha = store.save(data, "a cat in a cafe")
+
+    assert os.path.exists(store.path(sha))
+    thumb = cv2.imread(store.path(sha, 32))
+    assert max(thumb.shape[:2]) == 32
+    assert store.resolve(f"{sha}.png") == store.path(sha)
+    assert store.resolve(f"{sha}_32.jpg") == store.path(sha, 32)
+    # 같은 내용은 다시 쓰지 않음
+    assert store.save(data) == sha and store.stored_bytes == len(data)
+
+
+def test_resolve_rejects_bad_names(tmp_path):
+    store = ImageStore(root=str(tmp_path), thumb_sizes=[])
+    sha = store.save(_png())
+    assert store.resolve("../index.db") is None
+    assert store.resolve(f"{sha}.jpg") is None  # 썸네일은 크기가 있어야 함
+    assert store.resolve(f"{sha}_64.png") is None
+    assert store.resolve("0" * 64 + ".png") is None  # 없는 파일
+
+
+def test_find_exact_similar_and_miss(tmp_path):
+    store = ImageStore(root=str(tmp_path), thumb_sizes=[], similarity=0.8)
+    sha = store.save(_png(), "two friends ordering coffee at a busy cafe counter")
+
+    assert store.find("Two friends ordering coffee at a busy cafe counter.") == sha
+    assert store.find("two friends ordering coffee at a busy cafe counter today") == sha
+    assert store.find("a dog running on the beach") is None
+    assert (store.exact_hits, store.similar_hits, store.misses) == (1, 1, 1)
+
+
+def test_index_survives_restart(tmp_path):
+    sha = ImageStore(root=str(tmp_path), thumb_sizes=[]).save(_png(), "a quiet library")
+    reopened = ImageStore(root=str(tmp_path), thumb_sizes=[])
+    assert asyncio.run(reopened.lookup("a quiet library")) == sha
+
+
+def test_save_from_url_downloads_once(tmp_path, monkeypatch):
+    data = _png(200)
+    requests = []
+
+    def handler(request):
+        requests.append(str(request.url))
+        if request.url.path == "/expired.png":
+            return httpx.Response(403)
+        return httpx.Response(200, content=data)
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        image_store_module.httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs)
+    )
+    store = ImageStore(root=str(tmp_path), thumb_sizes=[])
+
+    async def main():
+        sha = await store.save_from_url("https://blob.test/image.png", "a sunny park")
+        with pytest.raises(httpx.HTTPStatusError):
+            await store.save_from_url("https://blob.test/expired.png")
+        return sha, await store.lookup("a sunny park")
+
+    sha, found = asyncio.run(main())
+    assert found == sha
+    with open(store.path(sha), "rb") as f:
+        assert f.read() == data
+    assert (store.downloads, store.download_failures) == (1, 1)
+    assert len(requests) == 2
@@ -0,0 +1,50 @@
+import json
+from pathlib import Path
+import pytest
+from app.services import lesson_catalog
+from app.utils.feature_codec import FeatureVocabulary, encode_frame, decode_frame
+
+ANSWERS_DIR = Path(__file__).resolve().parent.parent / "answers"
+
+
+def _answer(name: str) -> dict:
+    with open(ANSWERS_DIR / name, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_codec_round_trip_keeps_leaf_types():
+    vocab = FeatureVocabulary()
+    frame = _answer("hand.json")
+    frame["extra"] = {"count": 1, "flag": True, "ratio": 0.5, "none": None}
+    path_ids, value_ids = encode_frame(frame, vocab)
+    restored = decode_frame(path_ids, value_ids, vocab.paths, [json.loads(v) for v in vocab.to_dict()["values"]])
+    assert restored == frame
+    # True와 1은 다른 값 ID여야 함 (채점은 "true" / "1"로 구분)
+    assert repr(restored["extra"]) == repr(frame["extra"])
+
+
+@pytest.fixture
+def snapshot_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(lesson_catalog, "LESSON_SNAPSHOT_DIR", tmp_path)
+    monkeypatch.setattr(lesson_catalog, "_snapshot", None)
+    monkeypatch.setattr(lesson_catalog, "_snapshot_current_mtime", None)
+    return tmp_path
+
+
+def test_snapshot_round_trip(snapshot_dir):
+    hand, love = _answer("hand.json"), _answer("i_love_you.json")
+    lessons = {
+        1: {"meta": {"title": "HAND"}, "frames": [hand], "etag": '"h1"'},
+        2: {"meta": {"title": "I LOVE YOU"}, "frames": [love, hand], "etag": None},
+    }
+    version = lesson_catalog.write_snapshot(lessons)
+
+    snapshot = lesson_catalog.load_snapshot()
+    assert snapshot.version == version
+    assert 1 in snapshot and 3 not in snapshot
+    assert snapshot.get_frames(1) == [{"hand": hand}]
+    assert snapshot.get_frames(2) == [{"hand": love}, {"hand": hand}]
+    assert snapshot.etag(1) == '"h1"'
+    assert snapshot.get_lesson(2)["title"] == "I LOVE YOU"
+    # 같은 CURRENT면 다시 매핑하지 않음
+    assert lesson_catalog.load_snapshot() is snapshot
@@ -0,0 +1,56 @@
+import asyncio
+import httpx
+import pytest
+from app.services import backend_client, lesson_service
+from app.utils.cache import TTLCache
+
+TITLES = {1: "HAND", 2: "I LOVE YOU", 3: "THANK YOU"}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """일괄 조회(?ids=) / 개별 조회를 흉내 내는 MockTransport"""
+    calls = []
+    state = {"batch": "list"}
+
+    def handler(request):
+        calls.append(request.url)
+        if request.url.path == "/api/lessons":
+            if state["batch"] == "unsupported":
+                return httpx.Response(404)
+            if state["batch"] == "malformed":
+                return httpx.Response(200, content=b"not json")
+            ids = [int(i) for i in request.url.params["ids"].split(",")]
+            # 3번은 일괄 응답에서 빠진 것으로 가정 → 개별 조회로 보충
+            return httpx.Response(200, json={"content": [{"id": i, "title": TITLES[i]} for i in ids if i != 3]})
+        lid = int(request.url.path.rsplit("/", 1)[1])
+        return httpx.Response(200, json={"id": lid, "title": TITLES[lid]})
+
+    client = httpx.AsyncClient(base_url="http://backend", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(backend_client, "_client", client)
+    monkeypatch.setattr(lesson_service, "get_snapshot", lambda: None)
+    monkeypatch.setattr(lesson_service, "_title_cache", TTLCache(maxsize=16, ttl=60))
+    monkeypatch.setattr(lesson_service, "_batch_supported", True)
+    return calls, state
+
+
+def test_batch_then_individual_fill(backend):
+    calls, _ = backend
+    words = asyncio.run(lesson_service.get_lesson_words([2, 1, 3, 2]))
+    # 중복 제거 + 요청 순서 유지
+    assert list(words.items()) == [(2, "I LOVE YOU"), (1, "HAND"), (3, "THANK YOU")]
+    assert [url.path for url in calls] == ["/api/lessons", "/api/lessons/3"]
+
+    # 두 번째 호출은 제목 캐시에서
+    asyncio.run(lesson_service.get_lesson_words([1, 2, 3]))
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("mode", ["unsupported", "malformed"])
+def test_falls_back_to_individual_lookups(backend, mode):
+    calls, state = backend
+    state["batch"] = mode
+    words = asyncio.run(lesson_service.get_lesson_words([1, 2]))
+    assert words == {1: "HAND", 2: "I LOVE YOU"}
+    assert sorted(url.path for url in calls[1:]) == ["/api/lessons/1", "/api/lessons/2"]
+    assert lesson_service._batch_supported is (mode != "unsupported")
@@ -0,0 +1,57 @@
+import asyncio
+import json
+import httpx
+import pytest
+from app.ai import llm_client
+
+
+def _install(monkeypatch, handler):
+    calls = []
+
+    def record(request):
+        calls.append(request)
+        return handler(request, len(calls))
+
+    monkeypatch.setattr(llm_client, "AZURE_OPENAI_ENDPOINT", "https://azure.test/")
+    monkeypatch.setattr(llm_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(record)))
+    return calls
+
+
+def _chat(content: str) -> dict:
+    return {"choices": [{"message": {"content": content}}], "usage": {"total_tokens": 5}}
+
+
+def test_retries_429_after_retry_after_header(monkeypatch):
+    def handler(request, n):
+        if n == 1:
+            return httpx.Response(429, headers={"retry-after-ms": "10"})
+        return httpx.Response(200, json=_chat("Bend your index finger."))
+
+    calls = _install(monkeypatch, handler)
+    assert asyncio.run(llm_client.call_llm("prompt")) == "Bend your index finger."
+    assert len(calls) == 2
+    payload = json.loads(calls[1].content)
+    assert payload["max_tokens"] == llm_client.FEEDBACK_MAX_TOKENS
+    assert calls[1].url.path.endswith(f"/deployments/{llm_client.AZURE_OPENAI_DEPLOYMENT}/chat/completions")
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    calls = _install(monkeypatch, lambda request, n: httpx.Response(400, json={"error": "bad"}))
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(llm_client.call_llm("prompt"))
+    assert len(calls) == 1
+
+
+def test_stream_yields_delta_tokens(monkeypatch):
+    chunks = [
+        {"choices": []},  # 콘텐츠 필터 결과만 있는 첫 청크
+        {"choices": [{"delta": {"content": "Bend "}}]},
+        {"choices": [{"delta": {"content": "it."}}]},
+    ]
+    body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+    _install(monkeypatch, lambda request, n: httpx.Response(200, content=body.encode()))
+
+    async def main():
+        return [token async for token in llm_client.stream_llm("prompt")]
+
+    assert asyncio.run(main()) == ["Bend ", "it."]
@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from app.models.schemas import SimulationResponse
+from app.services import simulation_service
+from app.services.simulation_service import ScenarioStore, scenario_key
+
+
+def _scenario(n: int) -> SimulationResponse:
+    return SimulationResponse(situation=f"s{n}", image_url=f"https://images.test/{n}.png", dialogue=[])
+
+
+def test_key_ignores_order_and_duplicates():
+    assert scenario_key([3, 1, 2, 1]) == scenario_key({2: "a", 3: "b", 1: "c"}) == (1, 2, 3)
+
+
+def test_variants_rotate_and_are_capped():
+    store = ScenarioStore(variants=2)
+    key = (1, 2)
+    for n in range(3):
+        store.add(key, _scenario(n))
+    # 가장 오래된 변형은 교체됨
+    assert [store.get(key).situation for _ in range(4)] == ["s1", "s2", "s1", "s2"]
+    assert store.missing(key) == 0 and store.missing((9,)) == 2
+
+
+def test_popularity_tracking_is_bounded_and_keeps_top_sets():
+    store = ScenarioStore(popularity_size=8, protected=2)
+    hot = (1, 2)
+    for _ in range(10):
+        store.get(hot)
+    for n in range(100):
+        store.get((100 + n,))
+    assert len(store.popularity) <= 8
+    assert store.popularity[hot] == 10
+    assert store.popular(top_k=1, min_requests=2) == [hot]
+    assert store.stats()["popularity_evictions"] > 0
+
+
+def test_cache_hit_skips_generation(monkeypatch):
+    store = ScenarioStore()
+    calls = []
+
+    async def fake_generate(lesson_words):
+        calls.append(lesson_words)
+        return _scenario(len(calls))
+
+    monkeypatch.setattr(simulation_service, "scenario_store", store)
+    monkeypatch.setattr(simulation_service, "generate_simulation_scenario", fake_generate)
+
+    async def main():
+        first = await simulation_service.get_simulation_scenario({1: "HAND"})
+        second = await simulation_service.get_simulation_scenario({1: "HAND"})
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == second and len(calls) == 1
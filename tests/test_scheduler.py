@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from app.ai.scheduler import (
+    LLMScheduler, LLMQueueFull,
+    PRIORITY_FEEDBACK, PRIORITY_EXPRESSION, PRIORITY_SCENARIO, PRIORITY_IMAGE,
+)
+
+DEPLOYMENT = "gpt"
+
+
+def test_dispatches_in_priority_order():
+    async def main():
+        scheduler = LLMScheduler({DEPLOYMENT: 60000})
+        # 배포를 잠깐 멈춰 두고 낮은 우선순위부터 대기열에 넣음
+        scheduler.throttle(DEPLOYMENT, 0.2)
+        order = []
+
+        async def call(priority):
+            await scheduler.acquire(DEPLOYMENT, priority)
+            order.append(priority)
+
+        tasks = []
+        for priority in (PRIORITY_IMAGE, PRIORITY_SCENARIO, PRIORITY_EXPRESSION, PRIORITY_FEEDBACK):
+            tasks.append(asyncio.create_task(call(priority)))
+            await asyncio.sleep(0)
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=5)
+        return order, scheduler.stats()[DEPLOYMENT]
+
+    order, stats = asyncio.run(main())
+    assert order == [PRIORITY_FEEDBACK, PRIORITY_EXPRESSION, PRIORITY_SCENARIO, PRIORITY_IMAGE]
+    assert stats["queue_depth"] == 0
+    assert stats["throttled"] == 1
+
+
+def test_rejects_low_priority_first_when_queue_is_full():
+    async def main():
+        scheduler = LLMScheduler({DEPLOYMENT: 60}, max_queue=2)
+        scheduler.throttle(DEPLOYMENT, 30)
+
+        # 이미지는 대기열의 절반(1개)까지만
+        queued = [asyncio.create_task(scheduler.acquire(DEPLOYMENT, PRIORITY_IMAGE))]
+        await asyncio.sleep(0)
+        with pytest.raises(LLMQueueFull) as image_full:
+            await scheduler.acquire(DEPLOYMENT, PRIORITY_IMAGE)
+
+        # 피드백은 전체 상한까지 들어감
+        queued.append(asyncio.create_task(scheduler.acquire(DEPLOYMENT, PRIORITY_FEEDBACK)))
+        await asyncio.sleep(0)
+        with pytest.raises(LLMQueueFull):
+            await scheduler.acquire(DEPLOYMENT, PRIORITY_FEEDBACK)
+
+        stats = scheduler.stats()[DEPLOYMENT]
+        for task in queued:
+            task.cancel()
+        await asyncio.gather(*queued, return_exceptions=True)
+        return image_full.value, stats
+
+    error, stats = asyncio.run(main())
+    assert error.priority == PRIORITY_IMAGE
+    assert error.retry_after >= 1
+    assert stats["rejected"][PRIORITY_IMAGE] == 1
+    assert stats["rejected"][PRIORITY_FEEDBACK] == 1
+
+
+def test_cancel_while_queued_frees_the_slot():
+    async def main():
+        scheduler = LLMScheduler({DEPLOYMENT: 60000})
+        scheduler.throttle(DEPLOYMENT, 0.2)
+
+        first = asyncio.create_task(scheduler.acquire(DEPLOYMENT, PRIORITY_FEEDBACK))
+        second = asyncio.create_task(scheduler.acquire(DEPLOYMENT, PRIORITY_FEEDBACK))
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()[DEPLOYMENT]["queue_depth"] == 2
+
+        # 맨 앞 요청이 취소돼도 뒤 요청이 막히지 않아야 함
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert scheduler.stats()[DEPLOYMENT]["queue_depth"] == 1
+
+        await asyncio.wait_for(second, timeout=5)
+        return scheduler.stats()[DEPLOYMENT]
+
+    stats = asyncio.run(main())
+    assert stats["queue_depth"] == 0
+    assert stats["dispatched"][PRIORITY_FEEDBACK] == 1
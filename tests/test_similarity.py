@@ -0,0 +1,59 @@
+import random
+from app.utils.similarity import compare_feature, iter_frame_scores
+
+LEAF_VALUES = [True, False, 1, 0, 1.0, "true", "false", "True", None, "left", "right"]
+
+
+def _random_tree(rng: random.Random, depth: int = 0) -> dict:
+    tree = {}
+    for key in rng.sample("abcde", rng.randint(1, 4)):
+        if depth < 2 and rng.random() < 0.4:
+            tree[key] = _random_tree(rng, depth + 1)
+        else:
+            tree[key] = rng.choice(LEAF_VALUES)
+    return tree
+
+
+def _mutate(rng: random.Random, tree: dict, shape: dict) -> dict:
+    """shape(정답 구조)를 따르되 값을 바꾸거나 키를 빼서 사용자 프레임 생성 (compare_feature가 다루는 형태)"""
+    out = {}
+    for key, value in shape.items():
+        if rng.random() < 0.1:
+            continue
+        if isinstance(value, dict):
+            base = tree.get(key) if isinstance(tree.get(key), dict) else {}
+            out[key] = _mutate(rng, base, value)
+        elif rng.random() < 0.3:
+            out[key] = rng.choice(LEAF_VALUES)
+        else:
+            out[key] = tree.get(key, value) if not isinstance(tree.get(key), dict) else value
+    return out
+
+
+def test_type_sensitive_leaf_change_is_rescored():
+    user_frames = [{"a": True}, {"a": 1}]
+    answer_frames = [{"a": True}, {"a": True}]
+    assert list(iter_frame_scores(user_frames, answer_frames)) == [1.0, 0.0]
+
+
+def test_equal_but_differently_typed_subtree_is_rescored():
+    user_frames = [{"h": {"a": False, "b": "x"}}, {"h": {"a": 0, "b": "x"}}]
+    answer_frames = [{"h": {"a": False, "b": "x"}}] * 2
+    assert list(iter_frame_scores(user_frames, answer_frames)) == [1.0, 0.5]
+
+
+def test_incremental_scores_match_compare_feature():
+    rng = random.Random(7)
+    for _ in range(500):
+        answer_frames = [_random_tree(rng)]
+        for _ in range(rng.randint(1, 5)):
+            prev = answer_frames[-1]
+            answer_frames.append(prev if rng.random() < 0.5 else _mutate(rng, prev, prev) or prev)
+        user_frames = []
+        prev_user = {}
+        for answer in answer_frames:
+            prev_user = _mutate(rng, prev_user, answer)
+            user_frames.append(prev_user)
+
+        expected = [compare_feature(u, a)[0] for u, a in zip(user_frames, answer_frames)]
+        assert list(iter_frame_scores(user_frames, answer_frames)) == expected, (user_frames, answer_frames)
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from app.models.schemas import DialogueLine
+from app.services import simulation_jobs
+from app.services.simulation_service import ScenarioStore
+from app.utils.cache import TTLCache
+
+SCRIPT = {
+    "situation": "카페에서 주문하기",
+    "image_prompt": "a cozy cafe",
+    "dialogue": [DialogueLine(speaker="AI", text="Hello"), DialogueLine(speaker="User", text="HAND", target_lesson_id=1)],
+}
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    store = ScenarioStore()
+    state = {"release": None, "fail": False}
+
+    async def fake_script(lesson_words):
+        return dict(SCRIPT)
+
+    async def fake_image(prompt):
+        await state["release"].wait()
+        if state["fail"]:
+            raise RuntimeError("content filter")
+        return "https://images.test/cafe.png"
+
+    monkeypatch.setattr(simulation_jobs, "generate_scenario_script", fake_script)
+    monkeypatch.setattr(simulation_jobs, "generate_scenario_image", fake_image)
+    monkeypatch.setattr(simulation_jobs, "scenario_store", store)
+    monkeypatch.setattr(simulation_jobs, "_jobs", TTLCache(maxsize=16, ttl=60))
+    monkeypatch.setattr(simulation_jobs, "_shared", None)
+    monkeypatch.setattr(simulation_jobs, "_image_tasks", set())
+    return store, state
+
+
+def test_scenario_first_image_later(jobs):
+    store, state = jobs
+
+    async def main():
+        state["release"] = asyncio.Event()
+        job = await simulation_jobs.create_simulation_job({1: "HAND", 2: "I LOVE YOU"})
+        before = job.image_status
+        state["release"].set()
+        job = await simulation_jobs.wait_job_image(await simulation_jobs.get_simulation_job(job.job_id), timeout=1)
+        # 완성된 시나리오는 캐시에 저장 → 다음 요청은 바로 ready
+        cached = await simulation_jobs.create_simulation_job({2: "I LOVE YOU", 1: "HAND"})
+        return before, job, cached
+
+    before, job, cached = asyncio.run(main())
+    assert before == simulation_jobs.IMAGE_PENDING
+    assert job.image_status == simulation_jobs.IMAGE_READY
+    assert job.image_url == "https://images.test/cafe.png"
+    assert cached.image_status == simulation_jobs.IMAGE_READY and cached.job_id != job.job_id
+    assert store.stats()["stored"] == 1
+
+
+def test_image_failure_is_reported_on_the_job(jobs):
+    _, state = jobs
+
+    async def main():
+        state["release"] = asyncio.Event()
+        state["fail"] = True
+        job = await simulation_jobs.create_simulation_job({1: "HAND"})
+        pending = await simulation_jobs.wait_job_image(job, timeout=0.01)
+        status = pending.image_status
+        state["release"].set()
+        return status, await simulation_jobs.wait_job_image(job, timeout=1)
+
+    status, job = asyncio.run(main())
+    assert status == simulation_jobs.IMAGE_PENDING
+    assert job.image_status == simulation_jobs.IMAGE_FAILED
+    assert job.error == "content filter"
+
+
+def test_shutdown_waits_for_images_in_progress(jobs):
+    _, state = jobs
+
+    async def main():
+        state["release"] = asyncio.Event()
+        job = await simulation_jobs.create_simulation_job({1: "HAND"})
+        # 종료 신호 직후에 끝나는 생성은 버리지 않고 기다림
+        asyncio.get_running_loop().call_later(0.05, state["release"].set)
+        await simulation_jobs.stop_simulation_jobs(timeout=1)
+        return job
+
+    job = asyncio.run(main())
+    assert job.image_status == simulation_jobs.IMAGE_READY
+    assert not simulation_jobs._image_tasks
+
+
+def test_shutdown_cancels_images_after_drain_timeout(jobs, tmp_path, monkeypatch):
+    _, state = jobs
+    shared = simulation_jobs.SharedJobStore(str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(simulation_jobs, "_shared", shared)
+
+    async def main():
+        state["release"] = asyncio.Event()  # 풀리지 않음
+        job = await simulation_jobs.create_simulation_job({1: "HAND"})
+        await simulation_jobs.stop_simulation_jobs(timeout=0.05)
+        return job
+
+    job = asyncio.run(main())
+    assert (job.image_status, job.error) == (simulation_jobs.IMAGE_FAILED, "cancelled")
+    # 다른 워커는 공유 저장소에서 취소된 상태를 읽음
+    remote = shared.load(job.job_id)
+    assert remote.remote and remote.image_done.is_set()
+    assert (remote.image_status, remote.error, remote.situation) == (job.image_status, "cancelled", job.situation)
+    assert remote.dialogue == job.dialogue
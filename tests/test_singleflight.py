@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def main():
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(flight.do(1, fetch) for _ in range(5)))
+        return results, calls, flight.stats()
+
+    results, calls, stats = asyncio.run(main())
+    assert results == ["value"] * 5
+    assert calls == 1
+    assert stats["coalesced"] == 4
+    assert stats["inflight"] == 0
+
+
+def test_leader_cancellation_does_not_cancel_followers():
+    async def main():
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "value"
+
+        leader = asyncio.create_task(flight.do(1, fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do(1, fetch))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.wait_for(follower, timeout=1), flight.stats()
+
+    result, stats = asyncio.run(main())
+    assert result == "value"
+    assert stats["executions"] == 1
+    assert stats["inflight"] == 0
+
+
+def test_exception_reaches_every_caller_and_frees_the_key():
+    async def main():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("backend down")
+
+        results = await asyncio.gather(flight.do(1, fail), flight.do(1, fail), return_exceptions=True)
+
+        async def ok():
+            return "retry"
+
+        return results, await flight.do(1, ok)
+
+    results, retried = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert retried == "retry"
+
+
+def test_concurrent_answer_frame_loads_hit_backend_once(monkeypatch):
+    import httpx
+    from app.services import lesson_service
+    from app.utils.cache import TTLCache
+
+    calls = []
+
+    async def fake_backend_get(path, headers=None, **kwargs):
+        calls.append(path)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=[{"hand": {}}])
+
+    monkeypatch.setattr(lesson_service, "backend_get", fake_backend_get)
+    monkeypatch.setattr(lesson_service, "get_snapshot", lambda: None)
+    monkeypatch.setattr(lesson_service, "_answer_cache", TTLCache(maxsize=8, ttl=60))
+
+    async def main():
+        return await asyncio.gather(*(lesson_service.get_answer_frames(7) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(len(frames) == 1 for frames in results)